@@ -9,12 +9,28 @@ cdef class Observable(ObjectWithUid):
     cdef object bound_uid
 
 
+cdef class DispatchTable:
+    # name: Property, shared by all the instances
+    cdef readonly dict properties
+    # (name, Property) to link, in order
+    cdef readonly tuple links
+    # the registered events, {name: None}, copied by each instance
+    cdef readonly dict events
+    # (property name, on_<property> handler name) to bind
+    cdef readonly tuple handlers
+
+
 cdef class EventDispatcher(ObjectWithUid):
     cdef dict __event_stack
     cdef dict __properties
     cdef dict __storage
+    cdef list __batch
+    cdef int __batch_depth
     cdef object __weakref__
     cpdef dict properties(self)
+    cpdef begin_batch(self)
+    cpdef end_batch(self)
+    cdef EventObservers event_observers(self, event_type)
 
 
 cdef enum BoundLock:
@@ -45,6 +61,8 @@ cdef class EventObservers:
     cdef BoundCallback last_callback
     # The uid to assign to the next bound callback.
     cdef object uid
+    # The name of the property or event, for the dispatch profiler.
+    cdef object name
 
     cdef inline void bind(self, object observer, int is_ref=*) except *
     cdef inline object fast_bind(self, object observer, tuple largs, dict kwargs, int is_ref)
@@ -29,16 +29,28 @@ from libc.string cimport memset
 
 from functools import partial
 from collections import defaultdict
+from timeit import default_timer
 from kivy.weakmethod import WeakMethod
 from kivy.compat import string_types
 from kivy.properties cimport (Property, PropertyStorage, ObjectProperty,
     NumericProperty, StringProperty, ListProperty, DictProperty,
-    BooleanProperty)
+    BooleanProperty, storage_observers)
 
 cdef int widget_uid = 0
-cdef dict cache_properties = {}
-cdef dict cache_events = {}
-cdef dict cache_events_handlers = {}
+# the DispatchProfiler recording the callbacks, see set_dispatch_profiler
+cdef object dispatch_profiler = None
+cdef dict cache_dispatch_tables = {}
+
+def set_dispatch_profiler(profiler):
+    '''Set the :class:`~kivy.profiler.DispatchProfiler` recording the
+    callbacks of all the property and event dispatches, or None to stop
+    recording. Use :meth:`~kivy.profiler.DispatchProfiler.start` instead.
+
+    .. versionadded:: 1.9.1
+    '''
+    global dispatch_profiler
+    dispatch_profiler = profiler
+
 
 def _get_bases(cls):
     for base in cls.__bases__:
@@ -161,6 +173,66 @@ cdef class Observable(ObjectWithUid):
             return self
 
 
+cdef class DispatchTable:
+    '''Description of the properties and events of an
+    :class:`EventDispatcher` class, built once when the first instance is
+    created, see :func:`get_dispatch_table`. The instances only copy it.
+
+    .. versionadded:: 1.9.1
+    '''
+
+    def __cinit__(self, cls):
+        cdef dict properties = {}
+        cdef list events = []
+        cdef basestring k, event
+
+        for k in dir(cls):
+            uattr = getattr(cls, k, None)
+            if not isinstance(uattr, Property):
+                continue
+            if k == 'touch_down' or k == 'touch_move' or k == 'touch_up':
+                raise Exception('The property <%s> has a forbidden name' % k)
+            properties[k] = uattr
+        self.properties = properties
+        self.links = tuple(properties.items())
+
+        # discover __events__ on all the baseclasses
+        for base in [cls] + list(_get_bases(cls)):
+            if not hasattr(base, '__events__'):
+                continue
+            for event in base.__events__:
+                if event in events:
+                    continue
+
+                if event[:3] != 'on_':
+                    raise Exception('{} is not an event name in {}'.format(
+                        event, cls.__name__))
+
+                # Ensure that the user has at least declared the default
+                # handler
+                if not hasattr(cls, event):
+                    raise Exception(
+                        'Missing default handler <%s> in <%s>' % (
+                        event, cls.__name__))
+
+                events.append(event)
+        self.events = dict.fromkeys(events)
+
+        # the on_<property> methods, bound to their property
+        self.handlers = tuple([(k[3:], k) for k in dir(cls)
+                               if k[:3] == 'on_' and k[3:] in properties])
+
+
+cdef DispatchTable get_dispatch_table(cls):
+    '''Return the :class:`DispatchTable` of the class `cls`, building it the
+    first time.
+    '''
+    cdef DispatchTable table = cache_dispatch_tables.get(cls)
+    if table is None:
+        table = cache_dispatch_tables[cls] = DispatchTable(cls)
+    return table
+
+
 cdef class EventDispatcher(ObjectWithUid):
     '''Generic event dispatcher interface.
 
@@ -168,102 +240,41 @@ cdef class EventDispatcher(ObjectWithUid):
     '''
 
     def __cinit__(self, *largs, **kwargs):
-        global cache_properties
-        cdef dict cp = cache_properties
-        cdef dict attrs_found
-        cdef list attrs
+        cdef DispatchTable table = get_dispatch_table(self.__class__)
         cdef Property attr
-        cdef basestring k
+        cdef str k
 
-        self.__event_stack = {}
         self.__storage = {}
 
-        __cls__ = self.__class__
-
-        if __cls__ not in cp:
-            attrs_found = cp[__cls__] = {}
-            attrs = dir(__cls__)
-            for k in attrs:
-                uattr = getattr(__cls__, k, None)
-                if not isinstance(uattr, Property):
-                    continue
-                if k == 'touch_down' or k == 'touch_move' or k == 'touch_up':
-                    raise Exception('The property <%s> has a forbidden name' % k)
-                attrs_found[k] = uattr
-        else:
-            attrs_found = cp[__cls__]
-
         # First loop, link all the properties storage to our instance
-        for k in attrs_found:
-            attr = attrs_found[k]
+        for k, attr in table.links:
             attr.link(self, k)
 
         # Second loop, resolve all the references
-        for k in attrs_found:
-            attr = attrs_found[k]
+        for k, attr in table.links:
             attr.link_deps(self, k)
 
-        self.__properties = attrs_found
+        self.__properties = table.properties
 
         # Automatic registration of event types (instead of calling
-        # self.register_event_type)
-
-        # If not done yet, discover __events__ on all the baseclasses
-        cdef dict ce = cache_events
-        cdef list events
-        cdef basestring event
-        if __cls__ not in ce:
-            classes = [__cls__] + list(_get_bases(self.__class__))
-            events = []
-            for cls in classes:
-                if not hasattr(cls, '__events__'):
-                    continue
-                for event in cls.__events__:
-                    if event in events:
-                        continue
-
-                    if event[:3] != 'on_':
-                        raise Exception('{} is not an event name in {}'.format(
-                            event, __cls__.__name__))
-
-                    # Ensure that the user has at least declared the default handler
-                    if not hasattr(self, event):
-                        raise Exception(
-                            'Missing default handler <%s> in <%s>' % (
-                            event, __cls__.__name__))
-
-                    events.append(event)
-            ce[__cls__] = events
-        else:
-            events = ce[__cls__]
-
-        # then auto register
-        for event in events:
-            self.__event_stack[event] = EventObservers(1, 0)
+        # self.register_event_type), the observers are allocated on the first
+        # bind
+        self.__event_stack = table.events.copy()
 
     def __init__(self, **kwargs):
-        cdef basestring func, name, key
-        cdef dict properties
+        cdef DispatchTable table = get_dispatch_table(self.__class__)
+        cdef basestring name, func
+        cdef dict properties = table.properties
+        cdef PropertyStorage ps
         # object.__init__ takes no parameters as of 2.6; passing kwargs
         # triggers a DeprecationWarning or worse
         super(EventDispatcher, self).__init__()
 
         # Auto bind on own handler if exist
-        properties = self.properties()
-        __cls__ = self.__class__
-        if __cls__ not in cache_events_handlers:
-            event_handlers = []
-            for func in dir(self):
-                if func[:3] != 'on_':
-                    continue
-                name = func[3:]
-                if name in properties:
-                    event_handlers.append(func)
-            cache_events_handlers[__cls__] = event_handlers
-        else:
-            event_handlers = cache_events_handlers[__cls__]
-        for func in event_handlers:
-            self.fast_bind(func[3:], getattr(self, func))
+        for name, func in table.handlers:
+            ps = self.__storage[name]
+            storage_observers(ps, name).fast_bind(
+                getattr(self, func), None, None, 0)
 
         # Apply the existing arguments to our widget
         for key, value in kwargs.iteritems():
@@ -307,7 +318,7 @@ cdef class EventDispatcher(ObjectWithUid):
 
         # Add the event type to the stack
         if event_type not in self.__event_stack:
-            self.__event_stack[event_type] = EventObservers(1, 0)
+            self.__event_stack[event_type] = None
 
     def unregister_event_types(self, basestring event_type):
         '''Unregister an event type in the dispatcher.
@@ -427,14 +438,14 @@ cdef class EventDispatcher(ObjectWithUid):
         for key, value in kwargs.iteritems():
             assert callable(value), '{!r} is not callable'.format(value)
             if key[:3] == 'on_':
-                observers = self.__event_stack.get(key)
+                observers = self.event_observers(key)
                 if observers is None:
                     continue
                 # convert the handler to a weak method
                 observers.bind(WeakMethod(value), 1)
             else:
                 ps = self.__storage[key]
-                ps.observers.bind(WeakMethod(value), 1)
+                storage_observers(ps, key).bind(WeakMethod(value), 1)
 
     def unbind(self, **kwargs):
         '''Unbind properties from callback functions with similar usage as
@@ -460,7 +471,8 @@ cdef class EventDispatcher(ObjectWithUid):
                 observers.unbind(value, 1, 1)
             else:
                 ps = self.__storage[key]
-                ps.observers.unbind(value, 1, 1)
+                if ps.observers is not None:
+                    ps.observers.unbind(value, 1, 1)
 
     def fast_bind(self, name, func, *largs, **kwargs):
         '''A method for faster binding. This method is somewhat different than
@@ -556,7 +568,7 @@ cdef class EventDispatcher(ObjectWithUid):
         cdef PropertyStorage ps
 
         if name[:3] == 'on_':
-            observers = self.__event_stack.get(name)
+            observers = self.event_observers(name)
             if observers is not None:
                 return observers.fast_bind(func, largs, kwargs, 0)
             return 0
@@ -564,7 +576,7 @@ cdef class EventDispatcher(ObjectWithUid):
             ps = self.__storage.get(name)
             if ps is None:
                 return 0
-            return ps.observers.fast_bind(func, largs, kwargs, 0)
+            return storage_observers(ps, name).fast_bind(func, largs, kwargs, 0)
 
     def fast_unbind(self, name, func, *largs, **kwargs):
         '''Similar to :meth:`fast_bind`.
@@ -588,7 +600,7 @@ cdef class EventDispatcher(ObjectWithUid):
                 observers.fast_unbind(func, largs, kwargs)
         else:
             ps = self.__storage.get(name)
-            if ps is not None:
+            if ps is not None and ps.observers is not None:
                 ps.observers.fast_unbind(func, largs, kwargs)
 
     def unbind_uid(self, name, uid):
@@ -622,7 +634,7 @@ cdef class EventDispatcher(ObjectWithUid):
                 observers.unbind_uid(uid)
         else:
             ps = self.__storage.get(name)
-            if ps is not None:
+            if ps is not None and ps.observers is not None:
                 ps.observers.unbind_uid(uid)
 
     def get_property_observers(self, name, args=False):
@@ -661,8 +673,22 @@ cdef class EventDispatcher(ObjectWithUid):
         else:
             ps = self.__storage[name]
             observers = ps.observers
+        if observers is None:
+            return []
         return list(observers) if args else [item[0] for item in observers]
 
+    cdef EventObservers event_observers(self, event_type):
+        # the observers of a registered event, allocated on the first bind,
+        # None if the event is not registered
+        cdef EventObservers observers
+        if event_type not in self.__event_stack:
+            return None
+        observers = self.__event_stack[event_type]
+        if observers is None:
+            observers = self.__event_stack[event_type] = EventObservers(1, 0)
+            observers.name = event_type
+        return observers
+
     def events(EventDispatcher self):
         '''Return all the events in the class. Can be used for introspection.
 
@@ -692,11 +718,19 @@ cdef class EventDispatcher(ObjectWithUid):
 
         '''
         cdef EventObservers observers = self.__event_stack[event_type]
-        if observers.dispatch(self, None, largs, kwargs, 1):
+        if observers is not None and observers.dispatch(
+                self, None, largs, kwargs, 1):
             return True
 
         handler = getattr(self, event_type)
-        return handler(*largs, **kwargs)
+        if dispatch_profiler is None:
+            return handler(*largs, **kwargs)
+        start = default_timer()
+        try:
+            return handler(*largs, **kwargs)
+        finally:
+            dispatch_profiler.add_callback(
+                self, event_type, handler, default_timer() - start)
 
     def dispatch_generic(self, basestring event_type, *largs, **kwargs):
         if event_type in self.__event_stack:
@@ -708,6 +742,76 @@ cdef class EventDispatcher(ObjectWithUid):
             if child.dispatch_generic(event_type, *largs, **kwargs):
                 return True
 
+    cpdef begin_batch(self):
+        '''Start deferring the dispatch of the properties of this object,
+        until the matching :meth:`end_batch`. See :meth:`batch`.
+
+        .. versionadded:: 1.9.1
+        '''
+        if self.__batch is None:
+            self.__batch = []
+        self.__batch_depth += 1
+
+    cpdef end_batch(self):
+        '''End a batch started with :meth:`begin_batch`. When the outermost
+        batch ends, each property changed during the batch is dispatched once,
+        with its final value, in the order of their first change.
+
+        .. versionadded:: 1.9.1
+        '''
+        cdef Property prop
+        cdef PropertyStorage ps
+        cdef list batch = self.__batch
+        cdef Py_ssize_t i = 0
+        if self.__batch_depth <= 0:
+            raise RuntimeError('end_batch() called without begin_batch()')
+        if self.__batch_depth > 1:
+            self.__batch_depth -= 1
+            return
+        # the changes made by the observers are still coalesced and appended
+        # to the batch, so a property depending on several others (pos on x
+        # and y) is dispatched once. The dispatched entries are replaced by
+        # None, to be appended again if they change after their dispatch.
+        try:
+            while i < len(batch):
+                prop = batch[i]
+                batch[i] = None
+                i += 1
+                ps = self.__storage[prop._name]
+                if ps.observers is not None:
+                    ps.observers.dispatch(self, ps.value, None, None, 0)
+        finally:
+            self.__batch_depth = 0
+            del batch[:]
+
+    def batch(self):
+        '''Return a context manager that defers the dispatch of the
+        properties changed in its block, and dispatches each of them once, with
+        its final value, at the end of the block::
+
+            with widget.batch():
+                widget.x = 10
+                widget.y = 20
+                widget.size = (100, 100)
+            # on_x, on_y, on_pos and on_size are dispatched once here
+
+        Inside the block, reading the properties returns their new values, but
+        no observer is called: the properties bound to them, such as the
+        `texture_size` of a :class:`~kivy.uix.label.Label` or the
+        :class:`~kivy.properties.AliasProperty` using `cache=True`, are only
+        updated at the end. Only the properties of this object are batched,
+        the events and the other objects are dispatched immediately. Batches
+        can be nested, the properties are dispatched when the outermost one
+        ends, even if an exception is raised.
+
+        It is meant for the code that updates many properties of the same
+        object at once, like the :meth:`~kivy.uix.layout.Layout.do_layout` of
+        the layouts.
+
+        .. versionadded:: 1.9.1
+        '''
+        return _DispatchBatch(self)
+
     #
     # Properties
     #
@@ -781,9 +885,9 @@ cdef class EventDispatcher(ObjectWithUid):
         .. versionadded:: 1.0.9
         '''
         # fast path, use the cache first
-        __cls__ = self.__class__
-        if __cls__ in cache_properties:
-            return cache_properties[__cls__]
+        cdef DispatchTable table = cache_dispatch_tables.get(self.__class__)
+        if table is not None:
+            return table.properties
 
         cdef dict ret, p
         ret = {}
@@ -828,6 +932,7 @@ cdef class EventDispatcher(ObjectWithUid):
         >>> print(mywidget.custom)
         True
         '''
+        cdef DispatchTable table
         if value is None:  # shortcut
             prop = ObjectProperty(None, *largs, **kwargs)
         if isinstance(value, bool):
@@ -847,6 +952,10 @@ cdef class EventDispatcher(ObjectWithUid):
         self.__properties[name] = prop
         setattr(self.__class__, name, prop)
 
+        # the next instances must link the new property as well
+        table = get_dispatch_table(self.__class__)
+        table.links = tuple(table.properties.items())
+
     property proxy_ref:
         '''Default implementation of proxy_ref, returns self.
         .. versionadded:: 1.9.0
@@ -855,6 +964,22 @@ cdef class EventDispatcher(ObjectWithUid):
             return self
 
 
+cdef class _DispatchBatch:
+    '''Context manager returned by :meth:`EventDispatcher.batch`.
+    '''
+    cdef EventDispatcher obj
+
+    def __cinit__(self, EventDispatcher obj):
+        self.obj = obj
+
+    def __enter__(self):
+        self.obj.begin_batch()
+        return self.obj
+
+    def __exit__(self, *largs):
+        self.obj.end_batch()
+
+
 cdef class BoundCallback:
 
     def __cinit__(self, object func, tuple largs, dict kwargs, int is_ref,
@@ -1129,6 +1254,8 @@ cdef class EventObservers:
         cdef object f, result
         cdef BoundLock current_lock, last_lock
         cdef int done = 0, res = 0, reverse = self.dispatch_reverse
+        cdef object profiler = dispatch_profiler
+        cdef double start
 
         if reverse:  # dispatch starting from last until first
             callback = self.last_callback  # start callback
@@ -1165,8 +1292,19 @@ cdef class EventObservers:
             else:
                 f = callback.func
 
-            result = self._dispatch(
-                f, callback.largs, callback.kwargs, obj, value, largs, kwargs)
+            if profiler is None:
+                result = self._dispatch(
+                    f, callback.largs, callback.kwargs, obj, value, largs,
+                    kwargs)
+            else:
+                start = default_timer()
+                try:
+                    result = self._dispatch(
+                        f, callback.largs, callback.kwargs, obj, value, largs,
+                        kwargs)
+                finally:
+                    profiler.add_callback(
+                        obj, self.name, f, default_timer() - start)
 
             if current_lock == unlocked:  # now unlock/delete if it was unlocked
                 if callback.lock == deleted:
@@ -10,6 +10,15 @@ result in unpredicatable behavior.
 Event loop management
 ---------------------
 
+The loop runs :meth:`EventLoopBase.idle` once per frame. In the default loop
+mode, frames are run at the `maxfps` rate of the configuration. When the
+`loop_mode` token of the `kivy` section is set to `on_demand`, each frame
+starts with :meth:`EventLoopBase.idle_wait`, which blocks until there is
+something to do: a :class:`~kivy.clock.Clock` event due, an input event or a
+canvas to redraw (e.g. after calling `Window.canvas.ask_update()`).
+
+.. versionchanged:: 1.9.1
+    The `on_demand` loop mode was added.
 '''
 
 __all__ = (
@@ -111,6 +120,18 @@ class EventLoopBase(EventDispatcher):
         self.window = None
         self.me_list = []
 
+        #: .. versionadded:: 1.9.1
+        #:     Loop mode, one of 'default' or 'on_demand'. It defaults to the
+        #:     `loop_mode` token of the `kivy` section of the configuration.
+        self.loop_mode = Config.get('kivy', 'loop_mode')
+
+        #: .. versionadded:: 1.9.1
+        #:     Maximum time in seconds :meth:`idle_wait` blocks before polling
+        #:     the input providers again. The providers reading input from a
+        #:     thread cannot interrupt the wait, so this is their worst
+        #:     latency in the 'on_demand' loop mode.
+        self.input_poll_timeout = .1
+
     @property
     def touches(self):
         '''Return the list of all touches currently in down or move states.
@@ -314,34 +335,85 @@ class EventLoopBase(EventDispatcher):
         while input_events:
             post_dispatch_input(*pop(0))
 
+    def wake(self):
+        '''Interrupt :meth:`idle_wait`. It is safe to call it from any
+        thread, for example from an input provider reading events in a
+        thread.
+
+        .. versionadded:: 1.9.1
+        '''
+        Clock.wake()
+
+    def idle_wait(self):
+        '''Called by :meth:`idle` in the 'on_demand' loop mode. Blocks until
+        the next :class:`~kivy.clock.Clock` event is due, an input event is
+        available or the window canvas needs to be redrawn, but not longer
+        than :attr:`input_poll_timeout`.
+
+        .. versionadded:: 1.9.1
+        '''
+        # acquire input events first, don't wait with events pending
+        for provider in self.input_providers:
+            provider.update(dispatch_fn=self._dispatch_input)
+        if self.input_events:
+            return
+
+        window = self.window
+        if window is not None and window.canvas.needs_redraw:
+            return
+
+        timeout = self.input_poll_timeout
+        min_timeout = Clock.get_min_timeout()
+        if min_timeout is not None and min_timeout < timeout:
+            timeout = min_timeout
+        if timeout <= 0:
+            return
+
+        if window is not None:
+            window.wait_event(timeout)
+        else:
+            Clock.wait(timeout)
+
     def idle(self):
         '''This function is called after every frame. By default:
 
+           * in the 'on_demand' loop mode, it waits until a frame is needed
+             with :meth:`idle_wait`.
            * it "ticks" the clock to the next frame.
            * it reads all input and dispatches events.
            * it dispatches `on_update`, `on_draw` and `on_flip` events to the
              window.
         '''
 
+        # sleep until something happens
+        if self.loop_mode == 'on_demand':
+            self.idle_wait()
+
         # update dt
         Clock.tick()
 
+        profiler = Clock.profiler
+        phase = self._phase
+
         # read and dispatch input from providers
-        self.dispatch_input()
+        phase(profiler, 'input', self.dispatch_input)
 
         # flush all the canvas operation
-        Builder.sync()
+        phase(profiler, 'sync', Builder.sync)
 
         # tick before draw
         Clock.tick_draw()
 
         # flush all the canvas operation
-        Builder.sync()
+        phase(profiler, 'sync', Builder.sync)
 
         window = self.window
         if window and window.canvas.needs_redraw:
-            window.dispatch('on_draw')
-            window.dispatch('on_flip')
+            phase(profiler, 'draw', window.dispatch, 'on_draw')
+            phase(profiler, 'flip', window.dispatch, 'on_flip')
+
+        if profiler is not None:
+            profiler.end_frame()
 
         # don't loop if we don't have listeners !
         if len(self.event_listeners) == 0:
@@ -352,6 +424,15 @@ class EventLoopBase(EventDispatcher):
 
         return self.quit
 
+    def _phase(self, profiler, name, func, *largs):
+        # call func, recording its duration in the phase name of the profiler
+        if profiler is None:
+            func(*largs)
+            return
+        start = profiler.timer()
+        func(*largs)
+        profiler.add_phase(name, start)
+
     def run(self):
         '''Main loop'''
         while not self.quit:
@@ -22,13 +22,77 @@ timeout of 5 seconds::
 
 If the instance is NULL, the cache may have trashed it because you've
 not used the label for 5 seconds and you've reach the limit.
+
+Each category is kept in least recently used order: when the limit is
+reached, the objects that were not used for the longest time are removed
+first.
+
+The objects with a timeout are kept in a heap ordered by expiry time, so the
+periodic purge only visits the objects that may have expired, whatever the
+number of objects in the cache. When the application lags, for example during
+a long frame, the expiry is delayed by the lag instead of trashing the objects
+used just before it.
+
+Cost budgets
+------------
+
+.. versionadded:: 1.9.1
+
+Besides the number of objects, the cache can be bounded by the cost of the
+objects, for example their memory size. A category registered with a `cost`
+function and a `budget` counts the cost of its objects in that budget, and
+the least recently used objects of all the categories sharing the budget are
+removed when it is exceeded::
+
+    # textures and images share the 'kv.memory' budget, limit it to 256MB
+    Cache.register_budget('kv.memory', 256 * 1024 * 1024)
+
+    # a category with its own budget
+    Cache.register('mycache', cost=len, budget='mycache')
+    Cache.register_budget('mycache', 1024 * 1024)
+
+Statistics
+----------
+
+.. versionadded:: 1.9.1
+
+Each category counts its hits, misses, evictions (objects removed because of
+the limit or the budget) and expirations (objects removed because of the
+timeout). They are returned by :meth:`Cache.get_stats`, along with the number
+of objects and their total cost, which is the size in bytes for the texture
+and image categories of Kivy::
+
+    >>> Cache.get_stats('kv.texture')
+    {'count': 12, 'limit': 1000, 'timeout': 60, 'hits': 240, 'misses': 12,
+     'evictions': 0, 'expirations': 0, 'cost': 3145728,
+     'budget': 'kv.memory'}
+
+A callback can be called for every evicted or expired object, see
+:meth:`Cache.set_on_evict`. The :mod:`~kivy.modules.monitor` module shows
+the statistics of the categories.
 '''
 
 __all__ = ('Cache', )
 
 from os import environ
+from collections import OrderedDict
+from itertools import count
+from heapq import heappush, heappop, heapify
 from kivy.logger import Logger
 from kivy.clock import Clock
+from kivy.compat import PY2
+
+
+# global access order, to find the least recently used object of several
+# categories, as many objects share the same frame time
+_access_order = count()
+
+if PY2:
+    def _move_to_end(objects, key):
+        objects[key] = objects.pop(key)
+else:
+    def _move_to_end(objects, key):
+        objects.move_to_end(key)
 
 
 class Cache(object):
@@ -37,9 +101,20 @@ class Cache(object):
 
     _categories = {}
     _objects = {}
+    _budgets = {}
+
+    # heap of [deadline, order, category, key, item] of the objects with a
+    # timeout. The deadline of an item is only a lower bound, as getting the
+    # object doesn't update the heap: the real deadline is checked when the
+    # entry is popped, and pushed again if the object was used meanwhile.
+    _expiry = []
+
+    # interval of the purge of the expired objects, in seconds
+    _purge_interval = 1
 
     @staticmethod
-    def register(category, limit=None, timeout=None):
+    def register(category, limit=None, timeout=None, cost=None, budget=None,
+                 on_evict=None):
         '''Register a new category in the cache with the specified limit.
 
         :Parameters:
@@ -51,15 +126,102 @@ class Cache(object):
             `timeout` : double (optional)
                 Time after which to delete the object if it has not been used.
                 If None, no timeout is applied.
+            `cost` : callable (optional)
+                Function returning the cost of an object, for example its
+                size in bytes. If None, the objects cost nothing.
+            `budget` : str (optional)
+                Name of the budget the cost of the objects is counted in. See
+                :meth:`register_budget`.
+            `on_evict` : callable (optional)
+                Called for every evicted or expired object, see
+                :meth:`set_on_evict`.
+
+        .. versionchanged:: 1.9.1
+            The `cost`, `budget` and `on_evict` parameters were added, and the
+            `limit` is now enforced by removing the least recently used
+            objects.
         '''
         Cache._categories[category] = {
             'limit': limit,
-            'timeout': timeout}
-        Cache._objects[category] = {}
+            'timeout': timeout,
+            'cost': cost,
+            'budget': budget,
+            'on_evict': on_evict,
+            'total_cost': 0,
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0}
+        Cache._objects[category] = OrderedDict()
+        if budget is not None:
+            Cache._budgets.setdefault(budget, None)
         Logger.debug(
             'Cache: register <%s> with limit=%s, timeout=%s' %
             (category, str(limit), str(timeout)))
 
+    @staticmethod
+    def set_on_evict(category, on_evict):
+        '''Set the callback called when an object of the category is removed
+        by the cache itself, because of its limit, its budget or its timeout.
+        It is called with the arguments `(category, key, obj, reason)`, where
+        `reason` is one of 'limit', 'budget' or 'timeout'. Objects removed
+        with :meth:`remove` are not reported.
+
+        :Parameters:
+            `category` : str
+                Identifier of the category.
+            `on_evict` : callable or None
+                The callback, or None to remove it.
+
+        .. versionadded:: 1.9.1
+        '''
+        Cache._categories[category]['on_evict'] = on_evict
+
+    @staticmethod
+    def get_stats(category=None):
+        '''Get the statistics of a category, as a dict with the keys `count`,
+        `limit`, `timeout`, `hits`, `misses`, `evictions`, `expirations`,
+        `cost` and `budget`. If `category` is None, return a dict of the
+        statistics of every category.
+
+        .. versionadded:: 1.9.1
+        '''
+        if category is None:
+            return dict((category, Cache.get_stats(category))
+                        for category in Cache._categories)
+        cat = Cache._categories[category]
+        return {
+            'count': len(Cache._objects[category]),
+            'limit': cat['limit'],
+            'timeout': cat['timeout'],
+            'hits': cat['hits'],
+            'misses': cat['misses'],
+            'evictions': cat['evictions'],
+            'expirations': cat['expirations'],
+            'cost': cat['total_cost'],
+            'budget': cat['budget']}
+
+    @staticmethod
+    def register_budget(budget, max_cost=None):
+        '''Set the maximum total cost of the objects of the categories
+        registered with this `budget`. When it is exceeded, the least recently
+        used objects of these categories are removed.
+
+        :Parameters:
+            `budget` : str
+                Name of the budget.
+            `max_cost` : int (optional)
+                Maximum total cost. If None, no limit is applied.
+
+        Kivy registers the 'kv.texture' and 'kv.image' categories in the
+        'kv.memory' budget, with the texture and image data sizes in bytes as
+        cost. It is not limited by default.
+
+        .. versionadded:: 1.9.1
+        '''
+        Cache._budgets[budget] = max_cost
+        Cache._purge_budget(budget)
+
     @staticmethod
     def append(category, key, obj, timeout=None):
         '''Add a new object to the cache.
@@ -84,15 +246,34 @@ class Cache(object):
             Logger.warning('Cache: category <%s> not exist' % category)
             return
         timeout = timeout or cat['timeout']
-        # FIXME: activate purge when limit is hit
-        #limit = cat['limit']
-        #if limit is not None and len(Cache._objects[category]) >= limit:
-        #    Cache._purge_oldest(category)
-        Cache._objects[category][key] = {
+        objects = Cache._objects[category]
+
+        # replacing an object moves it to the most recently used end
+        old = objects.pop(key, None)
+        if old is not None:
+            cat['total_cost'] -= old['cost']
+
+        cost = cat['cost']
+        cost = cost(obj) if cost is not None else 0
+        curtime = Clock.get_time()
+        order = next(_access_order)
+        objects[key] = item = {
             'object': obj,
             'timeout': timeout,
-            'lastaccess': Clock.get_time(),
-            'timestamp': Clock.get_time()}
+            'lastaccess': curtime,
+            'timestamp': curtime,
+            'cost': cost,
+            'order': order}
+        cat['total_cost'] += cost
+        if timeout is not None:
+            heappush(Cache._expiry,
+                     (curtime + timeout, order, category, key, item))
+
+        limit = cat['limit']
+        if limit is not None and len(objects) > limit:
+            Cache._purge_oldest(category, len(objects) - limit)
+        if cat['budget'] is not None:
+            Cache._purge_budget(cat['budget'])
 
     @staticmethod
     def get(category, key, default=None):
@@ -107,10 +288,17 @@ class Cache(object):
                 Default value to be returned if the key is not found.
         '''
         try:
-            Cache._objects[category][key]['lastaccess'] = Clock.get_time()
-            return Cache._objects[category][key]['object']
+            objects = Cache._objects[category]
+            item = objects[key]
         except Exception:
+            if category in Cache._categories:
+                Cache._categories[category]['misses'] += 1
             return default
+        Cache._categories[category]['hits'] += 1
+        item['lastaccess'] = Clock.get_time()
+        item['order'] = next(_access_order)
+        _move_to_end(objects, key)
+        return item['object']
 
     @staticmethod
     def get_timestamp(category, key, default=None):
@@ -158,77 +346,123 @@ class Cache(object):
                 arguement is not supplied, the entire category will be purged.
         '''
         try:
+            cat = Cache._categories[category]
             if key is not None:
-                del Cache._objects[category][key]
+                item = Cache._objects[category].pop(key)
+                cat['total_cost'] -= item['cost']
             else:
-                Cache._objects[category] = {}
+                Cache._objects[category] = OrderedDict()
+                cat['total_cost'] = 0
         except Exception:
             pass
 
+    @staticmethod
+    def _restore(category, objects):
+        # put back the objects saved before removing the category, the
+        # objects added meanwhile take precedence
+        objects.update(Cache._objects[category])
+        Cache._objects[category] = objects
+        Cache._categories[category]['total_cost'] = sum(
+            item['cost'] for item in objects.values())
+
     @staticmethod
     def _purge_oldest(category, maxpurge=1):
-        print('PURGE', category)
-        import heapq
-        heap_list = []
-        for key in Cache._objects[category]:
-            obj = Cache._objects[category][key]
-            if obj['lastaccess'] == obj['timestamp']:
-                continue
-            heapq.heappush(heap_list, (obj['lastaccess'], key))
-            print('<<<', obj['lastaccess'])
-        n = 0
-        while n < maxpurge:
-            try:
-                lastaccess, key = heapq.heappop(heap_list)
-                print('=>', key, lastaccess, Clock.get_time())
-            except Exception:
-                return
-            del Cache._objects[category][key]
+        # the objects are kept in least recently used order
+        objects = Cache._objects[category]
+        while maxpurge > 0 and objects:
+            key, item = objects.popitem(last=False)
+            Cache._evicted(category, key, item, 'limit')
+            maxpurge -= 1
+
+    @staticmethod
+    def _evicted(category, key, item, reason):
+        cat = Cache._categories[category]
+        cat['total_cost'] -= item['cost']
+        if reason == 'timeout':
+            cat['expirations'] += 1
+        else:
+            cat['evictions'] += 1
+        on_evict = cat['on_evict']
+        if on_evict is not None:
+            on_evict(category, key, item['object'], reason)
+
+    @staticmethod
+    def _purge_budget(budget):
+        max_cost = Cache._budgets.get(budget)
+        if max_cost is None:
+            return
+        categories = [category for category, cat in Cache._categories.items()
+                      if cat['budget'] == budget]
+        total_cost = sum(Cache._categories[category]['total_cost']
+                         for category in categories)
+        objects = Cache._objects
+        while total_cost > max_cost:
+            # remove the least recently used object of all the categories
+            oldest = None
+            for category in categories:
+                if not objects[category]:
+                    continue
+                item = next(iter(objects[category].values()))
+                if oldest is None or item['order'] < order:
+                    oldest = category
+                    order = item['order']
+            if oldest is None:
+                break
+            key, item = objects[oldest].popitem(last=False)
+            Cache._evicted(oldest, key, item, 'budget')
+            total_cost -= item['cost']
 
     @staticmethod
     def _purge_by_timeout(dt):
         curtime = Clock.get_time()
-
-        for category in Cache._objects:
-            if category not in Cache._categories:
+        # the time the purge was late, because a frame took a long time. The
+        # objects are given that much more time, so the ones used just before
+        # the lag are not trashed.
+        lag = max(0., dt - Cache._purge_interval)
+        expiry = Cache._expiry
+        objects = Cache._objects
+        pending = []
+
+        while expiry and expiry[0][0] <= curtime:
+            entry = heappop(expiry)
+            category, key, item = entry[2:]
+            if objects.get(category, {}).get(key) is not item:
+                # removed or replaced meanwhile
                 continue
-            timeout = Cache._categories[category]['timeout']
-            if timeout is not None and dt > timeout:
-                # XXX got a lag ! that may be because the frame take lot of
-                # time to draw. and the timeout is not adapted to the current
-                # framerate. So, increase the timeout by two.
-                # ie: if the timeout is 1 sec, and framerate go to 0.7, newly
-                # object added will be automaticly trashed.
-                timeout *= 2
-                Cache._categories[category]['timeout'] = timeout
+            deadline = item['lastaccess'] + item['timeout']
+            if deadline > curtime - lag:
+                # used since the entry was pushed, or within the lag
+                pending.append((max(deadline, curtime), entry[1],
+                                category, key, item))
                 continue
+            del objects[category][key]
+            Cache._evicted(category, key, item, 'timeout')
 
-            for key in list(Cache._objects[category].keys())[:]:
-                lastaccess = Cache._objects[category][key]['lastaccess']
-                objtimeout = Cache._objects[category][key]['timeout']
-
-                # take the object timeout if available
-                if objtimeout is not None:
-                    timeout = objtimeout
-
-                # no timeout, cancel
-                if timeout is None:
-                    continue
+        for entry in pending:
+            heappush(expiry, entry)
 
-                if curtime - lastaccess > timeout:
-                    del Cache._objects[category][key]
+        # drop the entries of the objects removed by other means, when they
+        # are the majority of the heap
+        size = sum(len(category) for category in objects.values())
+        if len(expiry) > 2 * size + 1024:
+            expiry[:] = [entry for entry in expiry
+                         if objects.get(entry[2], {}).get(entry[3])
+                         is entry[4]]
+            heapify(expiry)
 
     @staticmethod
     def print_usage():
         '''Print the cache usage to the console.'''
         print('Cache usage :')
         for category in Cache._categories:
-            print(' * %s : %d / %s, timeout=%s' % (
-                category.capitalize(),
-                len(Cache._objects[category]),
-                str(Cache._categories[category]['limit']),
-                str(Cache._categories[category]['timeout'])))
+            stats = Cache.get_stats(category)
+            print(' * %s : %d / %s, timeout=%s, cost=%d, hits=%d, misses=%d, '
+                  'evictions=%d, expirations=%d' % (
+                      category.capitalize(), stats['count'],
+                      str(stats['limit']), str(stats['timeout']),
+                      stats['cost'], stats['hits'], stats['misses'],
+                      stats['evictions'], stats['expirations']))
 
 if 'KIVY_DOC_INCLUDE' not in environ:
     # install the schedule clock for purging
-    Clock.schedule_interval(Cache._purge_by_timeout, 1)
+    Clock.schedule_interval(Cache._purge_by_timeout, Cache._purge_interval)
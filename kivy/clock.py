@@ -157,6 +157,29 @@ Even if x and y changes within one frame, the callback is only run once.
     :meth:`ClockBase.create_trigger` also has a timeout parameter that
     behaves exactly like :meth:`ClockBase.schedule_once`.
 
+On demand loop
+--------------
+
+.. versionadded:: 1.9.1
+
+By default, the event loop runs at the `maxfps` rate of the `graphics`
+configuration section, even when nothing changes. When the `loop_mode`
+configuration token of the `kivy` section is set to `on_demand`, the
+:class:`~kivy.base.EventLoopBase` instead blocks between frames until the
+next scheduled event is due (see :meth:`ClockBase.get_min_timeout`), an input
+event arrives or the window canvas is flagged for a redraw. Scheduling an
+event from another thread wakes the loop up through :meth:`ClockBase.wake`,
+which also interrupts the wait on the event queue of the window (SDL2).
+
+Profiling
+---------
+
+.. versionadded:: 1.9.1
+
+When a :class:`~kivy.profiler.FrameProfiler` is set as the
+:attr:`ClockBase.profiler`, the duration of each clock callback is recorded,
+together with the other phases of the frame. See :mod:`kivy.profiler`.
+
 Threading
 ----------
 
@@ -212,6 +235,9 @@ __all__ = ('Clock', 'ClockBase', 'ClockEvent', 'mainthread')
 from sys import platform
 from os import environ
 from functools import wraps, partial
+from heapq import heappush, heappop, heapify
+from itertools import count
+from threading import Lock, Event
 from kivy.context import register_context
 from kivy.weakmethod import WeakMethod
 from kivy.config import Config
@@ -267,10 +293,15 @@ except (OSError, ImportError):
             _default_sleep(microseconds / 1000000.)
 
 
-def _hash(cb):
-    if hasattr(cb, '__self__') and cb.__self__ is not None:
-        return (id(cb.__self__) & 0xFF00) >> 8
-    return (id(cb) & 0xFF00) >> 8
+def _callback_id(cb):
+    # identify a callback the way == compares them, without keeping a
+    # reference to it: bound methods are equal if they bind the same function
+    # to the same object, any other callable is only equal to itself
+    obj = getattr(cb, '__self__', None)
+    if obj is not None:
+        func = getattr(cb, '__func__', None)
+        return id(obj), id(func) if func is not None else cb.__name__
+    return id(cb)
 
 
 class ClockEvent(object):
@@ -295,8 +326,11 @@ class ClockEvent(object):
         self._is_triggered = trigger
         self._last_dt = starttime
         self._dt = 0.
+        # the entry of this event in the clock queues, if scheduled. It is
+        # the handle used to cancel or tick the event in constant time.
+        self._entry = None
         if trigger:
-            clock._events[cid].append(self)
+            clock._add_event(self)
 
     def __call__(self, *largs):
         ''' Schedules the callback associated with this instance.
@@ -307,7 +341,7 @@ class ClockEvent(object):
             self._is_triggered = True
             # update starttime
             self._last_dt = self.clock._last_tick
-            self.clock._events[self.cid].append(self)
+            self.clock._add_event(self)
             return True
 
     def get_callback(self):
@@ -323,40 +357,47 @@ class ClockEvent(object):
     def is_triggered(self):
         return self._is_triggered
 
+    @property
+    def deadline(self):
+        '''The clock time after which the event is due. The clock considers
+        an event due 5ms before its exact timeout, to increase the accuracy
+        of the timing of animations for example.
+
+        .. versionadded:: 1.9.1
+        '''
+        return self._last_dt + self.timeout - 0.005
+
     def cancel(self):
         ''' Cancels the callback if it was scheduled to be called.
         '''
         if self._is_triggered:
             self._is_triggered = False
-            try:
-                self.clock._events[self.cid].remove(self)
-            except ValueError:
-                pass
+            self.clock._remove_event(self)
 
     def release(self):
         self.weak_callback = WeakMethod(self.callback)
         self.callback = None
 
-    def tick(self, curtime, remove):
-        # timeout happened ? (check also if we would miss from 5ms) this
-        # 5ms increase the accuracy if the timing of animation for
-        # example.
-        if curtime - self._last_dt < self.timeout - 0.005:
-            return True
+    def tick(self, curtime):
+        # the clock only ticks due events, so the entry is consumed now. The
+        # entry is shared by the clock queues, so the event cannot be ticked
+        # twice.
+        entry = self._entry
+        if entry is not None:
+            entry[2] = None
+            self._entry = None
 
         # calculate current timediff for this event
         self._dt = curtime - self._last_dt
         self._last_dt = curtime
         loop = self.loop
+        clock = self.clock
 
         # get the callback
         callback = self.get_callback()
         if callback is None:
             self._is_triggered = False
-            try:
-                remove(self)
-            except ValueError:
-                pass
+            clock._remove_event(self)
             return False
 
         # if it's a trigger, allow to retrigger inside the callback
@@ -365,23 +406,26 @@ class ClockEvent(object):
         # result in the removal of the re-trigger
         if not loop:
             self._is_triggered = False
-            try:
-                remove(self)
-            except ValueError:
-                pass
+            clock._remove_event(self)
 
         # call the callback
         ret = callback(self._dt)
 
+        if not loop:
+            return False
+
         # if the user returns False explicitly, remove the event
-        if loop and ret is False:
-            self._is_triggered = False
-            try:
-                remove(self)
-            except ValueError:
-                pass
+        if ret is False:
+            if self._is_triggered:
+                self._is_triggered = False
+                clock._remove_event(self)
             return False
-        return loop
+
+        # reschedule the interval, unless the callback canceled it or
+        # canceled and re-triggered it
+        if self._is_triggered and self._entry is None:
+            clock._push_event(self)
+        return True
 
     def __repr__(self):
         return '<ClockEvent callback=%r>' % self.get_callback()
@@ -392,8 +436,11 @@ class ClockBase(_ClockBase):
     '''
     __slots__ = ('_dt', '_last_fps_tick', '_last_tick', '_fps', '_rfps',
                  '_start_tick', '_fps_counter', '_rfps_counter', '_events',
-                 '_frames', '_frames_displayed',
-                 '_max_fps', 'max_iteration')
+                 '_events_next', '_events_before_frame', '_events_by_id',
+                 '_new_events',
+                 '_dead_entries', '_seq', '_lock', '_sleeping', '_wake',
+                 '_wake_fn', '_frames', 'profiler',
+                 '_frames_displayed', '_max_fps', 'max_iteration')
 
     MIN_SLEEP = 0.005
     SLEEP_UNDERSHOOT = MIN_SLEEP - 0.001
@@ -409,9 +456,35 @@ class ClockBase(_ClockBase):
         self._last_fps_tick = None
         self._frames = 0
         self._frames_displayed = 0
-        self._events = [[] for i in range(256)]
+        # heap of [deadline, seq, event] entries of the events with a
+        # positive timeout, ordered by deadline. A canceled entry is not
+        # removed from the heap, its event is just set to None and it is
+        # dropped when popped.
+        self._events = []
+        # entries of the events with a timeout <= 0, due on the next tick
+        self._events_next = []
+        # entries of the events scheduled with a timeout of -1
+        self._events_before_frame = []
+        # scheduled events (as a dict used as an ordered set) by id of their
+        # callback, used by unschedule
+        self._events_by_id = {}
+        # events that still hold a direct reference to their callback
+        self._new_events = []
+        self._dead_entries = 0
+        self._seq = count()
+        self._lock = Lock()
+        # set when an event is scheduled while the clock is in wait()
+        self._sleeping = False
+        self._wake = Event()
+        # interrupts the wait_fn given to wait(), if any
+        self._wake_fn = None
         self._max_fps = float(Config.getint('graphics', 'maxfps'))
 
+        #: .. versionadded:: 1.9.1
+        #:     A :class:`~kivy.profiler.FrameProfiler` recording the frame
+        #:     timings, or None (the default) to not profile.
+        self.profiler = None
+
         #: .. versionadded:: 1.0.5
         #:     When a schedule_once is used with -1, you can add a limit on
         #:     how iteration will be allowed. That is here to prevent too much
@@ -461,6 +534,12 @@ class ClockBase(_ClockBase):
                 usleep(1000000 * (sleeptime - sleep_undershoot))
                 sleeptime = 1 / fps - (self.time() - self._last_tick)
 
+        # the frame starts now, the sleep is not part of it
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_frame()
+            start = profiler.timer()
+
         # tick the current time
         current = self.time()
         self._dt = current - self._last_tick
@@ -482,12 +561,21 @@ class ClockBase(_ClockBase):
         # process event
         self._process_events()
 
+        if profiler is not None:
+            profiler.add_phase('clock', start)
+
         return self._dt
 
     def tick_draw(self):
         '''Tick the drawing counter.
         '''
-        self._process_events_before_frame()
+        profiler = self.profiler
+        if profiler is None:
+            self._process_events_before_frame()
+        else:
+            start = profiler.timer()
+            self._process_events_before_frame()
+            profiler.add_phase('before_frame', start)
         self._rfps_counter += 1
         self._frames_displayed += 1
 
@@ -513,6 +601,68 @@ class ClockBase(_ClockBase):
         '''Get the time in seconds from the application start.'''
         return self._last_tick - self._start_tick
 
+    def get_min_timeout(self):
+        '''Get the time in seconds until the next scheduled event is due. It
+        returns 0 if an event is due on the next tick and None if no event is
+        scheduled.
+
+        .. versionadded:: 1.9.1
+        '''
+        with self._lock:
+            for entry in self._events_next:
+                if entry[2] is not None:
+                    return 0.
+            events = self._events
+            # drop the canceled entries hiding the next deadline
+            while events and events[0][2] is None:
+                heappop(events)
+            if not events:
+                return None
+            deadline = events[0][0]
+        return max(0., deadline - self.time())
+
+    def wait(self, timeout=None, wait_fn=None, wake_fn=None):
+        '''Block until the next scheduled event is due, or at most `timeout`
+        seconds if not None. The wait is interrupted if an event is scheduled
+        meanwhile, e.g. from another thread, or if :meth:`wake` is called.
+
+        A window with its own event queue passes `wait_fn` and `wake_fn` to
+        wait on it instead: `wait_fn(timeout)` blocks and `wake_fn()` must
+        interrupt it from any thread. `timeout` must not be None then.
+
+        .. versionadded:: 1.9.1
+        '''
+        wake = self._wake
+        # set before flagging the clock as sleeping, for wake() to find it
+        self._wake_fn = wake_fn
+        self._sleeping = True
+        try:
+            # computed after flagging the clock as sleeping, so that an event
+            # scheduled in between either is found here or wakes us up
+            due = self.get_min_timeout()
+            if due is not None and (timeout is None or due < timeout):
+                timeout = due
+            if timeout is None or timeout > 0:
+                if wait_fn is None:
+                    wake.wait(timeout)
+                else:
+                    wait_fn(timeout)
+        finally:
+            self._sleeping = False
+            self._wake_fn = None
+            wake.clear()
+
+    def wake(self):
+        '''Interrupt the current or the next :meth:`wait`. It is safe to call
+        it from any thread.
+
+        .. versionadded:: 1.9.1
+        '''
+        self._wake.set()
+        wake_fn = self._wake_fn
+        if wake_fn is not None:
+            wake_fn()
+
     def create_trigger(self, callback, timeout=0):
         '''Create a Trigger event. Check module documentation for more
         information.
@@ -524,7 +674,8 @@ class ClockBase(_ClockBase):
 
         .. versionadded:: 1.0.5
         '''
-        ev = ClockEvent(self, False, callback, timeout, 0, _hash(callback))
+        ev = ClockEvent(self, False, callback, timeout, 0,
+                        _callback_id(callback))
         ev.release()
         return ev
 
@@ -545,8 +696,9 @@ class ClockBase(_ClockBase):
         if not callable(callback):
             raise ValueError('callback must be a callable, got %s' % callback)
         event = ClockEvent(
-            self, False, callback, timeout, self._last_tick, _hash(callback),
-            True)
+            self, False, callback, timeout, self._last_tick,
+            _callback_id(callback), True)
+        self._new_events.append(event)
         return event
 
     def schedule_interval(self, callback, timeout):
@@ -561,8 +713,9 @@ class ClockBase(_ClockBase):
         if not callable(callback):
             raise ValueError('callback must be a callable, got %s' % callback)
         event = ClockEvent(
-            self, True, callback, timeout, self._last_tick, _hash(callback),
-            True)
+            self, True, callback, timeout, self._last_tick,
+            _callback_id(callback), True)
+        self._new_events.append(event)
         return event
 
     def unschedule(self, callback, all=True):
@@ -580,64 +733,155 @@ class ClockBase(_ClockBase):
                 callable will be unscheduled (i.e. if this callable was
                 scheduled multiple times). Defaults to `True`.
 
+        Unscheduling a :class:`ClockEvent` is done in constant time, so you
+        should keep the event returned when scheduling the callback and
+        unschedule that rather than the callable.
+
         .. versionchanged:: 1.9.0
             The all parameter was added. Before, it behaved as if `all` was
             `True`.
+
+        .. versionchanged:: 1.9.1
+            The events of a callable are found without comparing callbacks:
+            a bound method matches the events of the same method of the same
+            object, any other callable only matches itself.
         '''
         if isinstance(callback, ClockEvent):
             callback.cancel()
+            return
+
+        events = self._events_by_id.get(_callback_id(callback))
+        if not events:
+            return
+        if all:
+            for ev in list(events):
+                ev.cancel()
+        else:
+            for ev in list(events):
+                # a dead callback could share the id of a new one
+                if ev.get_callback() is not None:
+                    ev.cancel()
+                    break
+
+    def _add_event(self, event):
+        entry = [event.deadline, next(self._seq), event]
+        event._entry = entry
+        with self._lock:
+            events = self._events_by_id.get(event.cid)
+            if events is None:
+                events = self._events_by_id[event.cid] = {}
+            events[event] = None
+            self._push_entry(entry, event.timeout)
+        if self._sleeping:
+            self.wake()
+
+    def _push_event(self, event):
+        entry = [event.deadline, next(self._seq), event]
+        event._entry = entry
+        with self._lock:
+            self._push_entry(entry, event.timeout)
+
+    def _push_entry(self, entry, timeout):
+        # events that are due on the next tick don't need to be ordered,
+        # re-arming a trigger is then a constant time append
+        if timeout > 0:
+            heappush(self._events, entry)
         else:
-            if all:
-                for ev in self._events[_hash(callback)][:]:
-                    if ev.get_callback() == callback:
-                        ev.cancel()
-            else:
-                for ev in self._events[_hash(callback)][:]:
-                    if ev.get_callback() == callback:
-                        ev.cancel()
-                        break
+            self._events_next.append(entry)
+            if timeout == -1:
+                self._events_before_frame.append(entry)
+
+    def _remove_event(self, event):
+        with self._lock:
+            entry = event._entry
+            if entry is not None:
+                entry[2] = None
+                event._entry = None
+                if event.timeout > 0:
+                    self._dead_entries += 1
+            events = self._events_by_id.get(event.cid)
+            if events is not None:
+                events.pop(event, None)
+                if not events:
+                    del self._events_by_id[event.cid]
 
     def _release_references(self):
         # call that function to release all the direct reference to any
         # callback and replace it with a weakref
-        events = self._events
-        for events in self._events:
-            for event in events[:]:
-                if event.callback is not None:
-                    event.release()
+        events, self._new_events = self._new_events, []
+        for event in events:
+            if event.callback is not None:
+                event.release()
+
+    def _compact_events(self):
+        # drop the canceled entries once they make up half of the heap, so
+        # that re-armed triggers cannot grow it without bound. Called with
+        # the lock held.
+        events = [entry for entry in self._events if entry[2] is not None]
+        heapify(events)
+        self._events = events
+        self._dead_entries = 0
 
     def _process_events(self):
-        for events in self._events:
-            remove = events.remove
-            for event in events[:]:
-                # event may be already removed from original list
-                if event in events:
-                    event.tick(self._last_tick, remove)
+        # only visit the events that are due, the others stay in the heap.
+        # Events scheduled by the callbacks are processed on the next tick.
+        # The heap is shared with the threads scheduling events, it is only
+        # changed with the lock held.
+        curtime = self._last_tick
+        with self._lock:
+            if self._dead_entries > 64 and \
+                    self._dead_entries > len(self._events) >> 1:
+                self._compact_events()
+            due, self._events_next = self._events_next, []
+            events = self._events
+            while events and events[0][0] <= curtime:
+                entry = heappop(events)
+                if entry[2] is not None:
+                    due.append(entry)
+
+        self._tick_entries(due, curtime)
 
     def _process_events_before_frame(self):
-        found = True
         count = self.max_iteration
-        events = self._events
-        while found:
+        while True:
+            # take the events that have timeout = -1
+            with self._lock:
+                entries = self._events_before_frame
+                if not entries:
+                    break
+                self._events_before_frame = []
+
             count -= 1
             if count == -1:
                 Logger.critical(
                     'Clock: Warning, too much iteration done before'
                     ' the next frame. Check your code, or increase'
                     ' the Clock.max_iteration attribute')
+                with self._lock:
+                    self._events_before_frame[:0] = entries
                 break
 
-            # search event that have timeout = -1
-            found = False
-            for events in self._events:
-                remove = events.remove
-                for event in events[:]:
-                    if event.timeout != -1:
-                        continue
-                    found = True
-                    # event may be already removed from original list
-                    if event in events:
-                        event.tick(self._last_tick, remove)
+            self._tick_entries(entries, self._last_tick)
+
+    def _tick_entries(self, entries, curtime):
+        profiler = self.profiler
+        if profiler is None:
+            for entry in entries:
+                # event may be already canceled by a previous callback
+                event = entry[2]
+                if event is not None:
+                    event.tick(curtime)
+            return
+
+        timer = profiler.timer
+        callback_name = profiler.callback_name
+        for entry in entries:
+            event = entry[2]
+            if event is not None:
+                name = callback_name(event.get_callback())
+                start = timer()
+                event.tick(curtime)
+                profiler.add_callback(name, start)
 
     time = staticmethod(partial(_default_time))
 
@@ -76,6 +76,11 @@ Available configuration tokens
         Set the minimum log level to use.
     `log_name`: string
         Format string to use for the filename of log file.
+    `loop_mode`: string, one of 'default' or 'on_demand'
+        With 'default', the main loop runs at `maxfps` even when nothing
+        changes. With 'on_demand', the main loop sleeps until the next
+        scheduled :class:`~kivy.clock.Clock` event, an input event or a
+        canvas update. Defaults to 'default'.
     `window_icon`: string
         Path of the window icon. Use this if you want to replace the default
         pygame icon.
@@ -279,7 +284,7 @@ from weakref import ref
 _is_rpi = exists('/opt/vc/include/bcm_host.h')
 
 # Version number of current configuration format
-KIVY_CONFIG_VERSION = 13
+KIVY_CONFIG_VERSION = 14
 
 Config = None
 '''Kivy configuration object. Its :attr:`~kivy.config.ConfigParser.name` is
@@ -752,6 +757,9 @@ if not environ.get('KIVY_DOC_INCLUDE'):
         elif version == 12:
             Config.set('graphics', 'window_state', 'visible')
 
+        elif version == 13:
+            Config.setdefault('kivy', 'loop_mode', 'default')
+
         #elif version == 1:
         #   # add here the command for upgrading from configuration 0 to 1
         #
@@ -58,8 +58,42 @@ from io import BytesIO
 Texture = TextureRegion = None
 
 
+# bytes per pixel of the uncompressed texture formats, the compressed ones
+# are counted as 1 byte per pixel
+_fmt_bpp = {'rgba': 4, 'bgra': 4, 'rgb': 3, 'bgr': 3, 'luminance_alpha': 2,
+            'luminance': 1, 'alpha': 1, 'red': 1}
+
+
+def texture_cost(texture):
+    '''Return the memory size of a texture in bytes, used as its cost in the
+    'kv.texture' :class:`~kivy.cache.Cache` category. The texture regions
+    share the memory of their owner and cost nothing.
+
+    .. versionadded:: 1.9.1
+    '''
+    if isinstance(texture, TextureRegion):
+        return 0
+    width, height = texture.size
+    return width * height * _fmt_bpp.get(texture.colorfmt, 1)
+
+
+def image_cost(image):
+    '''Return the size in bytes of the decoded image data kept by an image,
+    used as its cost in the 'kv.image' :class:`~kivy.cache.Cache` category.
+
+    .. versionadded:: 1.9.1
+    '''
+    cost = 0
+    for imagedata in getattr(image, '_data', None) or ():
+        for mipmap in imagedata.mipmaps.values():
+            data = mipmap[2]
+            if data is not None:
+                cost += getattr(data, 'nbytes', None) or len(data)
+    return cost
+
+
 # register image caching only for keep_data=True
-Cache.register('kv.image', timeout=60)
+Cache.register('kv.image', timeout=60, cost=image_cost, budget='kv.memory')
 Cache.register('kv.atlas')
 
 
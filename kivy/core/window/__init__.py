@@ -771,6 +771,8 @@ class WindowBase(EventDispatcher):
 
             # create the render context and canvas, only the first time.
             from kivy.graphics import RenderContext, Canvas
+            from kivy.graphics.context import get_context
+            self._gl_context = get_context()
             self.render_context = RenderContext()
             self.canvas = Canvas()
             self.render_context.add(self.canvas)
@@ -793,6 +795,21 @@ class WindowBase(EventDispatcher):
         # ensure the gl viewport is correct
         self.update_viewport()
 
+    def wait_event(self, timeout):
+        '''Block until an event is available for the window, or at most
+        `timeout` seconds. It is used by the
+        :class:`~kivy.base.EventLoopBase` in the 'on_demand' loop mode.
+
+        The default implementation waits on the :class:`~kivy.clock.Clock`;
+        window providers with an event queue should override it, and pass
+        to :meth:`~kivy.clock.ClockBase.wait` the functions waiting on their
+        queue and interrupting that wait, so that an event scheduled from
+        another thread still wakes the loop up.
+
+        .. versionadded:: 1.9.1
+        '''
+        Clock.wait(timeout)
+
     def on_flip(self):
         '''Flip between buffers (event)'''
         self.flip()
@@ -812,6 +829,9 @@ class WindowBase(EventDispatcher):
             self.canvas.after if canvas == 'after' else self.canvas
         canvas.add(widget.canvas)
         self.update_childsize([widget])
+        # late import to avoid a circular import
+        from kivy.lang import Builder
+        Builder.build_deferred_canvas(widget)
         widget.bind(
             pos_hint=self._update_childsize,
             size_hint=self._update_childsize,
@@ -886,6 +906,8 @@ class WindowBase(EventDispatcher):
         return None
 
     def on_draw(self):
+        # count the GL calls of this frame only, see Context.get_gl_stats()
+        self._gl_context.reset_gl_stats()
         self.clear()
         self.render_context.draw()
 
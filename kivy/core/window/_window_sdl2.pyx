@@ -1,7 +1,7 @@
 include "../../../kivy/lib/sdl2.pxi"
 include "../../../kivy/graphics/config.pxi"
 
-from libc.string cimport memcpy
+from libc.string cimport memcpy, memset
 from os import environ
 
 cdef class _WindowSDL2Storage:
@@ -169,6 +169,22 @@ cdef class _WindowSDL2Storage:
     def is_keyboard_shown(self):
         return SDL_IsTextInputActive()
 
+    def wait_event(self, timeout):
+        # wait for an event without removing it from the queue
+        cdef int ms = int(timeout * 1000)
+        cdef int ret
+        with nogil:
+            ret = SDL_WaitEventTimeout(NULL, ms)
+        return ret == 1
+
+    def wake(self):
+        # interrupt wait_event from any thread, the event is dropped by poll
+        cdef SDL_Event event
+        memset(&event, 0, sizeof(event))
+        event.type = SDL_USEREVENT
+        with nogil:
+            SDL_PushEvent(&event)
+
     def poll(self):
         cdef SDL_Event event
 
@@ -291,6 +291,10 @@ class WindowSDL(WindowBase):
         self._win.flip()
         super(WindowSDL, self).flip()
 
+    def wait_event(self, timeout):
+        # scheduling a Clock event pushes an event to wake SDL up
+        Clock.wait(timeout, self._win.wait_event, self._win.wake)
+
     def _fix_mouse_pos(self, x, y):
         y -= 1
         self.mouse_pos = x, self.system_size[1] - y
@@ -76,9 +76,12 @@ cdef class Buffer:
         cdef int i, block
         cdef void *p
 
-        # Ensure that our buffer is enough for having all the elements
+        # Ensure that our buffer is enough for having all the elements. Grow
+        # at least by half of the current size, to not realloc the buffer of
+        # the instructions rebuilt at each frame on every add.
         if count > self.block_count - self.i_free:
-            self.grow(self.block_count + count)
+            self.grow(max(self.block_count + count,
+                          self.block_count + self.block_count // 2))
 
         # Add all the block inside our buffer
         for i in xrange(count):
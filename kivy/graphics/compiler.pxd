@@ -1,6 +1,9 @@
 cdef class GraphicsCompiler
 
-from instructions cimport InstructionGroup
+from instructions cimport InstructionGroup, VertexInstruction
 
 cdef class GraphicsCompiler:
     cdef InstructionGroup compile(self, InstructionGroup group)
+    cdef void reset_batches(self, InstructionGroup group)
+    cdef void build_batches(self, InstructionGroup group)
+    cdef void set_batch(self, VertexInstruction leader, list members)
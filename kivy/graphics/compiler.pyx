@@ -41,9 +41,55 @@ change the context. We can reduce them to::
     Rectangle: push vertices (x1, y1...) to vbo & draw
 
 This is what the compiler does in the first place, by flagging all the unused
-instruction with GI_IGNORE flag. As soon as a Color content changes, the whole
+instruction with GI_IGNORE flag. As soon as the content of an ignored Color
+changes, or of a Color whose values were repeated by an ignored one, the whole
 InstructionGroup will be recompiled and a previously unused Color might be
-used for the next compilation.
+used for the next compilation. The other Colors are applied with their new
+content, without compiling the group again.
+
+Batching the vertex instructions
+--------------------------------
+
+.. versionadded:: 1.9.1
+
+Each vertex instruction has its own vertices and issues its own draw call.
+Once the context instructions are reduced, the consecutive vertex instructions
+that use the same texture (or textures of the same atlas), the same vertex
+format and a triangles, lines or points mode are batched: their vertices are
+moved into the VBO of the first instruction of the batch, which draws all of
+them in a single call. The other instructions of the batch don't draw anything.
+In the example above, the three Rectangles are drawn with one draw call.
+
+The compilation applies the instructions to reduce them, so its frame still
+draws the vertex instructions one by one, the batches are drawn from the next
+frame. An update of a batched instruction is still written only in its own
+part of the shared VBO, but a change of its mode
+(:attr:`Mesh.mode <kivy.graphics.vertex_instructions.Mesh.mode>`) splits the
+batch and compiles the group again. A batch holds at most 65536 vertices: when
+the new vertices of a batched instruction don't fit anymore, the instruction
+takes back its own VBO and the batches are built again. A batch is stopped by
+any context instruction that really changes the context, by an instruction
+group and by any other instruction, like a
+:class:`~kivy.graphics.instructions.Callback`.
+The number of draw calls can be read from
+:attr:`Context.draw_calls <kivy.graphics.context.Context>`.
+
+The batching can be disabled by setting the `KIVY_GL_BATCHING` environment
+variable to 0.
+
+Incremental updates
+-------------------
+
+.. versionadded:: 1.9.1
+
+The group is compiled again only when its children are added or removed, or
+when a change of its context instructions changes the reduction. When only
+vertex instructions changed, like the position of a Rectangle, the compilation
+is kept and only these instructions are built again, before the group is
+drawn. The context instructions that are applied are updated in place. The
+cost of the update is then proportional to the number of changed instructions,
+not to the size of the group. The compilations and their time are counted, see
+:meth:`Context.get_gl_stats() <kivy.graphics.context.Context.get_gl_stats>`.
 
 
 Note to any Kivy contributor / internal developer:
@@ -59,8 +105,28 @@ Note to any Kivy contributor / internal developer:
 
 include 'opcodes.pxi'
 
-from kivy.graphics.instructions cimport Instruction, RenderContext, ContextInstruction
+from os import environ
+from kivy.graphics.c_opengl cimport GLuint, GL_TRIANGLES, GL_LINES, GL_POINTS
+from kivy.graphics.instructions cimport Instruction, RenderContext, \
+    ContextInstruction, VertexInstruction
 from kivy.graphics.context_instructions cimport BindTexture
+from kivy.graphics.texture cimport Texture
+from kivy.graphics.vbo cimport VBO, VertexBatch, max_batch_vertices
+
+cdef int use_batching = int(environ.get('KIVY_GL_BATCHING', 1))
+
+
+cdef inline int same_texture(Texture a, Texture b):
+    # the regions of an atlas share the texture id of the atlas
+    return a is b or (a._id != 0 and a._id == b._id and
+                      a._target == b._target)
+
+
+cdef inline int can_batch(VertexInstruction vi):
+    cdef GLuint mode = vi.batch.mode
+    return not (vi.flags & GI_NO_BATCH) and (
+        mode == GL_TRIANGLES or mode == GL_LINES or mode == GL_POINTS)
+
 
 cdef class GraphicsCompiler:
     cdef InstructionGroup compile(self, InstructionGroup group):
@@ -69,7 +135,10 @@ cdef class GraphicsCompiler:
         cdef ContextInstruction ci
         cdef RenderContext rc = None, oldrc = None
         cdef dict cs_by_rc = {}
-        cdef list cs
+        cdef dict cs
+
+        if use_batching:
+            self.reset_batches(group)
 
         # Very simple compiler. We will apply all the element in the group.
         # If the render context is not changed between 2 call, we'll think that
@@ -100,14 +169,14 @@ cdef class GraphicsCompiler:
                 ci.apply()
 
                 # whatever happen, flag as needed (ie not ignore this one.)
-                ci.flags &= ~GI_IGNORE
+                ci.flags &= ~(GI_IGNORE | GI_REPEATED)
 
                 # before flag as ignore, we must ensure that all the states
                 # inside this context instruction are not needed at all.
                 # if a state has never been in the cache yet, we can't ignore
                 # it.
                 if rc not in cs_by_rc:
-                    cs = cs_by_rc[rc] = []
+                    cs = cs_by_rc[rc] = {}
                 else:
                     cs = cs_by_rc[rc]
                 needed = 0
@@ -118,33 +187,114 @@ cdef class GraphicsCompiler:
                     # to transfer changes on render context, but use directly
                     # rendercontext.set_texture(). So we have no choice to try the
                     # apply(), and saving in cs, as a texture0
-                    if 'texture0' not in cs:
-                        cs.append('texture0')
-                        needed = 1
+                    states = ('texture0', )
 
                 else:
+                    states = ci.context_state
 
-                    for state in ci.context_state:
-                        if state in cs:
-                            continue
+                for state in states:
+                    if state not in cs:
                         needed = 1
-                        cs.append(state)
 
                 # unflag the instruction only if it's not needed
                 # and if the render context have not been changed
                 if needed == 0 and not (rc.flags & GI_NEEDS_UPDATE):
                     ci.flags |= GI_IGNORE
                     count += 1
+                    # the instructions setting the states we repeat must
+                    # compile the group again when they change.
+                    for state in states:
+                        (<Instruction>cs[state]).flags |= GI_REPEATED
+                else:
+                    for state in states:
+                        cs[state] = ci
             else:
                 if isinstance(c, InstructionGroup):
                     # we have potentially new childs, and them can fuck up our
                     # compilation, so reset our current cache.
                     cs_by_rc = {}
+                # the batches are reset, the vertex instructions are drawn
+                # one by one on this frame.
                 c.apply()
 
         if rc:
             rc.flag_update(0)
 
+        # everything was applied, the group must not be applied again on
+        # this frame: the context instructions would be applied twice.
         group.flags |= GI_NO_APPLY_ONCE
 
+        if use_batching:
+            self.build_batches(group)
+
         return group
+
+    cdef void reset_batches(self, InstructionGroup group):
+        cdef Instruction c
+        cdef VertexInstruction vi
+        for c in group.children:
+            if isinstance(c, VertexInstruction):
+                vi = c
+                vi.batch.set_leader(None)
+                vi.batch.set_members(None)
+
+    cdef void build_batches(self, InstructionGroup group):
+        cdef Instruction c
+        cdef VertexInstruction vi, leader = None
+        cdef VertexBatch batch
+        cdef BindTexture bt
+        cdef VBO vbo = None
+        cdef list members = None
+
+        # Group the consecutive vertex instructions that can be drawn with the
+        # same context, and move their vertices into the VBO of the first one.
+        for c in group.children:
+            if isinstance(c, VertexInstruction):
+                vi = c
+                batch = vi.batch
+                if (leader is not None and can_batch(vi) and
+                        batch.mode == leader.batch.mode and
+                        batch.vbo.vertex_format is vbo.vertex_format and
+                        same_texture(vi.texture_binding._texture,
+                                     leader.texture_binding._texture) and
+                        (batch.vbo is vbo or vbo.data.count() +
+                         batch.vbo_index.count() <= max_batch_vertices)):
+                    batch.set_vbo(vbo)
+                    members.append(batch)
+                    continue
+                self.set_batch(leader, members)
+                leader = None
+                if can_batch(vi):
+                    leader = vi
+                    vbo = batch.vbo
+                    members = []
+                continue
+
+            if leader is None:
+                continue
+
+            if c.flags & GI_CONTEXT_MOD:
+                # the reduced instructions don't change the context
+                if c.flags & GI_IGNORE:
+                    continue
+                if isinstance(c, BindTexture):
+                    bt = c
+                    if bt._index == 0 and same_texture(
+                            bt._texture, leader.texture_binding._texture):
+                        # the texture is already bound for the whole batch
+                        bt.flags |= GI_IGNORE
+                        leader.texture_binding.flags |= GI_REPEATED
+                        continue
+
+            self.set_batch(leader, members)
+            leader = None
+
+        self.set_batch(leader, members)
+
+    cdef void set_batch(self, VertexInstruction leader, list members):
+        cdef VertexBatch batch
+        if leader is None or not members:
+            return
+        leader.batch.set_members(members)
+        for batch in members:
+            batch.set_leader(leader.batch)
@@ -3,6 +3,7 @@ from kivy.graphics.texture cimport Texture
 from kivy.graphics.vbo cimport VBO, VertexBatch
 from kivy.graphics.shader cimport Shader
 from kivy.graphics.fbo cimport Fbo
+from kivy.graphics.c_opengl cimport GLenum
 
 cdef class Context:
     cdef list observers
@@ -19,6 +20,24 @@ cdef class Context:
     cdef object lr_shadersource
     cdef list lr_shader
 
+    cdef public long draw_calls
+    cdef public long texture_binds
+    cdef public long shader_binds
+    cdef public long uniform_uploads
+    cdef public long buffer_uploads
+    cdef public long buffer_upload_bytes
+    cdef public long compilations
+    cdef public long instruction_builds
+    cdef public double compile_time
+
+    # shadow of the GL state, -1 when unknown
+    cdef long gl_program
+    cdef long gl_array_buffer
+    cdef long gl_element_buffer
+    cdef int gl_texture_unit
+    cdef long gl_textures[32]
+    cdef long gl_blend_func[4]
+
     cdef void register_texture(self, Texture texture)
     cdef void register_canvas(self, Canvas canvas)
     cdef void register_fbo(self, Fbo fbo)
@@ -32,5 +51,8 @@ cdef class Context:
 
     cdef object trigger_gl_dealloc
     cdef void flush(self)
+    cdef void reset_gl_state(self)
+    cdef void set_blend_func(self, GLenum src_rgb, GLenum dst_rgb,
+                             GLenum src_alpha, GLenum dst_alpha)
 
 cpdef Context get_context()
@@ -39,6 +39,22 @@ cdef class Context:
     The Context class manages groups of graphics instructions. It can also be used to manage
     observer callbacks. See :meth:`add_reload_observer` and :meth:`remove_reload_observer`
     for more information.
+
+    The GL calls that are the most expensive are counted, see
+    :meth:`get_gl_stats`.
+
+    The context also keeps a shadow of the GL state set by the graphics
+    instructions: the program in use, the bound buffers, the texture bound
+    on each unit and the blend function. The shaders, textures and VBOs use it to skip the GL calls
+    that would not change anything. When you change this state yourself with
+    :mod:`kivy.graphics.opengl`, do it in a
+    :class:`~kivy.graphics.instructions.Callback`, after which the shadow is
+    reset.
+
+    .. versionchanged:: 1.9.1
+        The `draw_calls`, `texture_binds`, `shader_binds`, `uniform_uploads`,
+        `buffer_uploads`, `buffer_upload_bytes`, `compilations`,
+        `instruction_builds` and `compile_time` counters were added.
     """
     def __init__(self):
         self.observers = []
@@ -46,6 +62,7 @@ cdef class Context:
         self.l_texture = []
         self.l_canvas = []
         self.l_fbo = []
+        self.reset_gl_state()
         self.flush()
         self.trigger_gl_dealloc = Clock.create_trigger(self.gl_dealloc, 0)
 
@@ -59,6 +76,33 @@ cdef class Context:
         self.lr_shadersource = array('i')
         self.lr_shader = []
 
+    cdef void reset_gl_state(self):
+        # forget the shadowed state, the next GL calls will be done
+        cdef int i
+        self.gl_program = -1
+        self.gl_array_buffer = -1
+        self.gl_element_buffer = -1
+        self.gl_texture_unit = -1
+        for i in xrange(32):
+            self.gl_textures[i] = -1
+        for i in xrange(4):
+            self.gl_blend_func[i] = -1
+
+    cdef void set_blend_func(self, GLenum src_rgb, GLenum dst_rgb,
+                             GLenum src_alpha, GLenum dst_alpha):
+        # set the blend function, unless the shadowed state says it is
+        # already set
+        if (self.gl_blend_func[0] == src_rgb and
+                self.gl_blend_func[1] == dst_rgb and
+                self.gl_blend_func[2] == src_alpha and
+                self.gl_blend_func[3] == dst_alpha):
+            return
+        glBlendFuncSeparate(src_rgb, dst_rgb, src_alpha, dst_alpha)
+        self.gl_blend_func[0] = src_rgb
+        self.gl_blend_func[1] = dst_rgb
+        self.gl_blend_func[2] = src_alpha
+        self.gl_blend_func[3] = dst_alpha
+
     cdef void register_texture(self, Texture texture):
         self.l_texture.append(ref(texture, self.l_texture.remove))
 
@@ -118,6 +162,55 @@ cdef class Context:
             arr_rb.append(fbo.depthbuffer_id)
             # no need to trigger, depthbuffer required absolutely a buffer.
 
+    def get_gl_stats(self):
+        '''Return the GL calls and the compilations counted since the last
+        :meth:`reset_gl_stats`, as a dict with the keys:
+
+        * `draw_calls`: the glDrawElements of the vertex instructions,
+        * `texture_binds`: the glBindTexture of the textures,
+        * `shader_binds`: the glUseProgram of the shaders,
+        * `uniform_uploads`: the glUniform* of the shaders,
+        * `buffer_uploads`: the vertex and index buffers uploads,
+        * `buffer_upload_bytes`: the size of these uploads, in bytes,
+        * `compilations`: the full compilations of instruction groups by the
+          :mod:`~kivy.graphics.compiler`,
+        * `instruction_builds`: the vertex instructions rebuilt by their
+          group without compiling it again, when only their vertices changed,
+        * `compile_time`: the time spent in these compilations and builds,
+          in seconds.
+
+        The window resets the counters before drawing each frame, so between
+        two frames they count the GL calls of the last frame. Each counter is
+        also an attribute of the context.
+
+        .. versionadded:: 1.9.1
+        '''
+        return {
+            'draw_calls': self.draw_calls,
+            'texture_binds': self.texture_binds,
+            'shader_binds': self.shader_binds,
+            'uniform_uploads': self.uniform_uploads,
+            'buffer_uploads': self.buffer_uploads,
+            'buffer_upload_bytes': self.buffer_upload_bytes,
+            'compilations': self.compilations,
+            'instruction_builds': self.instruction_builds,
+            'compile_time': self.compile_time}
+
+    def reset_gl_stats(self):
+        '''Reset the counters of :meth:`get_gl_stats` to 0.
+
+        .. versionadded:: 1.9.1
+        '''
+        self.draw_calls = 0
+        self.texture_binds = 0
+        self.shader_binds = 0
+        self.uniform_uploads = 0
+        self.buffer_uploads = 0
+        self.buffer_upload_bytes = 0
+        self.compilations = 0
+        self.instruction_builds = 0
+        self.compile_time = 0
+
     def add_reload_observer(self, callback, before=False):
         '''(internal) Add a callback to be called after the whole graphics context has
         been reloaded. This is where you can reupload your custom data into the
@@ -189,6 +282,7 @@ cdef class Context:
         Logger.info('Context: Reloading graphics data...')
         Logger.debug('Context: Collect and flush all garbage')
         self.flush()
+        self.reset_gl_state()
 
         # First step, prevent double loading by setting everything to -1
         # We do this because texture might be loaded in seperate texture at first,
@@ -221,10 +315,8 @@ cdef class Context:
             Logger.trace('Context: << reload region texture %r' % texture)
 
         # Restore texture cache
-        texture_objects.update(Cache._objects['kv.texture'])
-        Cache._objects['kv.texture'] = texture_objects
-        image_objects.update(Cache._objects['kv.image'])
-        Cache._objects['kv.image'] = image_objects
+        Cache._restore('kv.texture', texture_objects)
+        Cache._restore('kv.image', image_objects)
 
         gc_objects = gc.get_objects()[:]
         Logger.debug('Context: Reload vbos')
@@ -261,6 +353,7 @@ cdef class Context:
             callback()(self)
 
         glFinish()
+        self.reset_gl_state()
         dt = time() - start
         Logger.info('Context: Reloading done in %2.4fs' % dt)
 
@@ -313,6 +406,9 @@ cdef class Context:
                 glDeleteProgram(program)
             del self.lr_shader[:]
 
+        # the deleted objects were unbound, and their ids can be reused
+        self.reset_gl_state()
+
 
 cpdef Context get_context():
     global context
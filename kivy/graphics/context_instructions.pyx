@@ -26,7 +26,7 @@ from kivy.graphics.transformation cimport *
 
 from kivy.cache import Cache
 from kivy.resources import resource_find
-from kivy.core.image import Image
+from kivy.core.image import Image, texture_cost
 from kivy.logger import Logger
 
 from os.path import join
@@ -40,7 +40,8 @@ cdef object get_default_texture():
     return DEFAULT_TEXTURE
 
 # register Image cache
-Cache.register('kv.texture', limit=1000, timeout=60)
+Cache.register('kv.texture', limit=1000, timeout=60, cost=texture_cost,
+               budget='kv.memory')
 Cache.register('kv.shader', limit=1000, timeout=3600)
 
 # ensure that our resources are cleaned
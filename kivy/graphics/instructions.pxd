@@ -43,7 +43,9 @@ cdef class InstructionGroup(Instruction):
     cdef public list children
     cdef InstructionGroup compiled_children
     cdef GraphicsCompiler compiler
+    cdef list dirty_children
     cdef void build(self)
+    cdef void flag_child_update(self, Instruction child)
     cdef void reload(self)
     cpdef add(self, Instruction c)
     cpdef insert(self, int index, Instruction c)
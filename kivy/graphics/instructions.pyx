@@ -22,20 +22,21 @@ from kivy.compat import PY2
 from kivy.logger import Logger
 from kivy.graphics.context cimport get_context, Context
 from weakref import proxy
+from timeit import default_timer
 
 
 cdef int _need_reset_gl = 1
-cdef int _active_texture = -1
 cdef list canvas_list = []
 
 cdef void reset_gl_context():
-    global _need_reset_gl, _active_texture
+    global _need_reset_gl
     _need_reset_gl = 0
-    _active_texture = 0
+    cdef Context context = get_context()
     glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-    glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE)
+    context.set_blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE,
+                           GL_ONE)
     glActiveTexture(GL_TEXTURE0)
+    context.gl_texture_unit = 0
     glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
 
 
@@ -67,11 +68,13 @@ cdef class Instruction(ObjectWithUid):
                 raise RuntimeError('Encountered instruction group render loop: %r in %r' % (self, _instrs,))
             if do_parent == 1 and self.parent is not None:
                 instrs.append(self)
+                self.parent.flag_child_update(self)
                 self.parent.flag_update(do_parent=1, _instrs=instrs)
             self.flags |= GI_NEEDS_UPDATE
     ELSE:
         cdef void flag_update(self, int do_parent=1):
             if do_parent == 1 and self.parent is not None:
+                self.parent.flag_child_update(self)
                 self.parent.flag_update()
             self.flags |= GI_NEEDS_UPDATE
 
@@ -140,6 +143,7 @@ cdef class InstructionGroup(Instruction):
         Instruction.__init__(self, **kwargs)
         self.children = list()
         self.compiled_children = None
+        self.dirty_children = list()
         if 'nocompiler' in kwargs:
             self.compiler = None
         else:
@@ -163,13 +167,56 @@ cdef class InstructionGroup(Instruction):
                 c.apply()
 
     cdef void build(self):
-        self.compiled_children = self.compiler.compile(self)
+        cdef Instruction c
+        cdef VertexInstruction vi
+        cdef VBO vbo
+        cdef Context context = get_context()
+        cdef double start = default_timer()
+
+        if self.compiled_children is not None and \
+                not (self.flags & GI_NEEDS_COMPILE):
+            # only vertex data changed, the compilation is still valid: build
+            # the changed vertex instructions before drawing the batches.
+            for c in self.dirty_children:
+                if c.parent is not self or not (c.flags & GI_NEEDS_UPDATE):
+                    continue
+                if isinstance(c, VertexInstruction):
+                    vi = c
+                    vbo = vi.batch.vbo
+                    vi.build()
+                    vi.flag_update_done()
+                    context.instruction_builds += 1
+                    # the batch was too large for its new vertices, and was
+                    # split: build the batches again.
+                    if vi.batch.vbo is not vbo:
+                        self.flags |= GI_NEEDS_COMPILE
+        del self.dirty_children[:]
+        if self.compiled_children is None or self.flags & GI_NEEDS_COMPILE:
+            self.compiled_children = self.compiler.compile(self)
+            self.flags &= ~GI_NEEDS_COMPILE
+            context.compilations += 1
+        context.compile_time += default_timer() - start
         self.flag_update_done()
 
+    cdef void flag_child_update(self, Instruction child):
+        # A context instruction that is applied uses its new values by itself.
+        # But an ignored one might be needed now, and the instructions whose
+        # values were repeated by an ignored one might not be anymore: the
+        # reduction and the batches of the group must be compiled again.
+        # The other instructions are built or applied by themselves and don't
+        # change the compilation.
+        if child.flags & GI_CONTEXT_MOD:
+            if child.flags & (GI_IGNORE | GI_REPEATED):
+                self.flags |= GI_NEEDS_COMPILE
+        elif self.compiler is not None and \
+                not (child.flags & GI_NEEDS_UPDATE):
+            self.dirty_children.append(child)
+
     cpdef add(self, Instruction c):
         '''Add a new :class:`Instruction` to our list.
         '''
         c.radd(self)
+        self.flags |= GI_NEEDS_COMPILE
         self.flag_update()
         return
 
@@ -177,12 +224,14 @@ cdef class InstructionGroup(Instruction):
         '''Insert a new :class:`Instruction` into our list at index.
         '''
         c.rinsert(self, index)
+        self.flags |= GI_NEEDS_COMPILE
         self.flag_update()
 
     cpdef remove(self, Instruction c):
         '''Remove an existing :class:`Instruction` from our list.
         '''
         c.rremove(self)
+        self.flags |= GI_NEEDS_COMPILE
         self.flag_update()
 
     def indexof(self, Instruction c):
@@ -224,6 +273,7 @@ cdef class InstructionGroup(Instruction):
 
     cdef void reload(self):
         Instruction.reload(self)
+        self.flags |= GI_NEEDS_COMPILE
         cdef Instruction c
         for c in self.children:
             c.reload()
@@ -478,14 +528,17 @@ cdef class Callback(Instruction):
         if self.func(self):
             self.flag_update_done()
 
+        # the callback may have changed any GL state
+        get_context().reset_gl_state()
+
         if self._reset_context:
             # FIXME do that in a proper way
             glDisable(GL_DEPTH_TEST)
             glDisable(GL_CULL_FACE)
             glDisable(GL_SCISSOR_TEST)
             glEnable(GL_BLEND)
-            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-            glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE)
+            get_context().set_blend_func(
+                GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE)
             glUseProgram(0)
 
             # FIXME don't use 10. use max texture available from gl conf
@@ -505,6 +558,7 @@ cdef class Callback(Instruction):
                 shader.bind_vertex_format(None)
 
             # force binding again all our textures.
+            ctx.reset_gl_state()
             rcx = getActiveContext()
             shader = rcx._shader
             rcx.enter()
@@ -616,10 +670,12 @@ cdef class Canvas(CanvasBase):
             c.radd(self)
         else:
             c.rinsert(self, -1)
+        self.flags |= GI_NEEDS_COMPILE
         self.flag_update()
 
     cpdef remove(self, Instruction c):
         c.rremove(self)
+        self.flags |= GI_NEEDS_COMPILE
         self.flag_update()
 
     def ask_update(self):
@@ -627,6 +683,7 @@ cdef class Canvas(CanvasBase):
         This is useful when you need to trigger a redraw due to some value
         having changed for example.
         '''
+        self.flags |= GI_NEEDS_COMPILE
         self.flag_update()
 
     property before:
@@ -820,10 +877,10 @@ cdef class RenderContext(Canvas):
         #if index in self.bind_texture and \
         #   self.bind_texture[index] is texture:
         #    return
-        global _active_texture
+        cdef Context context = get_context()
         self.bind_texture[index] = texture
-        if _active_texture != index:
-            _active_texture = index
+        if context.gl_texture_unit != index:
+            context.gl_texture_unit = index
             glActiveTexture(GL_TEXTURE0 + index)
         texture.bind()
         self.flag_update()
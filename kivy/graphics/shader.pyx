@@ -68,7 +68,7 @@ IF USE_OPENGL_DEBUG == 1:
     from kivy.graphics.c_opengl_debug cimport *
 from kivy.graphics.vertex cimport vertex_attr_t
 from kivy.graphics.transformation cimport Matrix
-from kivy.graphics.context cimport get_context
+from kivy.graphics.context cimport Context, get_context
 from kivy.logger import Logger
 from kivy.cache import Cache
 from kivy import kivy_shader_dir
@@ -173,6 +173,7 @@ cdef class Shader:
         self.fragment_shader = None
         self.uniform_locations = dict()
         self.uniform_values = dict()
+        self.dirty_uniforms = set()
 
     def __init__(self, str vs=None, str fs=None, str source=None):
         self.program = glCreateProgram()
@@ -191,6 +192,7 @@ cdef class Shader:
         # is called only when the gl context is reseted. If we do it, we might
         # free newly created shaders (id collision)
         glUseProgram(0)
+        get_context().gl_program = 0
 
         # avoid shaders to be collected
         if self.vertex_shader:
@@ -211,9 +213,19 @@ cdef class Shader:
     cdef void use(self):
         '''Use the shader.
         '''
-        glUseProgram(self.program)
-        for k, v in self.uniform_values.iteritems():
-            self.upload_uniform(k, v)
+        cdef Context context = get_context()
+        cdef str name
+        if context.gl_program != self.program:
+            glUseProgram(self.program)
+            context.gl_program = self.program
+            context.shader_binds += 1
+
+        # the program keeps its uniforms, upload only the ones changed while
+        # it was not in use
+        if self.dirty_uniforms:
+            for name in self.dirty_uniforms:
+                self.upload_uniform(name, self.uniform_values[name])
+            self.dirty_uniforms.clear()
         IF USE_GLEW == 1:
             # XXX Very very weird bug. On virtualbox / win7 / glew, if we don't call
             # glFlush or glFinish or glGetIntegerv(GL_CURRENT_PROGRAM, ...), it seem
@@ -228,13 +240,20 @@ cdef class Shader:
     cdef void stop(self):
         '''Stop using the shader.
         '''
-        glUseProgram(0)
+        cdef Context context = get_context()
+        if context.gl_program != 0:
+            glUseProgram(0)
+            context.gl_program = 0
 
     cdef void set_uniform(self, str name, value):
         if name in self.uniform_values and self.uniform_values[name] == value:
             return
         self.uniform_values[name] = value
-        self.upload_uniform(name, value)
+        # glUniform* changes the program in use, wait for ours otherwise
+        if get_context().gl_program == self.program:
+            self.upload_uniform(name, value)
+        else:
+            self.dirty_uniforms.add(name)
 
     cdef void upload_uniform(self, str name, value):
         '''Pass a uniform variable to the shader.
@@ -245,6 +264,7 @@ cdef class Shader:
         cdef float f1, f2, f3, f4
         cdef tuple tuple_value
         cdef list list_value
+        cdef Context context
         cdef GLfloat *float_list
         cdef GLint *int_list
         val_type = type(value)
@@ -257,6 +277,8 @@ cdef class Shader:
             #Logger.debug('Shader: -> ignored')
             return
         #Logger.debug('Shader: -> (gl:%d) %s' % (glGetError(), str(value)))
+        context = get_context()
+        context.uniform_uploads += 1
 
         if val_type is Matrix:
             self.upload_uniform_matrix(loc, value)
@@ -496,6 +518,8 @@ cdef class Shader:
         glLinkProgram(self.program)
         self.process_message('program', self.get_program_log(self.program))
         self.uniform_locations = dict()
+        # the link resets the uniforms of the program
+        self.dirty_uniforms.update(self.uniform_values)
         error = glGetError()
         if error:
             Logger.error('Shader: GL error %d' % error)
@@ -228,7 +228,7 @@ cimport cython
 from os import environ
 from kivy.utils import platform
 from kivy.weakmethod import WeakMethod
-from kivy.graphics.context cimport get_context
+from kivy.graphics.context cimport Context, get_context
 
 from kivy.graphics.c_opengl cimport *
 IF USE_OPENGL_DEBUG == 1:
@@ -759,10 +759,20 @@ cdef class Texture:
     cpdef bind(self):
         '''Bind the texture to the current opengl state.'''
         cdef GLuint value
+        cdef Context context = get_context()
+        cdef int unit = context.gl_texture_unit
+        if unit < 0 or unit >= 32:
+            unit = -1
 
         # if we have no change to apply, just bind and exit
         if not self.flags:
+            # skip it if the texture is already bound on the active unit
+            if unit != -1 and context.gl_textures[unit] == self._id:
+                return
             glBindTexture(self._target, self._id)
+            context.texture_binds += 1
+            if unit != -1:
+                context.gl_textures[unit] = self._id
             return
 
         if self.flags & TI_NEED_GEN:
@@ -770,6 +780,9 @@ cdef class Texture:
             glGenTextures(1, &self._id)
 
         glBindTexture(self._target, self._id)
+        context.texture_binds += 1
+        if unit != -1:
+            context.gl_textures[unit] = self._id
 
         if self.flags & TI_NEED_ALLOCATE:
             self.flags &= ~TI_NEED_ALLOCATE
@@ -780,6 +793,9 @@ cdef class Texture:
             if self._callback:
                 self._callback(self)
                 self._callback = None
+                # the callback may have bound other textures
+                context.reset_gl_state()
+                glBindTexture(self._target, self._id)
 
         if self.flags & TI_MIN_FILTER:
             self.flags &= ~TI_MIN_FILTER
@@ -3,6 +3,7 @@ from c_opengl cimport GLuint
 from vertex cimport vertex_t, vertex_attr_t, VertexFormat
 
 cdef VertexFormat default_vertex
+cdef long max_batch_vertices
 
 cdef class VBO:
     cdef object __weakref__
@@ -16,9 +17,12 @@ cdef class VBO:
     cdef Buffer data
     cdef short flags
     cdef long vbo_size
+    cdef long dirty_start
+    cdef long dirty_end
     cdef VertexFormat vertex_format
 
     cdef void update_buffer(self)
+    cdef void flag_dirty(self, long start, long end)
     cdef void bind(self)
     cdef void unbind(self)
     cdef void add_vertex_data(self, void *v, unsigned short* indices, int count)
@@ -40,12 +44,20 @@ cdef class VertexBatch:
     cdef int usage
     cdef short flags
     cdef long elements_size
+    cdef VertexBatch leader
+    cdef list members
+    cdef Buffer merged
 
     cdef void clear_data(self)
     cdef void set_data(self, void *vertices, int vertices_count,
                        unsigned short *indices, int indices_count)
     cdef void append_data(self, void *vertices, int vertices_count,
                           unsigned short *indices, int indices_count)
+    cdef void set_vbo(self, VBO vbo)
+    cdef void set_leader(self, VertexBatch leader)
+    cdef void set_members(self, list members)
+    cdef void detach(self)
+    cdef void merge_elements(self)
     cdef void draw(self)
     cdef void set_mode(self, str mode)
     cdef str get_mode(self)
@@ -39,6 +39,22 @@ cdef short V_NEEDGEN = 1 << 0
 cdef short V_NEEDUPLOAD = 1 << 1
 cdef short V_HAVEID = 1 << 2
 
+# the elements are unsigned short, a VBO cannot hold more vertices
+cdef long max_batch_vertices = 65536
+
+cdef inline void bind_buffer(Context context, GLuint target, GLuint id):
+    # bind the buffer, unless the shadowed GL state says it is already bound
+    if target == GL_ARRAY_BUFFER:
+        if context.gl_array_buffer == id:
+            return
+        context.gl_array_buffer = id
+    else:
+        if context.gl_element_buffer == id:
+            return
+        context.gl_element_buffer = id
+    glBindBuffer(target, id)
+
+
 cdef class VBO:
     '''
     .. versionchanged:: 1.6.0
@@ -56,6 +72,7 @@ cdef class VBO:
         self.format_size = vertex_format.vbytesize
         self.flags = V_NEEDGEN | V_NEEDUPLOAD
         self.vbo_size = 0
+        self.dirty_start = self.dirty_end = 0
 
     def __dealloc__(self):
         get_context().dealloc_vbo(self)
@@ -67,31 +84,62 @@ cdef class VBO:
         return self.flags & V_HAVEID
 
     cdef void update_buffer(self):
+        cdef Context context = get_context()
+        cdef long offset, size
         # generate VBO if not done yet
         if self.flags & V_NEEDGEN:
             glGenBuffers(1, &self.id)
             self.flags &= ~V_NEEDGEN
             self.flags |= V_HAVEID
 
-        # if the size doesn't match, we need to reupload the whole data
+        # if the size doesn't match, we need to reupload the whole data. The
+        # buffer grows by steps, so this doesn't happen at each new vertex.
         if self.vbo_size < self.data.size():
             self.vbo_size = self.data.size()
-            glBindBuffer(GL_ARRAY_BUFFER, self.id)
+            bind_buffer(context, GL_ARRAY_BUFFER, self.id)
             glBufferData(GL_ARRAY_BUFFER, self.vbo_size, self.data.pointer(), self.usage)
-            self.flags &= ~V_NEEDUPLOAD
-
-        # if size match, update only what is needed
-        elif self.flags & V_NEEDUPLOAD:
-            glBindBuffer(GL_ARRAY_BUFFER, self.id)
-            glBufferSubData(GL_ARRAY_BUFFER, 0, self.data.size(), self.data.pointer())
-            self.flags &= ~V_NEEDUPLOAD
+            context.buffer_uploads += 1
+            context.buffer_upload_bytes += self.vbo_size
+
+        # if size match, update only the changed vertices
+        elif self.flags & V_NEEDUPLOAD and self.dirty_end > self.dirty_start:
+            offset = self.dirty_start * self.format_size
+            size = (self.dirty_end - self.dirty_start) * self.format_size
+            bind_buffer(context, GL_ARRAY_BUFFER, self.id)
+            if size * 2 >= self.vbo_size:
+                # most of the buffer changed: give a new storage to the buffer
+                # (orphaning) instead of waiting for the previous draws to be
+                # done with the current one.
+                glBufferData(GL_ARRAY_BUFFER, self.vbo_size, self.data.pointer(),
+                             self.usage)
+                size = self.vbo_size
+            else:
+                glBufferSubData(GL_ARRAY_BUFFER, offset, size,
+                                self.data.offset_pointer(self.dirty_start))
+            context.buffer_uploads += 1
+            context.buffer_upload_bytes += size
+
+        self.flags &= ~V_NEEDUPLOAD
+        self.dirty_start = self.dirty_end = 0
+
+    cdef void flag_dirty(self, long start, long end):
+        # extend the range of the vertices to upload
+        if self.dirty_end <= self.dirty_start:
+            self.dirty_start = start
+            self.dirty_end = end
+        else:
+            if start < self.dirty_start:
+                self.dirty_start = start
+            if end > self.dirty_end:
+                self.dirty_end = end
+        self.flags |= V_NEEDUPLOAD
 
     cdef void bind(self):
         cdef Shader shader = getActiveContext()._shader
         cdef vertex_attr_t *attr
         cdef int offset = 0, i
         self.update_buffer()
-        glBindBuffer(GL_ARRAY_BUFFER, self.id)
+        bind_buffer(get_context(), GL_ARRAY_BUFFER, self.id)
         shader.bind_vertex_format(self.vertex_format)
         for i in xrange(self.format_count):
             attr = &self.format[i]
@@ -102,15 +150,29 @@ cdef class VBO:
             offset += attr.bytesize
 
     cdef void unbind(self):
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        bind_buffer(get_context(), GL_ARRAY_BUFFER, 0)
 
     cdef void add_vertex_data(self, void *v, unsigned short* indices, int count):
-        self.flags |= V_NEEDUPLOAD
+        cdef int i
+        cdef long start, end
         self.data.add(v, indices, count)
+        if count == 0:
+            return
+        if indices == NULL:
+            self.flag_dirty(0, self.data.block_count)
+            return
+        # the free blocks are reused, the new vertices are not contiguous
+        start = end = indices[0]
+        for i in xrange(1, count):
+            if indices[i] < start:
+                start = indices[i]
+            elif indices[i] > end:
+                end = indices[i]
+        self.flag_dirty(start, end + 1)
 
     cdef void update_vertex_data(self, int index, void* v, int count):
-        self.flags |= V_NEEDUPLOAD
         self.data.update(index, v, count)
+        self.flag_dirty(index, index + count)
 
     cdef void remove_vertex_data(self, unsigned short* indices, int count):
         self.data.remove(indices, count)
@@ -118,6 +180,7 @@ cdef class VBO:
     cdef void reload(self):
         self.flags = V_NEEDUPLOAD | V_NEEDGEN
         self.vbo_size = 0
+        self.dirty_start = self.dirty_end = 0
 
     def __repr__(self):
         return '<VBO at %x id=%r count=%d size=%d>' % (
@@ -135,6 +198,9 @@ cdef class VertexBatch:
         self.elements = Buffer(lushort) #indices translated to vbo indices
         self.elements_size = 0
         self.flags = V_NEEDGEN | V_NEEDUPLOAD
+        self.leader = None
+        self.members = None
+        self.merged = None
 
         self.set_data(NULL, 0, NULL, 0)
         self.set_mode(kwargs.get('mode'))
@@ -169,6 +235,14 @@ cdef class VertexBatch:
 
     cdef void append_data(self, void *vertices, int vertices_count,
                           unsigned short *indices, int indices_count):
+        # the VBO is shared with a batch, and cannot hold our new vertices:
+        # leave the batch and use our own VBO again, the group compiles its
+        # batches again.
+        if (self.vbo.data.count() > self.vbo_index.count() and
+                self.vbo.data.count() + vertices_count > max_batch_vertices):
+            self.detach()
+            self.set_vbo(VBO(self.vbo.vertex_format))
+
         # add vertex data to vbo and get index for every vertex added
         cdef unsigned short *vi = <unsigned short *>malloc(sizeof(unsigned short) * vertices_count)
         if vi == NULL:
@@ -187,10 +261,114 @@ cdef class VertexBatch:
             self.elements.add(&vbi[local_index], NULL, 1)
         self.flags |= V_NEEDUPLOAD
 
+    cdef void set_vbo(self, VBO vbo):
+        '''Move the vertices of the batch into `vbo`, which must use the same
+        vertex format, and translate the elements to their new indices.
+        '''
+        cdef int i, count = self.vbo_index.count()
+        cdef long vsize = vbo.format_size
+        cdef unsigned short *old_index = <unsigned short *>self.vbo_index.pointer()
+        cdef unsigned short *elements = <unsigned short *>self.elements.pointer()
+        cdef unsigned short *new_index
+        cdef unsigned short *remap
+        cdef char *vertices
+
+        if vbo is self.vbo:
+            return
+        if count == 0:
+            self.vbo = vbo
+            return
+
+        vertices = <char *>malloc(vsize * count)
+        new_index = <unsigned short *>malloc(sizeof(unsigned short) * count)
+        remap = <unsigned short *>malloc(
+            sizeof(unsigned short) * self.vbo.data.block_count)
+        if vertices == NULL or new_index == NULL or remap == NULL:
+            free(vertices)
+            free(new_index)
+            free(remap)
+            raise MemoryError('vertex move allocation')
+
+        for i in xrange(count):
+            memcpy(vertices + i * vsize,
+                   self.vbo.data.offset_pointer(old_index[i]), vsize)
+        vbo.add_vertex_data(vertices, new_index, count)
+        for i in xrange(count):
+            remap[old_index[i]] = new_index[i]
+        for i in xrange(self.elements.count()):
+            elements[i] = remap[elements[i]]
+
+        self.vbo.remove_vertex_data(old_index, count)
+        self.vbo_index.update(0, new_index, count)
+        self.vbo = vbo
+        self.flags |= V_NEEDUPLOAD
+        free(vertices)
+        free(new_index)
+        free(remap)
+
+    cdef void set_leader(self, VertexBatch leader):
+        '''Set the batch drawing the elements of this one, or None to draw
+        them ourself.
+        '''
+        if leader is self.leader:
+            return
+        self.leader = leader
+        self.flags |= V_NEEDUPLOAD
+
+    cdef void set_members(self, list members):
+        '''Set the batches sharing our VBO whose elements are drawn with ours
+        in a single draw call, or None to draw only our elements.
+        '''
+        if members is None and self.members is None:
+            return
+        self.members = members
+        if members is not None and self.merged is None:
+            self.merged = Buffer(sizeof(unsigned short))
+        self.flags |= V_NEEDUPLOAD
+
+    cdef void detach(self):
+        '''Leave the batch we are part of: all its batches draw their own
+        elements again, until the group is compiled again.
+        '''
+        cdef VertexBatch member
+        if self.leader is not None:
+            self.leader.detach()
+        elif self.members is not None:
+            for member in self.members:
+                member.set_leader(None)
+            self.set_members(None)
+
+    cdef void merge_elements(self):
+        cdef VertexBatch member
+        self.merged.clear()
+        self.merged.add(self.elements.pointer(), NULL, self.elements.count())
+        for member in self.members:
+            self.merged.add(member.elements.pointer(), NULL,
+                            member.elements.count())
+
     cdef void draw(self):
-        cdef int count = self.elements.count()
+        cdef VertexBatch member
+        cdef Buffer elements = self.elements
+        cdef Context context
+        cdef int count
+
+        # our elements are drawn by another batch
+        if self.leader is not None:
+            return
+
+        if self.members is not None:
+            for member in self.members:
+                if member.flags & V_NEEDUPLOAD:
+                    member.flags &= ~V_NEEDUPLOAD
+                    self.flags |= V_NEEDUPLOAD
+            if self.flags & V_NEEDUPLOAD:
+                self.merge_elements()
+            elements = self.merged
+
+        count = elements.count()
         if count == 0:
             return
+        context = get_context()
 
         # create when needed
         if self.flags & V_NEEDGEN:
@@ -199,25 +377,29 @@ cdef class VertexBatch:
             self.flags |= V_HAVEID
 
         # bind to the current id
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.id)
+        bind_buffer(context, GL_ELEMENT_ARRAY_BUFFER, self.id)
 
         # cache indices in a gpu buffer too
         if self.flags & V_NEEDUPLOAD:
-            if self.elements_size == self.elements.size():
+            if self.elements_size == elements.size():
                 glBufferSubData(GL_ELEMENT_ARRAY_BUFFER, 0, self.elements_size,
-                    self.elements.pointer())
+                    elements.pointer())
             else:
-                glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.elements.size(),
-                    self.elements.pointer(), self.usage)
-                self.elements_size = self.elements.size()
+                glBufferData(GL_ELEMENT_ARRAY_BUFFER, elements.size(),
+                    elements.pointer(), self.usage)
+                self.elements_size = elements.size()
             self.flags &= ~V_NEEDUPLOAD
+            context.buffer_uploads += 1
+            context.buffer_upload_bytes += self.elements_size
 
         self.vbo.bind()
 
         # draw the elements pointed by indices in ELEMENT ARRAY BUFFER.
         glDrawElements(self.mode, count, GL_UNSIGNED_SHORT, NULL)
+        context.draw_calls += 1
 
     cdef void set_mode(self, str mode):
+        cdef GLuint old_mode = self.mode
         # most common case in top;
         self.mode_str = mode
         if mode is None:
@@ -237,6 +419,10 @@ cdef class VertexBatch:
         else:
             self.mode = GL_TRIANGLES
 
+        # the batch was built for the previous mode
+        if self.mode != old_mode:
+            self.detach()
+
     cdef str get_mode(self):
         return self.mode_str
 
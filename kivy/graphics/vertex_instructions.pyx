@@ -56,6 +56,7 @@ __all__ = ('Triangle', 'Quad', 'Rectangle', 'BorderImage', 'Ellipse', 'Line',
 
 include "config.pxi"
 include "common.pxi"
+include "opcodes.pxi"
 
 from os import environ
 from kivy.graphics.vbo cimport *
@@ -479,6 +480,10 @@ cdef class Mesh(VertexInstruction):
             self.batch.get_mode()
         def __set__(self, mode):
             self.batch.set_mode(mode)
+            # the batches of the group are built for the mode
+            if self.parent is not None:
+                self.parent.flags |= GI_NEEDS_COMPILE
+            self.flag_update()
 
 
 
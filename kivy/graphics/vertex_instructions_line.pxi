@@ -122,6 +122,8 @@ cdef class Line(VertexInstruction):
 
     def __init__(self, **kwargs):
         VertexInstruction.__init__(self, **kwargs)
+        # the wide lines are drawn twice with a stencil, see apply()
+        self.flags |= GI_NO_BATCH
         v = kwargs.get('points')
         self.points = v if v is not None else []
         self.batch.set_mode('line_strip')
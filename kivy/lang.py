@@ -772,6 +772,47 @@ will first be unloaded and then reloaded again. For example:
                 pos: self.pos
                 size: (self.size[0]/4, self.size[1]/4)
 
+Parser cache
+------------
+
+.. versionadded:: 1.9.1
+
+Parsing a kv source and compiling its expressions takes a noticeable part of
+the start time of an application. The :class:`Builder` saves the parsed rules
+with their compiled expressions, and the code of the functions evaluating them
+for the widgets, in a cache directory, and reuses them on the next loads of
+the same source, skipping the parsing and the compilation. The
+cache is keyed by the content and the filename of the source, and by the
+Python and Kivy versions, so it never returns outdated rules.
+
+The cache is stored in the `cache/lang` directory of the Kivy home. It can be
+moved or disabled with :attr:`BuilderBase.cache_dir`, or disabled with the
+`KIVY_NO_KV_CACHE` environment variable. The directory is limited to 8 MB:
+when a new source is cached above that size, the least recently used files
+are removed, so sources generated at runtime don't fill the disk.
+
+Lazy canvas
+-----------
+
+.. versionadded:: 1.9.1
+
+Building the canvas of a rule creates its graphics instructions and binds
+every property they use. When many widgets are created but only a few are
+shown, such as the rows of a long list or the screens of a settings panel,
+this work can be deferred with :attr:`BuilderBase.lazy_canvas`::
+
+    Builder.lazy_canvas = True
+
+The canvas rules of a widget created while it is not attached to the window
+are then built when it, or one of its parents, is added to the window. The
+widget properties of the rules are still applied on creation.
+
+.. note::
+
+    The instructions of a deferred canvas rule are inserted before the canvas
+    of the children of the widget, as usual, but after the instructions added
+    from Python in the meantime.
+
 '''
 import os
 
@@ -783,19 +824,23 @@ import re
 import sys
 import traceback
 import types
+import marshal
+from hashlib import sha1
 from re import sub, findall
+from symtable import symtable
 from os import environ
-from os.path import join
+from os.path import join, exists
 from copy import copy
 from types import CodeType
 from functools import partial
+from operator import itemgetter
 from collections import OrderedDict, defaultdict
 
 from kivy.factory import Factory
-from kivy.logger import Logger
+from kivy.logger import Logger, LOG_LEVELS
 from kivy.utils import QueryDict
 from kivy.cache import Cache
-from kivy import kivy_data_dir, require
+from kivy import kivy_data_dir, kivy_home_dir, require, __version__
 from kivy.compat import PY2, iteritems, iterkeys
 from kivy.context import register_context
 from kivy.resources import resource_find
@@ -806,12 +851,28 @@ from kivy._event import Observable, EventDispatcher
 trace = Logger.trace
 global_idmap = {}
 
+# the builtins, for the globals of the compiled rule values
+_kv_globals = {'__builtins__': __builtins__}
+_kv_builtins = __builtins__ if isinstance(__builtins__, dict) else \
+    __builtins__.__dict__
+
 # late import
 Instruction = None
 
 # register cache for creating new classtype (template)
 Cache.register('kv.lang')
 
+# parser cache, see the Parser cache section. The tag is part of the key of
+# the cached rules, and must change when their format changes.
+_kv_cache_tag = 'kvc2|%s|%s|%d' % (
+    __version__, sys.version, sys.flags.optimize)
+_kv_cache_dir = None
+if kivy_home_dir and 'KIVY_NO_KV_CACHE' not in environ:
+    _kv_cache_dir = join(kivy_home_dir, 'cache', 'lang')
+# maximum size of the cache directory, the least recently used files are
+# removed first
+_kv_cache_max_size = 8 * 1024 * 1024
+
 # all previously included files
 __KV_INCLUDES__ = []
 
@@ -831,6 +892,18 @@ else:
 # widget is deleted
 _handlers = defaultdict(list)
 
+# canvas rules deferred by lazy_canvas, by widget uid
+_deferred_canvas = {}
+
+
+def _clears_canvas(rule):
+    # a Clear instruction would remove the canvas of the children, if built
+    # after them
+    for canvas in (rule.canvas_before, rule.canvas_root, rule.canvas_after):
+        if canvas and any(c.name == 'Clear' for c in canvas.children):
+            return True
+    return False
+
 
 class ProxyApp(object):
     # proxy app object
@@ -932,7 +1005,8 @@ class ParserRuleProperty(object):
     '''
 
     __slots__ = ('ctx', 'line', 'name', 'value', 'co_value',
-                 'watched_keys', 'mode', 'count')
+                 'watched_keys', 'mode', 'count', 'free_names', 'factories',
+                 'factory_code')
 
     def __init__(self, ctx, line, name, value):
         super(ParserRuleProperty, self).__init__()
@@ -952,6 +1026,95 @@ class ParserRuleProperty(object):
         self.watched_keys = None
         #: Stats
         self.count = 0
+        #: Names used by the value, resolved by :meth:`create_function`
+        self.free_names = None
+        #: Function factories, by names bound in the function
+        self.factories = {}
+        #: (names, code) of the factory of the usual names, saved in the
+        #: parser cache
+        self.factory_code = None
+
+    def create_function(self, ids, self_ref):
+        '''Return a function without arguments returning the value of the
+        rule. The names of the value are bound as closure cells, resolved
+        like :func:`eval` would with `ids`, :data:`global_idmap` and `self`
+        now, and the builtins.
+
+        .. versionadded:: 1.9.1
+        '''
+        names = self.free_names
+        if names is None:
+            names = self.free_names = self._get_free_names()
+        cells = []
+        values = []
+        for name in names:
+            if name == 'self':
+                value = self_ref
+            elif name in global_idmap:
+                value = global_idmap[name]
+            elif name in ids:
+                value = ids[name]
+            else:
+                # left to the builtins
+                continue
+            cells.append(name)
+            values.append(value)
+        cells = tuple(cells)
+        factory = self.factories.get(cells)
+        if factory is None:
+            factory = self.factories[cells] = self._compile_factory(cells)
+        return factory(*values)
+
+    def _get_free_names(self):
+        # the global names of the value and of the lambdas and
+        # comprehensions inside it
+        names = set()
+        tables = symtable(
+            'def __kv_value(): return (\n%s\n)' % self.value,
+            '<string>', 'exec').get_children()
+        while tables:
+            table = tables.pop()
+            for symbol in table.get_symbols():
+                if symbol.is_global() and symbol.is_referenced():
+                    names.add(symbol.get_name())
+            tables.extend(table.get_children())
+        return sorted(names)
+
+    def _compile_factory(self, cells):
+        code = self.factory_code
+        if code is not None and code[0] == cells:
+            code = code[1]
+        else:
+            code = self._compile_factory_code(cells)
+        namespace = {}
+        exec(code, _kv_globals, namespace)
+        return namespace['__kv_factory']
+
+    def _compile_factory_code(self, cells):
+        # the value keeps its line number, for the tracebacks
+        source = '\n' * max(0, self.line - 2) + (
+            'def __kv_factory(%s):\n'
+            ' def __kv_value(): return (\n'
+            '%s\n'
+            ' )\n'
+            ' return __kv_value\n') % (', '.join(cells), self.value)
+        return compile(source, self.ctx.filename or '<string>', 'exec')
+
+    def precompile_function(self):
+        '''(internal) Compile the factory of :meth:`create_function` for
+        the usual case, where all the names but the builtins are bound, to
+        save it in the parser cache.
+        '''
+        if self.mode != 'eval' or type(self.co_value) is not CodeType:
+            return
+        try:
+            if self.free_names is None:
+                self.free_names = self._get_free_names()
+            cells = tuple(name for name in self.free_names
+                          if name not in _kv_builtins)
+            self.factory_code = (cells, self._compile_factory_code(cells))
+        except SyntaxError:
+            pass
 
     def precompile(self):
         name = self.name
@@ -1182,7 +1345,7 @@ class Parser(object):
         content = kwargs.get('content', None)
         if content is None:
             raise ValueError('No content passed')
-        self.parse(content)
+        self.parse(content, kwargs.get('cache_dir'))
 
     def execute_directives(self):
         global __KV_INCLUDES__
@@ -1262,9 +1425,13 @@ class Parser(object):
             else:
                 raise ParserException(self, ln, 'Unknown directive')
 
-    def parse(self, content):
+    def parse(self, content, cache_dir=None):
         '''Parse the contents of a Parser file and return a list
         of root objects.
+
+        .. versionchanged:: 1.9.1
+            The `cache_dir` parameter was added. If set, the parsed rules are
+            loaded from and saved to this directory, see `Parser cache`_.
         '''
         # Read and parse the lines of the file
         lines = content.splitlines()
@@ -1274,6 +1441,12 @@ class Parser(object):
         lines = list(zip(list(range(num_lines)), lines))
         self.sourcecode = lines[:]
 
+        cache_fn = None
+        if cache_dir is not None:
+            cache_fn = join(cache_dir, self._cache_key(content) + '.kvc')
+            if self._load_cache(cache_fn):
+                return
+
         if __debug__:
             trace('Parser: parsing %d lines' % num_lines)
 
@@ -1296,6 +1469,132 @@ class Parser(object):
             ln, content = remaining_lines[0]
             raise ParserException(self, ln, 'Invalid data (not parsed)')
 
+        if cache_fn is not None:
+            self._save_cache(cache_fn, objects)
+
+    def _cache_key(self, content):
+        key = sha1(_kv_cache_tag.encode('utf-8'))
+        key.update((self.filename or '').encode('utf-8'))
+        key.update(b'\0')
+        key.update(content.encode('utf-8') if not isinstance(content, bytes)
+                   else content)
+        return key.hexdigest()
+
+    def _load_cache(self, filename):
+        '''(internal) Load the rules saved by :meth:`_save_cache`. Return
+        False if the cache file is missing or invalid.
+        '''
+        try:
+            with open(filename, 'rb') as fd:
+                tag, directives, objects = marshal.loads(fd.read())
+            if tag != _kv_cache_tag:
+                return False
+            # the modification time orders the files to prune
+            os.utime(filename, None)
+        except Exception:
+            return False
+        if __debug__:
+            trace('Parser: load %s from the cache' % self.filename)
+        self.directives = [tuple(directive) for directive in directives]
+        self.execute_directives()
+        for rule in objects:
+            self._rule_from_cache(rule)
+        return True
+
+    def _save_cache(self, filename, objects):
+        data = (_kv_cache_tag, self.directives,
+                [self._rule_to_cache(rule) for rule in objects])
+        tmp = '%s.%d.tmp' % (filename, os.getpid())
+        try:
+            dirname = os.path.dirname(filename)
+            if not exists(dirname):
+                os.makedirs(dirname)
+            with open(tmp, 'wb') as fd:
+                marshal.dump(data, fd)
+            if exists(filename):
+                os.unlink(filename)
+            os.rename(tmp, filename)
+            self._prune_cache(dirname)
+        except (ValueError, IOError, OSError) as e:
+            # ValueError: a constant value that cannot be marshalled
+            Logger.debug('Parser: unable to cache %s: %s' % (
+                self.filename, e))
+            if exists(tmp):
+                os.unlink(tmp)
+
+    def _prune_cache(self, dirname):
+        # remove the least recently used files above _kv_cache_max_size
+        files = []
+        size = 0
+        for name in os.listdir(dirname):
+            if not name.endswith('.kvc'):
+                continue
+            filename = join(dirname, name)
+            try:
+                st = os.stat(filename)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, filename))
+            size += st.st_size
+        if size <= _kv_cache_max_size:
+            return
+        files.sort()
+        for mtime, filesize, filename in files:
+            if size <= _kv_cache_max_size:
+                break
+            try:
+                os.unlink(filename)
+            except OSError:
+                continue
+            size -= filesize
+
+    def _rule_to_cache(self, rule):
+        dump_rule = self._rule_to_cache
+        dump_prop = self._property_to_cache
+        return (rule.line, rule.name, rule.level, rule.id,
+                [dump_prop(prop) for prop in rule.properties.values()],
+                [dump_prop(prop) for prop in rule.handlers],
+                [dump_rule(child) for child in rule.children],
+                rule.canvas_before and dump_rule(rule.canvas_before),
+                rule.canvas_root and dump_rule(rule.canvas_root),
+                rule.canvas_after and dump_rule(rule.canvas_after))
+
+    def _property_to_cache(self, prop):
+        prop.precompile_function()
+        return (prop.line, prop.name, prop.value, prop.co_value, prop.mode,
+                prop.watched_keys, prop.free_names, prop.factory_code)
+
+    def _rule_from_cache(self, data):
+        (line, name, level, id, properties, handlers, children,
+         canvas_before, canvas_root, canvas_after) = data
+        load_rule = self._rule_from_cache
+        load_prop = self._property_from_cache
+        rule = ParserRule(self, line, name, level)
+        rule.id = id
+        for prop in properties:
+            prop = load_prop(prop)
+            rule.properties[prop.name] = prop
+        rule.handlers = [load_prop(prop) for prop in handlers]
+        rule.children = [load_rule(child) for child in children]
+        if canvas_before:
+            rule.canvas_before = load_rule(canvas_before)
+        if canvas_root:
+            rule.canvas_root = load_rule(canvas_root)
+        if canvas_after:
+            rule.canvas_after = load_rule(canvas_after)
+        return rule
+
+    def _property_from_cache(self, data):
+        (line, name, value, co_value, mode, watched_keys, free_names,
+         factory_code) = data
+        prop = ParserRuleProperty(self, line, name, value)
+        prop.co_value = co_value
+        prop.mode = mode
+        prop.watched_keys = watched_keys
+        prop.free_names = free_names
+        prop.factory_code = factory_code
+        return prop
+
     def strip_comments(self, lines):
         '''Remove all comments from all lines in-place.
            Comments need to be on a single line and not at the end of a line.
@@ -1466,13 +1765,13 @@ def custom_callback(__kvlang__, idmap, *largs, **kwargs):
 
 
 def call_fn(args, instance, v):
-    element, key, value, rule, idmap = args
-    if __debug__:
-        trace('Builder: call_fn %s, key=%s, value=%r, %r' % (
-            element, key, value, rule.value))
+    element, key, fn, rule = args
+    if __debug__ and Logger.isEnabledFor(LOG_LEVELS['trace']):
+        trace('Builder: call_fn %s, key=%s, value=%r' % (
+            element, key, rule.value))
     rule.count += 1
-    e_value = eval(value, idmap)
-    if __debug__:
+    e_value = fn()
+    if __debug__ and Logger.isEnabledFor(LOG_LEVELS['trace']):
         trace('Builder: call_fn => value=%r' % (e_value, ))
     setattr(element, key, e_value)
 
@@ -1583,24 +1882,36 @@ def update_intermediates(base, keys, bound, s, fn, args, instance, value):
 
 
 def create_handler(iself, element, key, value, rule, idmap, delayed=False):
-    idmap = copy(idmap)
-    idmap.update(global_idmap)
-    idmap['self'] = iself.proxy_ref
+    self_ref = iself.proxy_ref
     handler_append = _handlers[iself.uid].append
+    try:
+        value_fn = rule.create_function(idmap, self_ref)
+    except SyntaxError:
+        # the value can't be wrapped in a function, evaluate the code
+        value_idmap = dict(idmap)
+        value_idmap.update(global_idmap)
+        value_idmap['self'] = self_ref
+        value_fn = partial(eval, value, value_idmap)
 
     # we need a hash for when delayed, so we don't execute duplicate canvas
     # callbacks from the same handler during a sync op
     if delayed:
         fn = delayed_call_fn
-        args = [element, key, value, rule, idmap, None]  # see _delayed_start
+        args = [element, key, value_fn, rule, None]  # see _delayed_start
     else:
         fn = call_fn
-        args = (element, key, value, rule, idmap)
+        args = (element, key, value_fn, rule)
 
     # bind every key.value
     if rule.watched_keys is not None:
         for keys in rule.watched_keys:
-            base = idmap.get(keys[0])
+            name = keys[0]
+            if name == 'self':
+                base = self_ref
+            elif name in global_idmap:
+                base = global_idmap[name]
+            else:
+                base = idmap.get(name)
             if base is None:
                 continue
             f = base = getattr(base, 'proxy_ref', base)
@@ -1646,7 +1957,7 @@ def create_handler(iself, element, key, value, rule, idmap, delayed=False):
                 handler_append(bound)
 
     try:
-        return eval(value, idmap)
+        return value_fn()
     except Exception as e:
         tb = sys.exc_info()[2]
         raise BuilderException(rule.ctx, rule.line,
@@ -1656,6 +1967,10 @@ def create_handler(iself, element, key, value, rule, idmap, delayed=False):
 
 class ParserSelector(object):
 
+    #: Kind of the key in the rule index of the :class:`BuilderBase`, None if
+    #: the selector can only be checked with :meth:`match`.
+    index = None
+
     def __init__(self, key):
         self.key = key.lower()
 
@@ -1668,6 +1983,8 @@ class ParserSelector(object):
 
 class ParserSelectorId(ParserSelector):
 
+    index = 'id'
+
     def match(self, widget):
         if widget.id:
             return widget.id.lower() == self.key
@@ -1675,32 +1992,44 @@ class ParserSelectorId(ParserSelector):
 
 class ParserSelectorClass(ParserSelector):
 
+    index = 'cls'
+
     def match(self, widget):
         return self.key in widget.cls
 
 
 class ParserSelectorName(ParserSelector):
 
+    index = 'name'
+
     parents = {}
 
-    def get_bases(self, cls):
+    @staticmethod
+    def get_bases(cls):
         for base in cls.__bases__:
             if base.__name__ == 'object':
                 break
             yield base
             if base.__name__ == 'Widget':
                 break
-            for cbase in self.get_bases(base):
+            for cbase in ParserSelectorName.get_bases(base):
                 yield cbase
 
-    def match(self, widget):
+    @staticmethod
+    def get_names(cls):
+        '''Return the frozenset of the lowercased names of `cls` and of its
+        bases up to :class:`~kivy.uix.widget.Widget`, computed once per class.
+        '''
         parents = ParserSelectorName.parents
-        cls = widget.__class__
-        if not cls in parents:
-            classes = [x.__name__.lower() for x in
-                       [cls] + list(self.get_bases(cls))]
-            parents[cls] = classes
-        return self.key in parents[cls]
+        names = parents.get(cls)
+        if names is None:
+            names = parents[cls] = frozenset(
+                [x.__name__.lower() for x in
+                 [cls] + list(ParserSelectorName.get_bases(cls))])
+        return names
+
+    def match(self, widget):
+        return self.key in ParserSelectorName.get_names(widget.__class__)
 
 
 class BuilderBase(object):
@@ -1711,15 +2040,32 @@ class BuilderBase(object):
     that you can use to load other kv files in addition to the default ones.
     '''
 
-    _match_cache = {}
-
     def __init__(self):
         super(BuilderBase, self).__init__()
         self.files = []
         self.dynamic_classes = {}
         self.templates = {}
         self.rules = []
+        # index of the rules by selector, (kind, key): [(order, rule), ...]
+        self._rule_index = {}
+        # rules with a selector that cannot be indexed
+        self._rule_unindexed = []
+        self._rule_order = 0
+        self._match_cache = {}
         self.rulectx = {}
+        self.cache_dir = _kv_cache_dir
+        '''Directory where the parsed rules are cached, see `Parser cache`_.
+        If None, the cache is disabled.
+
+        .. versionadded:: 1.9.1
+        '''
+        self._canvas_instructions = {}
+        self.lazy_canvas = False
+        '''If True, the canvas rules of the widgets that are not attached to
+        the window are built when they are attached, see `Lazy canvas`_.
+
+        .. versionadded:: 1.9.1
+        '''
 
     def load_file(self, filename, **kwargs):
         '''Insert a file into the language builder and return the root widget
@@ -1760,8 +2106,12 @@ class BuilderBase(object):
             template invocation.
         '''
         # remove rules and templates
-        self.rules = [x for x in self.rules if x[1].ctx.filename != filename]
-        self._clear_matchcache()
+        removed = [x for x in self.rules if x[1].ctx.filename == filename]
+        if removed:
+            self.rules = [x for x in self.rules
+                          if x[1].ctx.filename != filename]
+            self._unindex_rules(removed)
+            self._canvas_instructions = {}
         templates = {}
         for x, y in self.templates.items():
             if y[2] != filename:
@@ -1793,11 +2143,14 @@ class BuilderBase(object):
 
         try:
             # parse the string
-            parser = Parser(content=string, filename=fn)
+            parser = Parser(content=string, filename=fn,
+                            cache_dir=self.cache_dir)
 
             # merge rules with our rules
             self.rules.extend(parser.rules)
-            self._clear_matchcache()
+            self._index_rules(parser.rules)
+            # the instruction classes may be registered by the new file
+            self._canvas_instructions = {}
 
             # add the template found by the parser into ours
             for name, cls, template in parser.templates:
@@ -1872,7 +2225,70 @@ class BuilderBase(object):
             self._apply_rule(widget, rule, rule)
 
     def _clear_matchcache(self):
-        BuilderBase._match_cache = {}
+        self._match_cache = {}
+
+    def _index_rules(self, rules):
+        # add the (selector, rule) to the index, then forget the matches that
+        # they could change
+        index = self._rule_index
+        keys = set()
+        for selector, rule in rules:
+            order = self._rule_order
+            self._rule_order += 1
+            if selector.index is None:
+                self._rule_unindexed.append((order, selector, rule))
+                keys = None
+                continue
+            key = (selector.index, selector.key)
+            index.setdefault(key, []).append((order, rule))
+            if keys is not None:
+                keys.add(key)
+        self._invalidate_matches(keys)
+
+    def _unindex_rules(self, rules):
+        index = self._rule_index
+        keys = set()
+        removed = set([id(rule) for selector, rule in rules])
+        for selector, rule in rules:
+            if selector.index is None:
+                keys = None
+                continue
+            key = (selector.index, selector.key)
+            if keys is not None:
+                keys.add(key)
+            entries = index.get(key)
+            if entries is None:
+                continue
+            entries = [x for x in entries if id(x[1]) not in removed]
+            if entries:
+                index[key] = entries
+            else:
+                del index[key]
+        self._rule_unindexed = [x for x in self._rule_unindexed
+                                if id(x[2]) not in removed]
+        self._invalidate_matches(keys)
+
+    def _match_keys(self, k):
+        # index keys that can match the widget described by the cache key k
+        cls, widget_id, classes = k
+        keys = [('name', name) for name in ParserSelectorName.get_names(cls)]
+        if widget_id:
+            keys.append(('id', widget_id.lower()))
+        keys.extend([('cls', name) for name in classes])
+        return keys
+
+    def _invalidate_matches(self, keys):
+        # forget the cached matches of the widgets that any of the index keys
+        # could match, or all of them if keys is None
+        if keys is None:
+            self._clear_matchcache()
+            return
+        if not keys:
+            return
+        cache = self._match_cache
+        for k in list(cache.keys()):
+            if not keys.isdisjoint(self._match_keys(k)):
+                del cache[k]
 
     def _apply_rule(self, widget, rule, rootrule, template_ctx=None):
         # widget: the current instantiated widget
@@ -1915,18 +2331,14 @@ class BuilderBase(object):
         rule.create_missing(widget)
 
         # build the widget canvas
-        if rule.canvas_before:
-            with widget.canvas.before:
-                self._build_canvas(widget.canvas.before, widget,
-                                   rule.canvas_before, rootrule)
-        if rule.canvas_root:
-            with widget.canvas:
-                self._build_canvas(widget.canvas, widget,
-                                   rule.canvas_root, rootrule)
-        if rule.canvas_after:
-            with widget.canvas.after:
-                self._build_canvas(widget.canvas.after, widget,
-                                   rule.canvas_after, rootrule)
+        if rule.canvas_before or rule.canvas_root or rule.canvas_after:
+            ids = self.rulectx[rootrule]['ids']
+            if (self.lazy_canvas and widget.get_root_window() is None and
+                    not _clears_canvas(rule)):
+                _deferred_canvas.setdefault(widget.uid, []).append(
+                    (widget.proxy_ref, rule, ids))
+            else:
+                self._build_canvases(widget, rule, ids)
 
         # create children tree
         Factory_get = Factory.get
@@ -2051,16 +2463,26 @@ class BuilderBase(object):
     def match(self, widget):
         '''Return a list of :class:`ParserRule` objects matching the widget.
         '''
-        cache = BuilderBase._match_cache
+        cache = self._match_cache
         k = (widget.__class__, widget.id, tuple(widget.cls))
         if k in cache:
             return cache[k]
-        rules = []
-        for selector, rule in self.rules:
+        index = self._rule_index
+        matched = []
+        for key in self._match_keys(k):
+            entries = index.get(key)
+            if entries:
+                matched.extend(entries)
+        for order, selector, rule in self._rule_unindexed:
             if selector.match(widget):
-                if rule.avoid_previous_rules:
-                    del rules[:]
-                rules.append(rule)
+                matched.append((order, rule))
+        # apply the rules in the order they were loaded
+        matched.sort(key=itemgetter(0))
+        rules = []
+        for order, rule in matched:
+            if rule.avoid_previous_rules:
+                del rules[:]
+            rules.append(rule)
         cache[k] = rules
         return rules
 
@@ -2095,6 +2517,7 @@ class BuilderBase(object):
 
         .. versionadded:: 1.7.2
         '''
+        _deferred_canvas.pop(uid, None)
         if uid not in _handlers:
             return
         for callbacks in _handlers[uid]:
@@ -2108,36 +2531,108 @@ class BuilderBase(object):
                     pass
         del _handlers[uid]
 
-    def _build_canvas(self, canvas, widget, rule, rootrule):
-        global Instruction
-        if Instruction is None:
-            Instruction = Factory.get('Instruction')
-        idmap = copy(self.rulectx[rootrule]['ids'])
-        for crule in rule.children:
-            name = crule.name
-            if name == 'Clear':
+    def build_deferred_canvas(self, widget):
+        '''Build the canvas rules deferred by :attr:`lazy_canvas` of the
+        widget and its children, if the widget is attached to the window.
+        Called by :meth:`~kivy.uix.widget.Widget.add_widget`.
+
+        .. versionadded:: 1.9.1
+        '''
+        if not _deferred_canvas or widget.get_root_window() is None:
+            return
+        widgets = [widget]
+        while widgets:
+            widget = widgets.pop()
+            deferred = _deferred_canvas.pop(widget.uid, None)
+            if deferred is not None:
+                for proxy, rule, ids in deferred:
+                    self._build_canvases(proxy, rule, ids, True)
+            widgets.extend(widget.children)
+
+    def _build_canvases(self, widget, rule, ids, deferred=False):
+        if rule.canvas_before:
+            self._build_canvas_rule(widget.canvas.before, widget,
+                                    rule.canvas_before, ids, deferred)
+        if rule.canvas_root:
+            self._build_canvas_rule(widget.canvas, widget,
+                                    rule.canvas_root, ids, deferred)
+        if rule.canvas_after:
+            self._build_canvas_rule(widget.canvas.after, widget,
+                                    rule.canvas_after, ids, deferred)
+
+    def _build_canvas_rule(self, canvas, widget, rule, ids, deferred):
+        if deferred:
+            existing = set(id(c) for c in canvas.children)
+        with canvas:
+            self._build_canvas(canvas, widget, rule, ids)
+        if not deferred:
+            return
+
+        # move the new instructions before the canvas of the children, as
+        # they would have been if built on creation
+        index = [canvas.indexof(child.canvas) for child in widget.children]
+        index = [i for i in index if i != -1]
+        instructions = [c for c in canvas.children if id(c) not in existing]
+        if not index or not instructions:
+            return
+        index = min(index)
+        if canvas.indexof(instructions[0]) < index:
+            return
+        for c in instructions:
+            canvas.remove(c)
+        for i, c in enumerate(instructions):
+            canvas.insert(index + i, c)
+
+    def _build_canvas(self, canvas, widget, rule, ids):
+        idmap = None
+        for cls, prules in self._get_canvas_instructions(rule):
+            if cls is None:
                 canvas.clear()
                 continue
-            instr = Factory.get(name)()
-            if not isinstance(instr, Instruction):
-                raise BuilderException(
-                    crule.ctx, crule.line,
-                    'You can add only graphics Instruction in canvas.')
+            instr = cls()
             try:
-                for prule in crule.properties.values():
-                    key = prule.name
+                for prule in prules:
                     value = prule.co_value
                     if type(value) is CodeType:
+                        # the idmap is only copied for the compiled values
+                        if idmap is None:
+                            idmap = copy(ids)
                         value = create_handler(
                             widget, instr.proxy_ref,
-                            key, value, prule, idmap, True)
-                    setattr(instr, key, value)
+                            prule.name, value, prule, idmap, True)
+                    setattr(instr, prule.name, value)
             except Exception as e:
                 tb = sys.exc_info()[2]
                 raise BuilderException(
                     prule.ctx, prule.line,
                     '{}: {}'.format(e.__class__.__name__, e), cause=tb)
 
+    def _get_canvas_instructions(self, rule):
+        # the instructions of a canvas rule, as a list of (class, prules),
+        # None for a Clear. Only the class lookup and check are saved: the
+        # instructions and their compiled values are still created for each
+        # widget.
+        instructions = self._canvas_instructions.get(rule)
+        if instructions is not None:
+            return instructions
+        global Instruction
+        if Instruction is None:
+            Instruction = Factory.get('Instruction')
+        instructions = []
+        for crule in rule.children:
+            if crule.name == 'Clear':
+                instructions.append((None, None))
+                continue
+            cls = Factory.get(crule.name)
+            if not isinstance(cls, type) or not issubclass(cls, Instruction):
+                raise BuilderException(
+                    crule.ctx, crule.line,
+                    'You can add only graphics Instruction in canvas.')
+            instructions.append((cls, list(crule.properties.values())))
+        self._canvas_instructions[rule] = instructions
+        return instructions
+
+
 #: Main instance of a :class:`BuilderBase`.
 Builder = register_context('Builder', BuilderBase)
 Builder.load_file(join(kivy_data_dir, 'style.kv'), rulesonly=True)
@@ -30,27 +30,88 @@ parameters:
   loading images.
 - :attr:`Loader.max_upload_per_frame` - define the maximum image uploads in
   GPU to do per frame.
+- :attr:`Loader.max_upload_time` and :attr:`Loader.max_upload_bytes` - define
+  the time and the number of bytes that the uploads in GPU can take per frame
+  (added in 1.9.1).
+- :attr:`Loader.upload_slice_bytes` - split the upload of the large images in
+  slices of rows uploaded over several frames (added in 1.9.1).
+
+Priorities and cancellation
+---------------------------
+
+.. versionadded:: 1.9.1
+
+The pending images are loaded by decreasing priority, then in request order.
+The priority is given to :meth:`~LoaderBase.image`, and can be changed while
+the image is waiting to be loaded, for example when it scrolls into view::
+
+    proxy = Loader.image('thumbnail.jpg', priority=-1)
+    # later
+    Loader.set_priority(proxy, 10)
+
+The loader only keeps a weak reference to the returned
+:class:`ProxyImage`: when no :class:`ProxyImage` of a pending image is
+referenced anymore, its loading is cancelled. It can also be cancelled
+explicitly with :meth:`~LoaderBase.cancel`. The requests of the same image
+are coalesced, it is loaded once for all of them.
+
+Disk cache
+----------
+
+.. versionadded:: 1.9.1
+
+The images downloaded over http and https are kept in a disk cache, so they
+are not downloaded again when the application is restarted. An image is
+used from the disk without any request while it is fresh according to its
+`Cache-Control` or `Expires` headers. Otherwise it is revalidated with its
+`ETag` or `Last-Modified` headers, and downloaded again only if it changed.
+When the server can't be reached or fails, the cached image is used. It is
+removed from the cache only when the server answers that it doesn't exist
+anymore (404 or 410).
+
+The least recently used images are removed when the cache grows over
+:attr:`Loader.disk_cache_size`. The images loaded with `nocache=True` are
+not stored::
+
+    # store the cache elsewhere, and allow 200MB
+    Loader.disk_cache_dir = '/path/to/cache'
+    Loader.disk_cache_size = 200 * 1024 * 1024
+
+    # disable the disk cache
+    Loader.disk_cache_size = 0
 
 '''
 
 __all__ = ('Loader', 'LoaderBase', 'ProxyImage')
 
-from kivy import kivy_data_dir
+from kivy import kivy_data_dir, kivy_home_dir
 from kivy.logger import Logger
 from kivy.clock import Clock
 from kivy.cache import Cache
-from kivy.core.image import ImageLoader, Image
+from kivy.core.image import ImageLoader, ImageLoaderBase, Image, \
+    image_cost, _fmt_bpp
+from kivy.graphics.texture import Texture
 from kivy.compat import PY2, string_types
 
 from collections import deque
-from time import sleep
-from os.path import join
-from os import write, close, unlink, environ
+from heapq import heappush, heappop
+from itertools import count
+from os.path import join, exists
+from os import write, close, unlink, environ, makedirs, rename
+from weakref import ref
+from hashlib import sha1
+from time import time
+from timeit import default_timer
+from email.utils import parsedate_tz, mktime_tz
+import json
 import threading
 import mimetypes
 
 # Register a cache for loader
-Cache.register('kv.loader', limit=500, timeout=60)
+Cache.register('kv.loader', limit=500, timeout=60, cost=image_cost)
+
+# data of a request cancelled by a worker, see LoaderBase._update()
+_load_cancelled = object()
 
 
 class ProxyImage(Image):
@@ -76,6 +137,243 @@ class ProxyImage(Image):
         pass
 
 
+class _DiskCache(object):
+    '''(internal) Persistent cache of the downloaded files, keyed by url.
+    The files are stored in `directory` with an index of their url, size,
+    validators and last access time.
+    '''
+
+    def __init__(self, directory, max_size):
+        super(_DiskCache, self).__init__()
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _get_index(self):
+        if self._index is None:
+            self._index = {}
+            try:
+                if not exists(self.directory):
+                    makedirs(self.directory)
+                with open(join(self.directory, 'index.json')) as fd:
+                    self._index = json.load(fd)
+            except (IOError, OSError, ValueError):
+                pass
+            # forget the entries whose file was deleted
+            for name, entry in list(self._index.items()):
+                if not exists(join(self.directory, name + entry['suffix'])):
+                    del self._index[name]
+        return self._index
+
+    def _save_index(self):
+        filename = join(self.directory, 'index.json')
+        try:
+            with open(filename + '.tmp', 'w') as fd:
+                json.dump(self._index, fd)
+            if exists(filename):
+                unlink(filename)
+            rename(filename + '.tmp', filename)
+        except (IOError, OSError):
+            Logger.exception('Loader: unable to save the disk cache index')
+
+    @staticmethod
+    def _name(url):
+        return sha1(url.encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        '''Return the entry of `url` with its `path`, or None.
+        '''
+        name = self._name(url)
+        with self._lock:
+            entry = self._get_index().get(name)
+            if entry is None:
+                return None
+            entry['atime'] = time()
+            entry = dict(entry)
+        entry['path'] = join(self.directory, name + entry['suffix'])
+        return entry
+
+    @staticmethod
+    def is_fresh(entry):
+        return entry['expires'] is not None and time() < entry['expires']
+
+    @staticmethod
+    def cacheable(headers):
+        cache_control = (headers.get('Cache-Control') or '').lower()
+        return 'no-store' not in cache_control
+
+    def _update_entry(self, entry, headers):
+        if headers.get('ETag'):
+            entry['etag'] = headers.get('ETag')
+        if headers.get('Last-Modified'):
+            entry['last_modified'] = headers.get('Last-Modified')
+        expires = None
+        cache_control = (headers.get('Cache-Control') or '').lower()
+        for directive in cache_control.split(','):
+            directive = directive.strip()
+            if directive.startswith('max-age='):
+                try:
+                    expires = time() + int(directive[8:])
+                except ValueError:
+                    pass
+            elif directive == 'no-cache':
+                expires = 0
+        if expires is None and headers.get('Expires'):
+            date = parsedate_tz(headers.get('Expires'))
+            expires = mktime_tz(date) if date else 0
+        entry['expires'] = expires or None
+        entry['atime'] = time()
+
+    def touch(self, url, headers):
+        '''Update the validators and the expiry of `url` after it was
+        revalidated.
+        '''
+        name = self._name(url)
+        with self._lock:
+            entry = self._get_index().get(name)
+            if entry is not None:
+                self._update_entry(entry, headers)
+                self._save_index()
+
+    def put(self, url, data, suffix, headers):
+        '''Store the downloaded `data` of `url`, and return the path of the
+        file.
+        '''
+        name = self._name(url)
+        suffix = suffix or ''
+        path = join(self.directory, name + suffix)
+        with self._lock:
+            index = self._get_index()
+            old = index.pop(name, None)
+            if old is not None and old['suffix'] != suffix:
+                self._unlink(name + old['suffix'])
+            with open(path + '.tmp', 'wb') as fd:
+                fd.write(data)
+            if exists(path):
+                unlink(path)
+            rename(path + '.tmp', path)
+            entry = index[name] = {
+                'url': url, 'suffix': suffix, 'size': len(data),
+                'etag': None, 'last_modified': None}
+            self._update_entry(entry, headers)
+            self._shrink(keep=name)
+            self._save_index()
+        return path
+
+    def remove(self, url):
+        name = self._name(url)
+        with self._lock:
+            entry = self._get_index().pop(name, None)
+            if entry is not None:
+                self._unlink(name + entry['suffix'])
+                self._save_index()
+
+    def _unlink(self, filename):
+        try:
+            unlink(join(self.directory, filename))
+        except OSError:
+            pass
+
+    def _shrink(self, keep):
+        index = self._index
+        size = sum(entry['size'] for entry in index.values())
+        if size <= self.max_size:
+            return
+        for name in sorted(index, key=lambda name: index[name]['atime']):
+            if size <= self.max_size:
+                break
+            if name == keep:
+                continue
+            entry = index.pop(name)
+            self._unlink(name + entry['suffix'])
+            size -= entry['size']
+
+
+class _SlicedUpload(object):
+    '''(internal) Upload of a large image in its texture by slices of rows,
+    spread over several frames.
+    '''
+
+    def __init__(self, filename, image, slice_bytes):
+        super(_SlicedUpload, self).__init__()
+        self.filename = filename
+        self.image = image
+        self.imagedata = imagedata = image._data[0]
+        self.width, self.height, data, self.rowlength = imagedata.mipmaps[0]
+        self.data = memoryview(data)
+        self.stride = self.rowlength or self.width * _fmt_bpp[imagedata.fmt]
+        self.rows = max(1, slice_bytes // self.stride)
+        self.row = 0
+        self.fmt = imagedata.fmt
+        self.texture = Texture.create(
+            size=(self.width, self.height), colorfmt=imagedata.fmt)
+
+    @staticmethod
+    def can_slice(image, slice_bytes):
+        if not isinstance(image, ImageLoaderBase) or image._mipmap:
+            return False
+        if image._textures is not None or len(image._data) != 1:
+            return False
+        imagedata = image._data[0]
+        if imagedata.fmt not in ('rgb', 'rgba') or imagedata.have_mipmap:
+            return False
+        data = imagedata.mipmaps[0][2]
+        return data is not None and len(data) > slice_bytes
+
+    def next_cost(self):
+        return min(self.rows, self.height - self.row) * self.stride
+
+    def upload_next(self):
+        '''Upload the next slice, return True when the upload is done.
+        '''
+        row = self.row
+        rows = min(self.rows, self.height - row)
+        # blit_buffer() doesn't take a read-only view, only bytes
+        self.texture.blit_buffer(
+            self.data[row * self.stride:(row + rows) * self.stride].tobytes(),
+            size=(self.width, rows), colorfmt=self.fmt,
+            pos=(0, row), rowlength=self.rowlength)
+        self.row += rows
+        return self.row >= self.height
+
+    def finish(self):
+        '''Give the texture to the image, as ImageLoaderBase.populate()
+        would have done.
+        '''
+        image = self.image
+        texture = self.texture
+        fname = image.filename
+        chr = type(fname)
+        uid = chr(u'%s|%d|%d') % (fname, image._mipmap, 0)
+        if not image.nocache:
+            Cache.append('kv.texture', uid, texture)
+        if self.imagedata.flip_vertical:
+            texture.flip_vertical()
+        image._textures = [texture]
+        # the texture has no source to be reloaded from
+        texture.add_reload_observer(self._reload)
+        image._sliced_upload = self
+        self.data = None
+        if exists(image.filename):
+            # don't keep the image in memory as well, it is decoded again
+            # from its file when the texture is reloaded
+            self.imagedata.release_data()
+            self.imagedata = None
+
+    def _reload(self, texture):
+        imagedata = self.imagedata
+        if imagedata is None:
+            try:
+                imagedata = ImageLoader.load(
+                    self.image.filename, nocache=True, keep_data=True)._data[0]
+            except Exception:
+                Logger.exception(
+                    'Loader: unable to reload <%s>' % self.filename)
+                return
+        texture.blit_data(imagedata)
+
+
 class LoaderBase(object):
     '''Common base for the Loader and specific implementations.
     By default, the Loader will be the best available loader implementation.
@@ -89,15 +387,34 @@ class LoaderBase(object):
         self._error_image = None
         self._num_workers = 2
         self._max_upload_per_frame = 2
+        self._max_upload_time = None
+        self._max_upload_bytes = None
+        self._upload_slice_bytes = None
+        # measured upload time per byte
+        self._upload_rate = 0.
+        self._sliced_upload = None
+        self._disk_cache_dir = join(kivy_home_dir, 'cache', 'loader')
+        self._disk_cache_size = 50 * 1024 * 1024
+        self._disk_cache = None
+        self._disk_cache_lock = threading.Lock()
         self._paused = False
         self._resume_cond = threading.Condition()
 
-        self._q_load = deque()
+        # heap of the pending requests, see _push_request()
+        self._q_load = []
         self._q_done = deque()
-        self._client = []
+        # requests not loaded yet, by filename
+        self._requests = {}
+        self._request_order = count()
+        # notified when the loaded images are consumed by _update()
+        self._done_cond = threading.Condition()
+        self._in_flight = 0
         self._running = False
         self._start_wanted = False
         self._trigger_update = Clock.create_trigger(self._update)
+        # run() is only scheduled when there is a request to give to the
+        # workers, so that an idle loader doesn't keep the clock busy
+        self._trigger_run = Clock.create_trigger(self.run)
 
     def __del__(self):
         try:
@@ -155,8 +472,106 @@ class LoaderBase(object):
     look at the DDS format.
 
     .. versionadded:: 1.6.0
+
+    .. versionchanged:: 1.9.1
+        Can be None, to only limit the uploads with :attr:`max_upload_time`
+        or :attr:`max_upload_bytes`.
+    '''
+
+    def _set_max_upload_time(self, value):
+        self._max_upload_time = value
+
+    def _get_max_upload_time(self):
+        return self._max_upload_time
+
+    max_upload_time = property(_get_max_upload_time, _set_max_upload_time)
+    '''Maximum time spent uploading images to the GPU per frame, in
+    seconds. The upload time of an image is predicted from its size and the
+    duration of the previous uploads, and the image is kept for the next
+    frame if it would exceed the budget. At least one image (or slice, see
+    :attr:`upload_slice_bytes`) is uploaded per frame. Defaults to None, no
+    limit::
+
+        # don't spend more than 4ms per frame uploading images
+        Loader.max_upload_time = .004
+        Loader.max_upload_per_frame = None
+
+    .. versionadded:: 1.9.1
+    '''
+
+    def _set_max_upload_bytes(self, value):
+        self._max_upload_bytes = value
+
+    def _get_max_upload_bytes(self):
+        return self._max_upload_bytes
+
+    max_upload_bytes = property(_get_max_upload_bytes, _set_max_upload_bytes)
+    '''Maximum number of bytes uploaded to the GPU per frame. At least one
+    image (or slice, see :attr:`upload_slice_bytes`) is uploaded per frame.
+    Defaults to None, no limit.
+
+    .. versionadded:: 1.9.1
+    '''
+
+    def _set_upload_slice_bytes(self, value):
+        self._upload_slice_bytes = value
+
+    def _get_upload_slice_bytes(self):
+        return self._upload_slice_bytes
+
+    upload_slice_bytes = property(_get_upload_slice_bytes,
+                                  _set_upload_slice_bytes)
+    '''If set, the images larger than this number of bytes are uploaded to
+    the GPU in slices of rows of about this size, one upload per slice. With
+    :attr:`max_upload_time` or :attr:`max_upload_bytes`, the upload of a
+    large image is then spread over several frames. Only the rgb and rgba
+    images without mipmaps are sliced. Defaults to None, no slicing.
+
+    The decoded data of a sliced image is released once uploaded, if the
+    image was read from a file that is kept (a local file or the disk
+    cache). It is decoded again from the file when the GL context is
+    reloaded.
+
+    .. versionadded:: 1.9.1
     '''
 
+    def _set_disk_cache_dir(self, directory):
+        self._disk_cache_dir = directory
+        self._disk_cache = None
+
+    def _get_disk_cache_dir(self):
+        return self._disk_cache_dir
+
+    disk_cache_dir = property(_get_disk_cache_dir, _set_disk_cache_dir)
+    '''Directory of the disk cache of the downloaded images. Defaults to
+    the `cache/loader` directory in the Kivy home directory.
+
+    .. versionadded:: 1.9.1
+    '''
+
+    def _set_disk_cache_size(self, size):
+        self._disk_cache_size = size
+        self._disk_cache = None
+
+    def _get_disk_cache_size(self):
+        return self._disk_cache_size
+
+    disk_cache_size = property(_get_disk_cache_size, _set_disk_cache_size)
+    '''Maximum size of the disk cache of the downloaded images, in bytes.
+    Defaults to 50MB. If 0 or None, the disk cache is disabled.
+
+    .. versionadded:: 1.9.1
+    '''
+
+    def _get_disk_cache(self):
+        if not self._disk_cache_size:
+            return None
+        with self._disk_cache_lock:
+            if self._disk_cache is None:
+                self._disk_cache = _DiskCache(
+                    self._disk_cache_dir, self._disk_cache_size)
+            return self._disk_cache
+
     def _get_loading_image(self):
         if not self._loading_image:
             loading_png_fn = join(kivy_data_dir, 'images', 'image-loading.gif')
@@ -213,6 +628,8 @@ class LoaderBase(object):
     def stop(self):
         '''Stop the loader thread/process.'''
         self._running = False
+        with self._done_cond:
+            self._done_cond.notify_all()
 
     def pause(self):
         '''Pause the loader, can be useful during interactions.
@@ -237,32 +654,89 @@ class LoaderBase(object):
             self._resume_cond.wait(0.25)
             self._resume_cond.release()
 
-    def _load(self, kwargs):
+    def _push_request(self, request):
+        # the heap entries are [-priority, order, request]. Changing the
+        # priority of a request pushes a new entry, the old one is skipped
+        # as its order doesn't match the request anymore.
+        request['order'] = order = next(self._request_order)
+        heappush(self._q_load, (-request['priority'], order, request))
+        self._trigger_run()
+
+    def _pop_request(self):
+        '''(internal) Return the pending request with the highest priority,
+        or None. Requests without any client left are cancelled.
+        '''
+        q_load = self._q_load
+        while q_load:
+            priority, order, request = heappop(q_load)
+            if request['order'] != order or request['state'] != 'queued':
+                continue
+            if not self._has_clients(request):
+                self._cancel_request(request)
+                continue
+            request['state'] = 'loading'
+            return request
+
+    def _has_clients(self, request):
+        for client in request['clients']:
+            if client() is not None:
+                return True
+        return False
+
+    def _cancel_request(self, request):
+        request['state'] = 'cancelled'
+        filename = request['filename']
+        if self._requests.get(filename) is request:
+            del self._requests[filename]
+            # forget the placeholder, so the image is loaded if requested
+            # again
+            if Cache.get('kv.loader', filename) is False:
+                Cache.remove('kv.loader', filename)
+
+    def _load(self, request):
         '''(internal) Loading function, called by the thread.
         Will call _load_local() if the file is local,
         or _load_urllib() if the file is on Internet.
         '''
+        try:
+            self._load_request(request)
+        finally:
+            with self._done_cond:
+                self._in_flight -= 1
+            # a worker is free for the next request
+            self._trigger_run()
 
-        while len(self._q_done) >= (
-                self.max_upload_per_frame * self._num_workers):
-            sleep(0.1)
+    def _load_request(self, request):
+        with self._done_cond:
+            while self._running and len(self._q_done) >= (
+                    (self._max_upload_per_frame or 2) * self._num_workers):
+                self._done_cond.wait()
 
         self._wait_for_resume()
 
-        filename = kwargs['filename']
-        load_callback = kwargs['load_callback']
-        post_callback = kwargs['post_callback']
+        filename = request['filename']
+        if not self._has_clients(request):
+            # the clients were collected while waiting, let _update()
+            # cancel the request
+            self._q_done.appendleft((filename, _load_cancelled))
+            self._trigger_update()
+            return
+
+        load_callback = request['load_callback']
+        post_callback = request['post_callback']
         try:
             proto = filename.split(':', 1)[0]
         except:
-            #if blank filename then return
+            #if blank filename, finish the request with the error image
+            self._q_done.appendleft((filename, self.error_image))
+            self._trigger_update()
             return
         if load_callback is not None:
             data = load_callback(filename)
         elif proto in ('http', 'https', 'ftp', 'smb'):
-            data = self._load_urllib(filename, kwargs['kwargs'])
+            data = self._load_urllib(filename, request['kwargs'])
         else:
-            data = self._load_local(filename, kwargs['kwargs'])
+            data = self._load_local(filename, request['kwargs'])
 
         if post_callback:
             data = post_callback(data)
@@ -276,9 +750,16 @@ class LoaderBase(object):
         # we might be unable to recreate the texture afterwise.
         return ImageLoader.load(filename, keep_data=True, **kwargs)
 
+    def _load_cached(self, filename, path, kwargs):
+        '''(internal) Loading a network file from the disk cache.'''
+        data = self._load_local(path, kwargs)
+        for imdata in data._data:
+            imdata.source = filename
+        return data
+
     def _load_urllib(self, filename, kwargs):
         '''(internal) Loading a network file. First download it, save it to a
-        temporary file, and pass it to _load_local().'''
+        temporary file or to the disk cache, and pass it to _load_local().'''
         if PY2:
             import urllib2 as urllib_request
 
@@ -299,6 +780,18 @@ class LoaderBase(object):
                 Logger.warning(
                     'Loader: can not load PySMB: make sure it is installed')
                 return
+        disk_cache = entry = None
+        if proto in ('http', 'https') and not kwargs.get('nocache', False):
+            disk_cache = self._get_disk_cache()
+        if disk_cache is not None:
+            entry = disk_cache.get(filename)
+            if entry is not None and disk_cache.is_fresh(entry):
+                try:
+                    return self._load_cached(filename, entry['path'], kwargs)
+                except Exception:
+                    disk_cache.remove(filename)
+                    entry = None
+
         import tempfile
         data = fd = _out_osfd = None
         try:
@@ -307,6 +800,28 @@ class LoaderBase(object):
             if proto == 'smb':
                 # read from samba shares
                 fd = urllib_request.build_opener(SMBHandler).open(filename)
+            elif entry is not None:
+                # revalidate the cached file
+                request = urllib_request.Request(filename)
+                if entry['etag']:
+                    request.add_header('If-None-Match', entry['etag'])
+                if entry['last_modified']:
+                    request.add_header(
+                        'If-Modified-Since', entry['last_modified'])
+                try:
+                    fd = urllib_request.urlopen(request)
+                except urllib_request.HTTPError as e:
+                    if e.code in (404, 410):
+                        # the file is gone from the server
+                        disk_cache.remove(filename)
+                        raise
+                    if e.code == 304:
+                        disk_cache.touch(filename, e.info())
+                    # a server error, use the cached file
+                    return self._load_cached(filename, entry['path'], kwargs)
+                except urllib_request.URLError:
+                    # offline, use the cached file
+                    return self._load_cached(filename, entry['path'], kwargs)
             else:
                 # read from internet
                 fd = urllib_request.urlopen(filename)
@@ -326,35 +841,36 @@ class LoaderBase(object):
                     if len(parts) > 1 and '.' in parts[-1]:
                         # we don't want '.com', '.net', etc. as the extension
                         suffix = '.' + parts[-1].split('.')[-1]
-            _out_osfd, _out_filename = tempfile.mkstemp(
-                prefix='kivyloader', suffix=suffix)
-
+            info = fd.info()
             idata = fd.read()
             fd.close()
             fd = None
 
-            # write to local filename
-            write(_out_osfd, idata)
-            close(_out_osfd)
-            _out_osfd = None
+            if disk_cache is not None and disk_cache.cacheable(info):
+                # write to the disk cache, and keep the file
+                data = self._load_local(
+                    disk_cache.put(filename, idata, suffix, info), kwargs)
+            else:
+                # write to local filename
+                _out_osfd, _out_filename = tempfile.mkstemp(
+                    prefix='kivyloader', suffix=suffix)
+                write(_out_osfd, idata)
+                close(_out_osfd)
+                _out_osfd = None
 
-            # load data
-            data = self._load_local(_out_filename, kwargs)
+                # load data
+                data = self._load_local(_out_filename, kwargs)
 
             # FIXME create a clean API for that
             for imdata in data._data:
                 imdata.source = filename
         except Exception:
             Logger.exception('Loader: Failed to load image <%s>' % filename)
-            # close file when remote file not found or download error
-            try:
-                close(_out_osfd)
-            except OSError:
-                pass
             return self.error_image
         finally:
             if fd:
                 fd.close()
+            # close file when remote file not found or download error
             if _out_osfd:
                 close(_out_osfd)
             if _out_filename != '':
@@ -375,31 +891,127 @@ class LoaderBase(object):
             self._trigger_update()
             return
 
-        for x in range(self.max_upload_per_frame):
+        start = default_timer()
+        count = nbytes = 0
+        slice_bytes = self._upload_slice_bytes
+        while True:
+            sliced = self._sliced_upload
+            if sliced is not None:
+                # continue the upload of a large image
+                cost = sliced.next_cost()
+                if not self._can_upload(count, nbytes, cost, start):
+                    break
+                done = self._timed_upload(sliced.upload_next, cost)
+                count += 1
+                nbytes += cost
+                if done:
+                    self._sliced_upload = None
+                    sliced.finish()
+                    self._deliver(sliced.filename, sliced.image)
+                continue
+
             try:
-                filename, data = self._q_done.pop()
+                filename, data = self._q_done[-1]
             except IndexError:
                 return
 
-            # create the image
-            image = data  # ProxyImage(data)
-            if not image.nocache:
-                Cache.append('kv.loader', filename, image)
-
-            # update client
-            for c_filename, client in self._client[:]:
-                if filename != c_filename:
+            if data is None:
+                # a load or post callback returned nothing
+                Logger.error('Loader: no image loaded for <%s>' % filename)
+                data = self.error_image
+
+            sliced = False
+            if data is not _load_cancelled:
+                cost = image_cost(data)
+                if slice_bytes and _SlicedUpload.can_slice(data, slice_bytes):
+                    sliced = True
+                    cost = slice_bytes
+                if not self._can_upload(count, nbytes, cost, start):
+                    break
+
+            self._q_done.pop()
+            with self._done_cond:
+                self._done_cond.notify()
+
+            if data is _load_cancelled:
+                # cancelled by the worker, unless a client came meanwhile
+                request = self._requests.get(filename)
+                if request is None:
                     continue
-                # got one client to update
-                client.image = image
-                client.loaded = True
-                client.dispatch('on_load')
-                self._client.remove((c_filename, client))
+                if self._has_clients(request):
+                    request['state'] = 'queued'
+                    self._push_request(request)
+                else:
+                    self._cancel_request(request)
+                continue
+
+            if sliced:
+                self._sliced_upload = _SlicedUpload(
+                    filename, data, slice_bytes)
+                continue
+
+            # upload the texture now, to measure it
+            if isinstance(data, ImageLoaderBase) and data._textures is None:
+                self._timed_upload(data.populate, cost)
+            count += 1
+            nbytes += cost
+            self._deliver(filename, data)
 
         self._trigger_update()
 
+    def _can_upload(self, count, nbytes, cost, start):
+        '''(internal) Return True if an upload of `cost` bytes fits in the
+        budget of the frame, after `count` uploads of `nbytes` bytes since
+        `start`.
+        '''
+        if count == 0:
+            return True
+        limit = self._max_upload_per_frame
+        if limit is not None and count >= limit:
+            return False
+        limit = self._max_upload_bytes
+        if limit is not None and nbytes + cost > limit:
+            return False
+        limit = self._max_upload_time
+        if limit is not None:
+            elapsed = default_timer() - start
+            if elapsed + cost * self._upload_rate > limit:
+                return False
+        return True
+
+    def _timed_upload(self, upload, cost):
+        start = default_timer()
+        result = upload()
+        duration = default_timer() - start
+        if cost > 0:
+            # running average of the upload time per byte
+            rate = duration / cost
+            if self._upload_rate:
+                rate = self._upload_rate * .8 + rate * .2
+            self._upload_rate = rate
+        return result
+
+    def _deliver(self, filename, image):
+        '''(internal) Give a loaded image to the clients of its request.
+        '''
+        if not image.nocache:
+            Cache.append('kv.loader', filename, image)
+
+        request = self._requests.pop(filename, None)
+        if request is None:
+            return
+        request['state'] = 'done'
+        for client in request['clients']:
+            client = client()
+            if client is None:
+                continue
+            # got one client to update
+            client.image = image
+            client.loaded = True
+            client.dispatch('on_load')
+
     def image(self, filename, load_callback=None, post_callback=None,
-              **kwargs):
+              priority=0, **kwargs):
         '''Load a image using the Loader. A ProxyImage is returned with a
         loading image. You can use it as follows::
 
@@ -420,7 +1032,16 @@ class LoaderBase(object):
 
             TestApp().run()
 
+        The images are loaded by decreasing `priority`, see
+        :meth:`set_priority`. The loader keeps only a weak reference to the
+        returned ProxyImage: the loading is cancelled if it is not referenced
+        anymore.
+
         In order to cancel all background loading, call *Loader.stop()*.
+
+        .. versionchanged:: 1.9.1
+            The `priority` parameter was added, and the loading is cancelled
+            when the ProxyImage is garbage collected.
         '''
         data = Cache.get('kv.loader', filename)
         if data not in (None, False):
@@ -431,25 +1052,62 @@ class LoaderBase(object):
 
         client = ProxyImage(self.loading_image,
                             loading_image=self.loading_image, **kwargs)
-        self._client.append((filename, client))
 
-        if data is None:
-            # if data is None, this is really the first time
-            self._q_load.appendleft({
+        request = self._requests.get(filename)
+        if request is None:
+            # this is really the first time
+            self._requests[filename] = request = {
                 'filename': filename,
                 'load_callback': load_callback,
                 'post_callback': post_callback,
-                'kwargs': kwargs})
+                'kwargs': kwargs,
+                'priority': priority,
+                'state': 'queued',
+                'clients': []}
+            self._push_request(request)
             if not kwargs.get('nocache', False):
                 Cache.append('kv.loader', filename, False)
             self._start_wanted = True
             self._trigger_update()
-        else:
+        elif priority > request['priority']:
             # already queued for loading
-            pass
+            self.set_priority(client, priority, request)
+        request['clients'].append(ref(client))
+        client._loader_request = request
 
         return client
 
+    def set_priority(self, client, priority, request=None):
+        '''Change the priority of the loading of a :class:`ProxyImage`
+        returned by :meth:`image`. The images with the highest priority are
+        loaded first. It has no effect if the image is already loading or
+        loaded.
+
+        .. versionadded:: 1.9.1
+        '''
+        if request is None:
+            request = getattr(client, '_loader_request', None)
+        if request is None or request['state'] != 'queued':
+            return
+        if request['priority'] != priority:
+            request['priority'] = priority
+            self._push_request(request)
+
+    def cancel(self, client):
+        '''Cancel the loading of a :class:`ProxyImage` returned by
+        :meth:`image`. The image is not loaded if no other client is waiting
+        for it.
+
+        .. versionadded:: 1.9.1
+        '''
+        request = getattr(client, '_loader_request', None)
+        if request is None or request['state'] not in ('queued', 'loading'):
+            return
+        request['clients'] = [
+            c for c in request['clients'] if c() not in (None, client)]
+        if request['state'] == 'queued' and not request['clients']:
+            self._cancel_request(request)
+
 #
 # Loader implementation
 #
@@ -513,20 +1171,23 @@ else:
         def start(self):
             super(LoaderThreadPool, self).start()
             self.pool = _ThreadPool(self._num_workers)
-            Clock.schedule_interval(self.run, 0)
+            self._trigger_run()
 
         def stop(self):
             super(LoaderThreadPool, self).stop()
-            Clock.unschedule(self.run)
+            self._trigger_run.cancel()
             self.pool.stop()
 
         def run(self, *largs):
-            while self._running:
-                try:
-                    parameters = self._q_load.pop()
-                except:
+            # only give the workers the requests they can start now, the
+            # others stay in the priority queue
+            while self._running and self._in_flight < self._num_workers:
+                request = self._pop_request()
+                if request is None:
                     return
-                self.pool.add_task(self._load, parameters)
+                with self._done_cond:
+                    self._in_flight += 1
+                self.pool.add_task(self._load, request)
 
     Loader = LoaderThreadPool()
     Logger.info('Loader: using a thread pool of {} workers'.format(
@@ -6,7 +6,15 @@ The Monitor module is a toolbar that shows the activity of your current
 application :
 
 * FPS
+* GL calls of the last frame: draw calls, texture binds, shader binds,
+  uniform and buffer uploads with their size, see
+  :meth:`~kivy.graphics.context.Context.get_gl_stats`
 * Graph of input events
+* Statistics of the :class:`~kivy.cache.Cache` categories using the most
+  memory: number of objects, hit rate and size
+
+.. versionchanged:: 1.9.1
+    The cache statistics and the GL calls were added.
 
 Usage
 -----
@@ -19,7 +27,9 @@ __all__ = ('start', 'stop')
 
 from kivy.uix.label import Label
 from kivy.graphics import Rectangle, Color
+from kivy.graphics.context import get_context
 from kivy.clock import Clock
+from kivy.cache import Cache
 from functools import partial
 
 _statsinput = 0
@@ -27,11 +37,33 @@ _maxinput = -1
 
 
 def update_fps(ctx, *largs):
-    ctx.label.text = 'FPS: %f' % Clock.get_fps()
+    stats = get_context().get_gl_stats()
+    ctx.label.text = (
+        'FPS: %f  GL: %d draws, %d textures, %d shaders, %d uniforms, '
+        '%d uploads (%.1fKB)' % (
+            Clock.get_fps(), stats['draw_calls'], stats['texture_binds'],
+            stats['shader_binds'], stats['uniform_uploads'],
+            stats['buffer_uploads'], stats['buffer_upload_bytes'] / 1024.))
     ctx.rectangle.texture = ctx.label.texture
     ctx.rectangle.size = ctx.label.texture_size
 
 
+def update_cache(ctx, *largs):
+    stats = Cache.get_stats()
+    names = sorted(stats, key=lambda name: stats[name]['cost'], reverse=True)
+    text = []
+    for name in names[:4]:
+        stat = stats[name]
+        requests = stat['hits'] + stat['misses']
+        hitrate = stat['hits'] * 100. / requests if requests else 0.
+        text.append('%s: %d, %d%%, %.1fMB' % (
+            name, stat['count'], hitrate, stat['cost'] / 1048576.))
+    ctx.cachelabel.text = '  '.join(text)
+    ctx.cachelabel.texture_update()
+    ctx.cacherectangle.texture = ctx.cachelabel.texture
+    ctx.cacherectangle.size = ctx.cachelabel.texture_size
+
+
 def update_stats(ctx, *largs):
     global _statsinput
     ctx.stats = ctx.stats[1:] + [_statsinput]
@@ -57,6 +89,7 @@ def start(win, ctx):
     kivy_postproc_modules['fps'] = StatsInput()
     global _ctx
     ctx.label = Label(text='FPS: 0.0')
+    ctx.cachelabel = Label(text='', font_size='11sp')
     ctx.inputstats = 0
     ctx.stats = []
     ctx.statsr = []
@@ -64,8 +97,11 @@ def start(win, ctx):
         ctx.color = Color(1, 0, 0, .5)
         ctx.rectangle = Rectangle(pos=(0, win.height - 25),
                                   size=(win.width, 25))
+        ctx.color = Color(1, 0, 0, .3)
+        Rectangle(pos=(0, win.height - 45), size=(win.width, 20))
         ctx.color = Color(1, 1, 1)
         ctx.rectangle = Rectangle(pos=(5, win.height - 20))
+        ctx.cacherectangle = Rectangle(pos=(5, win.height - 42))
         ctx.color = Color(1, 1, 1, .5)
         for x in range(64):
             ctx.stats.append(0)
@@ -74,6 +110,7 @@ def start(win, ctx):
                           size=(4, 0)))
     Clock.schedule_interval(partial(update_fps, ctx), .5)
     Clock.schedule_interval(partial(update_stats, ctx), 1 / 60.)
+    Clock.schedule_interval(partial(update_cache, ctx), 1.)
 
 
 def stop(win, ctx):
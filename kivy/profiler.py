@@ -0,0 +1,338 @@
+'''
+Frame profiler
+==============
+
+.. versionadded:: 1.9.1
+
+The :class:`FrameProfiler` records how the time of each frame is spent, to
+find what blows the frame budget without attaching an external profiler.
+Once installed on the :attr:`~kivy.clock.Clock`, every frame is split into
+phases:
+
+* `clock`: the :class:`~kivy.clock.Clock` callbacks run by
+  :meth:`~kivy.clock.ClockBase.tick`,
+* `input`: reading and dispatching the input events,
+* `sync`: the delayed canvas expressions executed by
+  :meth:`~kivy.lang.BuilderBase.sync`,
+* `before_frame`: the callbacks scheduled with a timeout of -1, run by
+  :meth:`~kivy.clock.ClockBase.tick_draw`,
+* `draw`: the compilation and drawing of the window canvas,
+* `flip`: the swap of the window buffers.
+
+Each clock callback is also recorded with its qualified name and duration.
+The last frames are kept in a ring buffer that can be queried or dumped::
+
+    from kivy.clock import Clock
+    from kivy.profiler import FrameProfiler
+
+    Clock.profiler = FrameProfiler(max_frames=600)
+
+    # later, get the frames that took more than 16ms
+    for frame in Clock.profiler.get_frames(min_duration=.016):
+        print(frame['duration'], frame['phases'], frame['callbacks'])
+
+    # or save them for chrome://tracing
+    Clock.profiler.dump_chrome_trace('frames.json')
+
+Set :attr:`~kivy.clock.ClockBase.profiler` back to None to stop profiling;
+no time is measured when no profiler is installed.
+
+Dispatch profiler
+-----------------
+
+The :class:`DispatchProfiler` finds the properties and events that are
+dispatched the most, and their slowest callbacks. While it is started, every
+callback called by a property change or an event dispatch is recorded with
+its duration, per class of the dispatching object, property or event name and
+callback name::
+
+    from kivy.profiler import DispatchProfiler
+
+    profiler = DispatchProfiler()
+    profiler.start()
+    # ... use the application
+    profiler.stop()
+    print(profiler.report(limit=20))
+
+The durations include the dispatches triggered by the callback itself. When
+no profiler is started, the only cost of a dispatch is a check of a global.
+'''
+
+__all__ = ('FrameProfiler', 'DispatchProfiler')
+
+import json
+from collections import deque
+from functools import partial
+from timeit import default_timer
+
+
+def callback_name(callback):
+    '''Return a readable name of a clock callback, its qualified name when
+    available.
+    '''
+    if callback is None:
+        return None
+    if isinstance(callback, partial):
+        return 'partial(%s)' % callback_name(callback.func)
+    name = getattr(callback, '__qualname__', None)
+    if name is None:
+        name = getattr(callback, '__name__', None)
+        obj = getattr(callback, '__self__', None)
+        if name is not None and obj is not None:
+            name = '%s.%s' % (obj.__class__.__name__, name)
+    if name is None:
+        name = repr(callback)
+    return name
+
+
+class FrameProfiler(object):
+    '''Ring buffer of the timings of the last `max_frames` frames.
+
+    :Parameters:
+        `max_frames`: int, defaults to 300
+            Number of frames kept.
+    '''
+
+    #: Timer used for all the measures, in seconds.
+    timer = staticmethod(default_timer)
+
+    callback_name = staticmethod(callback_name)
+
+    def __init__(self, max_frames=300):
+        super(FrameProfiler, self).__init__()
+        self.max_frames = max_frames
+        self._frames = deque(maxlen=max_frames)
+        self._frame = None
+        self._index = 0
+
+    def begin_frame(self):
+        '''Start recording a new frame, ending the current one if any.
+        '''
+        if self._frame is not None:
+            self.end_frame()
+        self._frame = [self._index, self.timer(), 0., []]
+        self._index += 1
+
+    def end_frame(self):
+        '''End the current frame and push it in the ring buffer.
+        '''
+        frame = self._frame
+        if frame is None:
+            return
+        frame[2] = self.timer()
+        self._frames.append(frame)
+        self._frame = None
+
+    def add_phase(self, name, start):
+        '''Record the phase `name` of the current frame, started at `start`
+        (a value of :attr:`timer`) and ending now.
+        '''
+        self._add_span(name, 'phase', start)
+
+    def add_callback(self, name, start):
+        '''Record the clock callback `name`, started at `start` (a value of
+        :attr:`timer`) and ending now.
+        '''
+        if name is not None:
+            self._add_span(name, 'callback', start)
+
+    def _add_span(self, name, category, start):
+        end = self.timer()
+        if self._frame is None:
+            self.begin_frame()
+        self._frame[3].append((name, category, start, end - start))
+
+    def clear(self):
+        '''Remove all the recorded frames.
+        '''
+        self._frames.clear()
+        self._frame = None
+
+    def get_frames(self, min_duration=0.):
+        '''Return the recorded frames, oldest first, as a list of dicts with
+        the keys:
+
+        * `index`: the number of the frame since the profiler creation,
+        * `start`: the start time of the frame, in seconds,
+        * `duration`: the duration of the frame, in seconds,
+        * `phases`: a dict of the duration of each phase,
+        * `callbacks`: a list of `(name, duration)` of the clock callbacks,
+          in call order.
+
+        Only the frames lasting at least `min_duration` seconds are returned.
+        '''
+        frames = []
+        for index, start, end, spans in self._frames:
+            duration = end - start
+            if duration < min_duration:
+                continue
+            phases = {}
+            callbacks = []
+            for name, category, span_start, span_duration in spans:
+                if category == 'phase':
+                    phases[name] = phases.get(name, 0.) + span_duration
+                else:
+                    callbacks.append((name, span_duration))
+            frames.append({
+                'index': index, 'start': start, 'duration': duration,
+                'phases': phases, 'callbacks': callbacks})
+        return frames
+
+    def get_callback_stats(self):
+        '''Return the statistics of the clock callbacks over the recorded
+        frames, as a list of `(name, count, total, maximum)` sorted by total
+        time, the most expensive first.
+        '''
+        stats = {}
+        for frame in self._frames:
+            for name, category, start, duration in frame[3]:
+                if category != 'callback':
+                    continue
+                stat = stats.get(name)
+                if stat is None:
+                    stats[name] = [1, duration, duration]
+                else:
+                    stat[0] += 1
+                    stat[1] += duration
+                    stat[2] = max(stat[2], duration)
+        result = [(name, stat[0], stat[1], stat[2])
+                  for name, stat in stats.items()]
+        result.sort(key=lambda x: x[2], reverse=True)
+        return result
+
+    def to_chrome_trace(self):
+        '''Return the recorded frames in the Chrome trace event format, as a
+        dict that can be serialized to JSON and loaded in chrome://tracing.
+        '''
+        events = []
+        for index, start, end, spans in self._frames:
+            events.append({
+                'name': 'frame %d' % index, 'cat': 'frame', 'ph': 'X',
+                'ts': start * 1e6, 'dur': (end - start) * 1e6,
+                'pid': 0, 'tid': 0})
+            for name, category, span_start, duration in spans:
+                events.append({
+                    'name': name, 'cat': category, 'ph': 'X',
+                    'ts': span_start * 1e6, 'dur': duration * 1e6,
+                    'pid': 0, 'tid': 0})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump_json(self, filename, min_duration=0.):
+        '''Save the frames returned by :meth:`get_frames` in a JSON file.
+        '''
+        with open(filename, 'w') as fd:
+            json.dump(self.get_frames(min_duration), fd)
+
+    def dump_chrome_trace(self, filename):
+        '''Save the frames in the Chrome trace event format, see
+        :meth:`to_chrome_trace`.
+        '''
+        with open(filename, 'w') as fd:
+            json.dump(self.to_chrome_trace(), fd)
+
+
+class DispatchProfiler(object):
+    '''Record the count and the duration of the callbacks of the property and
+    event dispatches, see `Dispatch profiler`_.
+
+    It can also be used as a context manager, started in the block.
+    '''
+
+    #: Timer used for all the measures, in seconds.
+    timer = staticmethod(default_timer)
+
+    callback_name = staticmethod(callback_name)
+
+    def __init__(self):
+        super(DispatchProfiler, self).__init__()
+        self._stats = {}
+
+    def start(self):
+        '''Start recording the dispatches, replacing the profiler started
+        before, if any.
+        '''
+        from kivy._event import set_dispatch_profiler
+        set_dispatch_profiler(self)
+
+    def stop(self):
+        '''Stop recording the dispatches.
+        '''
+        from kivy._event import set_dispatch_profiler
+        set_dispatch_profiler(None)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *largs):
+        self.stop()
+
+    def add_callback(self, obj, name, callback, duration):
+        '''Record the call of `callback` by the dispatch of the property or
+        event `name` of `obj`, that lasted `duration` seconds.
+        '''
+        # the bound methods are created for each call, index their function
+        key = (obj.__class__, name, getattr(callback, '__func__', callback))
+        stat = self._stats.get(key)
+        if stat is None:
+            self._stats[key] = [self.callback_name(callback), 1, duration,
+                                duration]
+        else:
+            stat[1] += 1
+            stat[2] += duration
+            if duration > stat[3]:
+                stat[3] = duration
+
+    def clear(self):
+        '''Remove all the recorded callbacks.
+        '''
+        self._stats.clear()
+
+    def get_stats(self):
+        '''Return the statistics of the callbacks, as a list of
+        `(class name, property or event name, callback name, count, total,
+        maximum)` sorted by total time, the most expensive first.
+        '''
+        result = [(cls.__name__, name, stat[0], stat[1], stat[2], stat[3])
+                  for (cls, name, callback), stat in self._stats.items()]
+        result.sort(key=lambda x: x[4], reverse=True)
+        return result
+
+    def get_dispatch_stats(self):
+        '''Return the number of callbacks called and their total time per
+        class and property or event name, as a list of `(class name, property
+        or event name, count, total)` sorted by count, the most dispatched
+        first.
+        '''
+        stats = {}
+        for (cls, name, callback), stat in self._stats.items():
+            key = (cls.__name__, name)
+            total = stats.get(key)
+            if total is None:
+                stats[key] = [stat[1], stat[2]]
+            else:
+                total[0] += stat[1]
+                total[1] += stat[2]
+        result = [key + tuple(total) for key, total in stats.items()]
+        result.sort(key=lambda x: x[2], reverse=True)
+        return result
+
+    def report(self, limit=None):
+        '''Return the statistics of :meth:`get_stats` as a text table, limited
+        to the `limit` most expensive callbacks if not None.
+        '''
+        stats = self.get_stats()
+        if limit is not None:
+            stats = stats[:limit]
+        lines = ['%10s %10s %10s  %s' % ('count', 'total ms', 'max ms',
+                                         'callback')]
+        for cls, name, callback, count, total, maximum in stats:
+            lines.append('%10d %10.3f %10.3f  %s.%s -> %s' % (
+                count, total * 1000., maximum * 1000., cls, name, callback))
+        return '\n'.join(lines)
+
+    def dump_json(self, filename):
+        '''Save the statistics of :meth:`get_stats` in a JSON file.
+        '''
+        with open(filename, 'w') as fd:
+            json.dump(self.get_stats(), fd)
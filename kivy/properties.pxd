@@ -17,6 +17,15 @@ cdef class PropertyStorage:
     cdef object setter
     cdef int alias_initial
 
+
+cdef inline EventObservers storage_observers(PropertyStorage ps, str name):
+    # the observers are only allocated when something is bound to the property
+    if ps.observers is None:
+        ps.observers = EventObservers()
+        ps.observers.name = name
+    return ps.observers
+
+
 cdef class Property:
     cdef str _name
     cdef int allownone
@@ -73,6 +82,7 @@ cdef class OptionProperty(Property):
 
 cdef class ReferenceListProperty(Property):
     cdef list properties
+    cdef object change_callback
     cpdef trigger_change(self, EventDispatcher obj, value)
     cpdef setitem(self, EventDispatcher obj, key, value)
 
@@ -82,6 +92,7 @@ cdef class AliasProperty(Property):
     cdef list bind_objects
     cdef int use_cache
     cdef public int rebind
+    cdef object change_callback
     cpdef trigger_change(self, EventDispatcher obj, value)
 
 cdef class VariableListProperty(Property):
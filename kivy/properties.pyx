@@ -324,7 +324,6 @@ cdef class Property:
 
     cdef init_storage(self, EventDispatcher obj, PropertyStorage storage):
         storage.value = self.convert(obj, self.defaultvalue)
-        storage.observers = EventObservers()
 
     cpdef link(self, EventDispatcher obj, str name):
         '''Link the instance with its real name.
@@ -361,7 +360,7 @@ cdef class Property:
         '''Add a new observer to be called only when the value is changed.
         '''
         cdef PropertyStorage ps = obj.__storage[self._name]
-        ps.observers.bind(WeakMethod(observer), 1)
+        storage_observers(ps, self._name).bind(WeakMethod(observer), 1)
 
     cpdef fast_bind(self, EventDispatcher obj, observer, tuple largs=(), dict kwargs={}):
         '''Similar to bind, except it doesn't check if the observer already
@@ -370,13 +369,14 @@ cdef class Property:
         It returns a unique positive uid to be used with unbind_uid.
         '''
         cdef PropertyStorage ps = obj.__storage[self._name]
-        return ps.observers.fast_bind(observer, largs, kwargs, 0)
+        return storage_observers(ps, self._name).fast_bind(observer, largs, kwargs, 0)
 
     cpdef unbind(self, EventDispatcher obj, observer):
         '''Remove the observer from our widget observer list.
         '''
         cdef PropertyStorage ps = obj.__storage[self._name]
-        ps.observers.unbind(observer, 1, 0)
+        if ps.observers is not None:
+            ps.observers.unbind(observer, 1, 0)
 
     cpdef fast_unbind(self, EventDispatcher obj, observer, tuple largs=(), dict kwargs={}):
         '''Remove the observer from our widget observer list bound with
@@ -384,14 +384,16 @@ cdef class Property:
         which searches for all matches.
         '''
         cdef PropertyStorage ps = obj.__storage[self._name]
-        ps.observers.fast_unbind(observer, largs, kwargs)
+        if ps.observers is not None:
+            ps.observers.fast_unbind(observer, largs, kwargs)
 
     cpdef unbind_uid(self, EventDispatcher obj, object uid):
         '''Remove the observer from our widget observer list bound with
         fast_bind using the uid.
         '''
         cdef PropertyStorage ps = obj.__storage[self._name]
-        ps.observers.unbind_uid(uid)
+        if ps.observers is not None:
+            ps.observers.unbind_uid(uid)
 
     def __set__(self, EventDispatcher obj, val):
         self.set(obj, val)
@@ -429,6 +431,34 @@ cdef class Property:
         self.dispatch(obj)
         return True
 
+    def set_many(self, objs, values):
+        '''Set the value of the property on each instance of the sequence
+        `objs` to the matching item of `values`, and return the number of
+        instances whose value changed. Only these instances are dispatched.
+
+        It avoids the attribute lookup and the descriptor call of each
+        assignment, for example to update many widgets from an array each
+        frame::
+
+            # same as: for w, x in zip(widgets, xs): w.x = x
+            Widget.x.set_many(widgets, xs)
+
+        :class:`NumericProperty` and :class:`ReferenceListProperty` read
+        `values` directly when it is a buffer of doubles, such as a float64
+        `numpy` array of shape (n, ) or (n, len(properties)).
+
+        .. versionadded:: 1.9.1
+        '''
+        cdef EventDispatcher obj
+        cdef int changed = 0
+        if len(objs) != len(values):
+            raise ValueError('%s: got %d values for %d instances' % (
+                self.name, len(values), len(objs)))
+        for obj, value in zip(objs, values):
+            if self.set(obj, value):
+                changed += 1
+        return changed
+
     cpdef get(self, EventDispatcher obj):
         '''Return the value of the property.
         '''
@@ -479,9 +509,18 @@ cdef class Property:
             # dispatch this property on the button instance
             prop.dispatch(button)
 
+        .. versionchanged:: 1.9.1
+            Inside a :meth:`~kivy.event.EventDispatcher.batch` of `obj`, the
+            dispatch is deferred to the end of the batch.
         '''
-        cdef PropertyStorage ps = obj.__storage[self._name]
-        ps.observers.dispatch(obj, ps.value, None, None, 0)
+        cdef PropertyStorage ps
+        if obj.__batch_depth:
+            if self not in obj.__batch:
+                obj.__batch.append(self)
+            return
+        ps = obj.__storage[self._name]
+        if ps.observers is not None:
+            ps.observers.dispatch(obj, ps.value, None, None, 0)
 
 
 cdef class NumericProperty(Property):
@@ -551,6 +590,32 @@ cdef class NumericProperty(Property):
         ps.numeric_fmt = ext
         return dpi2px(value, ext)
 
+    def set_many(self, objs, values):
+        cdef const double[:] view
+        cdef EventDispatcher obj
+        cdef PropertyStorage ps
+        cdef Py_ssize_t i, n
+        cdef int changed = 0
+        try:
+            view = values
+        except (TypeError, ValueError, BufferError):
+            return Property.set_many(self, objs, values)
+        n = view.shape[0]
+        if len(objs) != n:
+            raise ValueError('%s: got %d values for %d instances' % (
+                self.name, n, len(objs)))
+        # a double is always a valid value, no need to convert or check it
+        for i in range(n):
+            obj = objs[i]
+            ps = obj.__storage[self._name]
+            value = view[i]
+            if not self.force_dispatch and ps.value == value:
+                continue
+            ps.value = value
+            self.dispatch(obj)
+            changed += 1
+        return changed
+
     def get_format(self, EventDispatcher obj):
         '''
         Return the format used for Numeric calculation. Default is px (mean
@@ -590,6 +655,8 @@ cdef inline void observable_list_dispatch(object self):
 
 class ObservableList(list):
     # Internal class to observe changes inside a native python list.
+    __slots__ = ('prop', 'obj')
+
     def __init__(self, *largs):
         self.prop = largs[0]
         self.obj = ref(largs[1])
@@ -693,7 +760,7 @@ cdef class ListProperty(Property):
 
     cpdef set(self, EventDispatcher obj, value):
         value = ObservableList(self, obj, value)
-        Property.set(self, obj, value)
+        return Property.set(self, obj, value)
 
 cdef inline void observable_dict_dispatch(object self):
     cdef Property prop = self.prop
@@ -702,6 +769,8 @@ cdef inline void observable_dict_dispatch(object self):
 
 class ObservableDict(dict):
     # Internal class to observe changes inside a native python dict.
+    __slots__ = ('prop', 'obj')
+
     def __init__(self, *largs):
         self.prop = largs[0]
         self.obj = largs[1]
@@ -800,7 +869,7 @@ cdef class DictProperty(Property):
 
     cpdef set(self, EventDispatcher obj, value):
         value = ObservableDict(self, obj, value)
-        Property.set(self, obj, value)
+        return Property.set(self, obj, value)
 
 
 cdef class ObjectProperty(Property):
@@ -1121,6 +1190,8 @@ cdef class OptionProperty(Property):
             return self.options
 
 class ObservableReferenceList(ObservableList):
+    __slots__ = ()
+
     def __setitem__(self, key, value, update_properties=True):
         list.__setitem__(self, key, value)
         if update_properties:
@@ -1169,8 +1240,11 @@ cdef class ReferenceListProperty(Property):
     cpdef link_deps(self, EventDispatcher obj, str name):
         cdef Property prop
         Property.link_deps(self, obj, name)
+        # the bound method is created once, and shared by all the instances
+        if self.change_callback is None:
+            self.change_callback = self.trigger_change
         for prop in self.properties:
-            prop.fast_bind(obj, self.trigger_change)
+            prop.fast_bind(obj, self.change_callback)
 
     cpdef trigger_change(self, EventDispatcher obj, value):
         cdef PropertyStorage ps = obj.__storage[self._name]
@@ -1228,6 +1302,26 @@ cdef class ReferenceListProperty(Property):
         self.dispatch(obj)
         return True
 
+    def set_many(self, objs, values):
+        cdef const double[:, :] view
+        cdef EventDispatcher obj
+        cdef Py_ssize_t i, j, n, m = len(self.properties)
+        cdef int changed = 0
+        try:
+            view = values
+        except (TypeError, ValueError, BufferError):
+            return Property.set_many(self, objs, values)
+        n = view.shape[0]
+        if len(objs) != n or view.shape[1] != m:
+            raise ValueError('%s: got %d values of %d items for %d '
+                             'instances' % (self.name, n, view.shape[1],
+                                            len(objs)))
+        for i in range(n):
+            obj = objs[i]
+            if self.set(obj, [view[i, j] for j in range(m)]):
+                changed += 1
+        return changed
+
     cpdef setitem(self, EventDispatcher obj, key, value):
         cdef PropertyStorage ps = obj.__storage[self._name]
         cdef bint res = False
@@ -1321,9 +1415,11 @@ cdef class AliasProperty(Property):
 
     cpdef link_deps(self, EventDispatcher obj, str name):
         cdef Property oprop
+        if self.change_callback is None:
+            self.change_callback = self.trigger_change
         for prop in self.bind_objects:
             oprop = getattr(obj.__class__, prop)
-            oprop.fast_bind(obj, self.trigger_change)
+            oprop.fast_bind(obj, self.change_callback)
 
     cpdef trigger_change(self, EventDispatcher obj, value):
         cdef PropertyStorage ps = obj.__storage[self._name]
@@ -1350,6 +1446,8 @@ cdef class AliasProperty(Property):
         if ps.setter(obj, value):
             ps.value = self.get(obj)
             self.dispatch(obj)
+            return True
+        return False
 
 cdef class VariableListProperty(Property):
     '''A ListProperty that allows you to work with a variable amount of
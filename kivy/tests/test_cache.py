@@ -0,0 +1,98 @@
+'''
+Cache tests
+===========
+'''
+
+import unittest
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        from kivy.cache import Cache
+        for category in ('test.lru', 'test.cost1', 'test.cost2'):
+            Cache._categories.pop(category, None)
+            Cache._objects.pop(category, None)
+        Cache._budgets.pop('test.budget', None)
+
+    def test_limit_lru(self):
+        from kivy.cache import Cache
+        Cache.register('test.lru', limit=2)
+        Cache.append('test.lru', 'a', 1)
+        Cache.append('test.lru', 'b', 2)
+        self.assertEqual(Cache.get('test.lru', 'a'), 1)
+        Cache.append('test.lru', 'c', 3)
+        self.assertEqual(Cache.get('test.lru', 'a'), 1)
+        self.assertIsNone(Cache.get('test.lru', 'b'))
+        self.assertEqual(Cache.get('test.lru', 'c'), 3)
+
+    def test_replace(self):
+        from kivy.cache import Cache
+        Cache.register('test.lru', limit=2, cost=len)
+        Cache.append('test.lru', 'a', 'xx')
+        Cache.append('test.lru', 'a', 'xxx')
+        self.assertEqual(len(Cache._objects['test.lru']), 1)
+        self.assertEqual(Cache._categories['test.lru']['total_cost'], 3)
+        Cache.remove('test.lru', 'a')
+        self.assertEqual(Cache._categories['test.lru']['total_cost'], 0)
+
+    def test_budget(self):
+        from kivy.cache import Cache
+        Cache.register('test.cost1', cost=len, budget='test.budget')
+        Cache.register('test.cost2', cost=len, budget='test.budget')
+        Cache.register_budget('test.budget', 10)
+        Cache.append('test.cost1', 'a', 'x' * 4)
+        Cache.append('test.cost2', 'b', 'x' * 4)
+        Cache.append('test.cost1', 'c', 'x' * 4)
+        self.assertIsNone(Cache.get('test.cost1', 'a'))
+        self.assertIsNotNone(Cache.get('test.cost2', 'b'))
+        self.assertIsNotNone(Cache.get('test.cost1', 'c'))
+        Cache.register_budget('test.budget', 4)
+        self.assertIsNone(Cache.get('test.cost2', 'b'))
+        self.assertIsNotNone(Cache.get('test.cost1', 'c'))
+
+    def test_stats_on_evict(self):
+        from kivy.cache import Cache
+        evicted = []
+        Cache.register('test.lru', limit=1, cost=len,
+                       on_evict=lambda *args: evicted.append(args))
+        Cache.append('test.lru', 'a', 'xx')
+        Cache.get('test.lru', 'a')
+        Cache.get('test.lru', 'b')
+        Cache.append('test.lru', 'b', 'xxx')
+        self.assertEqual(evicted, [('test.lru', 'a', 'xx', 'limit')])
+        stats = Cache.get_stats('test.lru')
+        self.assertEqual(stats['count'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['cost'], 3)
+        self.assertIn('test.lru', Cache.get_stats())
+
+    def test_timeout(self):
+        from kivy.cache import Cache
+        from kivy.clock import Clock
+        last_tick = Clock._last_tick
+        try:
+            Cache.register('test.lru', timeout=2)
+            Cache.append('test.lru', 'a', 1)
+            Cache.append('test.lru', 'b', 2)
+            Cache.append('test.lru', 'c', 3, timeout=10)
+            Clock._last_tick += 1.5
+            Cache.get('test.lru', 'a')
+            Cache._purge_by_timeout(1)
+            self.assertEqual(len(Cache._objects['test.lru']), 3)
+            Clock._last_tick += 1
+            Cache._purge_by_timeout(1)
+            self.assertEqual(list(Cache._objects['test.lru']), ['c', 'a'])
+            self.assertEqual(Cache.get_stats('test.lru')['expirations'], 1)
+            # a lag doesn't trash the objects, nor change the timeout
+            Cache.get('test.lru', 'a')
+            Clock._last_tick += 5
+            Cache._purge_by_timeout(5)
+            self.assertEqual(list(Cache._objects['test.lru']), ['c', 'a'])
+            self.assertEqual(Cache._categories['test.lru']['timeout'], 2)
+            Cache._purge_by_timeout(1)
+            self.assertEqual(list(Cache._objects['test.lru']), ['c'])
+        finally:
+            Clock._last_tick = last_tick
@@ -19,7 +19,12 @@ class ClockTestCase(unittest.TestCase):
         from kivy.clock import Clock
         global counter
         counter = 0
-        Clock._events = [[] for i in range(256)]
+        Clock._events = []
+        Clock._events_next = []
+        Clock._events_before_frame = []
+        Clock._events_by_id = {}
+        Clock._new_events = []
+        Clock._dead_entries = 0
 
     def test_schedule_once(self):
         from kivy.clock import Clock
@@ -73,3 +78,189 @@ class ClockTestCase(unittest.TestCase):
         Clock.unschedule(callback)
         Clock.tick()
         self.assertEqual(counter, 0)
+
+    def test_schedule_interval(self):
+        from kivy.clock import Clock
+        ev = Clock.schedule_interval(callback, 0)
+        Clock.tick()
+        Clock.tick()
+        self.assertEqual(counter, 2)
+        ev.cancel()
+        Clock.tick()
+        self.assertEqual(counter, 2)
+
+    def test_schedule_once_timeout_not_due(self):
+        from kivy.clock import Clock
+        Clock.schedule_once(callback, 5.)
+        Clock.tick()
+        self.assertEqual(counter, 0)
+        self.assertEqual(len(Clock._events), 1)
+
+    def test_idle_events_not_ticked(self):
+        from kivy.clock import Clock
+        events = [Clock.schedule_once(callback, 60.) for i in range(100)]
+        Clock.schedule_once(callback)
+        ticked = []
+        tick = events[0].__class__.tick
+
+        def tracking_tick(event, curtime):
+            ticked.append(event)
+            return tick(event, curtime)
+
+        events[0].__class__.tick = tracking_tick
+        try:
+            Clock.tick()
+        finally:
+            events[0].__class__.tick = tick
+        self.assertEqual(counter, 1)
+        self.assertEqual(len(ticked), 1)
+
+    def test_trigger_rearm(self):
+        from kivy.clock import Clock
+        trigger = Clock.create_trigger(callback)
+        trigger()
+        trigger()
+        Clock.tick()
+        self.assertEqual(counter, 1)
+        trigger()
+        trigger.cancel()
+        trigger()
+        Clock.tick()
+        self.assertEqual(counter, 2)
+
+    def test_cancel_from_callback(self):
+        from kivy.clock import Clock
+        events = []
+
+        def cancel_next(dt):
+            callback(dt)
+            events[1].cancel()
+
+        events.append(Clock.schedule_once(cancel_next))
+        events.append(Clock.schedule_once(callback))
+        Clock.tick()
+        self.assertEqual(counter, 1)
+
+    def test_interval_retrigger_from_callback(self):
+        from kivy.clock import Clock
+        events = []
+
+        def retrigger(dt):
+            callback(dt)
+            events[0].cancel()
+            events[0]()
+
+        events.append(Clock.schedule_interval(retrigger, 0))
+        Clock.tick()
+        self.assertEqual(counter, 1)
+        self.assertEqual(
+            len([e for e in Clock._events_next if e[2] is not None]), 1)
+        Clock.tick()
+        self.assertEqual(counter, 2)
+
+    def test_unschedule_method(self):
+        from kivy.clock import Clock
+
+        class Counter(object):
+            def callback(self, dt):
+                callback(dt)
+
+        a = Counter()
+        b = Counter()
+        Clock.schedule_once(a.callback)
+        Clock.schedule_once(b.callback)
+        Clock.unschedule(a.callback)
+        Clock.tick()
+        self.assertEqual(counter, 1)
+        self.assertEqual(Clock._events_by_id, {})
+
+    def test_unschedule_not_all(self):
+        from kivy.clock import Clock
+        Clock.schedule_once(callback)
+        Clock.schedule_once(callback)
+        Clock.unschedule(callback, all=False)
+        Clock.tick()
+        self.assertEqual(counter, 1)
+
+    def test_unschedule_event(self):
+        from kivy.clock import Clock
+        ev = Clock.schedule_once(callback, 5.)
+        Clock.schedule_once(callback, 5.)
+        Clock.unschedule(ev)
+        self.assertFalse(ev.is_triggered)
+        self.assertEqual(len(Clock._events_by_id), 1)
+
+    def test_get_min_timeout(self):
+        from kivy.clock import Clock
+        self.assertIsNone(Clock.get_min_timeout())
+        ev = Clock.schedule_once(callback, 5.)
+        self.assertTrue(4. < Clock.get_min_timeout() <= 5.)
+        Clock.schedule_once(callback)
+        self.assertEqual(Clock.get_min_timeout(), 0)
+        Clock.tick()
+        ev.cancel()
+        self.assertIsNone(Clock.get_min_timeout())
+
+    def test_wait_interrupted(self):
+        from kivy.clock import Clock
+        from threading import Timer
+        from time import time
+        timer = Timer(.05, Clock.schedule_once, (callback, ))
+        timer.start()
+        start = time()
+        Clock.wait(5.)
+        timer.join()
+        self.assertTrue(time() - start < 4.)
+        Clock.tick()
+        self.assertEqual(counter, 1)
+
+    def test_wait_window_interrupted(self):
+        from kivy.clock import Clock
+        from threading import Event, Timer
+        from time import time
+        # stands for the event queue of a window
+        queue = Event()
+        timer = Timer(.05, Clock.schedule_once, (callback, ))
+        timer.start()
+        start = time()
+        Clock.wait(5., queue.wait, queue.set)
+        timer.join()
+        self.assertTrue(time() - start < 4.)
+        Clock.tick()
+        self.assertEqual(counter, 1)
+
+    def test_schedule_from_threads(self):
+        import sys
+        from kivy.clock import Clock
+        from threading import Thread
+        from time import time
+
+        def schedule():
+            for i in range(500):
+                Clock.schedule_once(callback, .001 * (i % 5 + 1))
+
+        def cancel():
+            for i in range(500):
+                Clock.schedule_once(callback, .01).cancel()
+
+        # switch often between the threads
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [Thread(target=schedule) for i in range(4)]
+            threads.append(Thread(target=cancel))
+            for thread in threads:
+                thread.start()
+            start = time()
+            while counter < 2000 and time() - start < 10.:
+                Clock.get_min_timeout()
+                Clock.tick()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(counter, 2000)
+        events = Clock._events
+        self.assertFalse([entry for entry in events if entry[2] is not None])
+        self.assertFalse([i for i in range(1, len(events))
+                          if events[i] < events[(i - 1) >> 1]])
@@ -104,3 +104,269 @@ class FBOInstructionTestCase(GraphicUnitTest):
         import pygame
         surface = pygame.image.fromstring(data, (512, 512), 'RGBA', True)
         pygame.image.save(surface, "results.png")
+
+
+class BatchingTestCase(GraphicUnitTest):
+
+    def test_batch_rectangles(self):
+        from kivy.graphics import Fbo, Color, Rectangle
+        from kivy.graphics.context import get_context
+
+        context = get_context()
+        fbo = Fbo(size=(128, 128))
+        with fbo:
+            Color(1, 1, 1)
+            rects = [Rectangle(pos=(i, i), size=(8, 8)) for i in range(50)]
+        # the frame compiling the canvas draws the rectangles one by one
+        context.draw_calls = 0
+        fbo.draw()
+        self.assertEqual(context.draw_calls, 50)
+        rects[0].pos = (0, 1)
+        context.draw_calls = 0
+        fbo.draw()
+        self.assertEqual(context.draw_calls, 1)
+
+        # a color change stops the batch
+        with fbo:
+            Color(1, 0, 0)
+            Rectangle(pos=(64, 64), size=(8, 8))
+        fbo.draw()
+        rects[0].pos = (0, 0)
+        context.draw_calls = 0
+        fbo.draw()
+        self.assertEqual(context.draw_calls, 2)
+
+        # the update of a batched rectangle keeps it batched
+        rects[25].pos = (100, 10)
+        context.draw_calls = 0
+        fbo.draw()
+        self.assertEqual(context.draw_calls, 2)
+
+    def test_batch_mode_change(self):
+        from kivy.graphics import Fbo, Color, Mesh
+        from kivy.graphics.context import get_context
+
+        context = get_context()
+        fbo = Fbo(size=(64, 64))
+        with fbo:
+            Color(1, 1, 1)
+            meshes = [Mesh(vertices=[i, 0, 0, 0, 8, 0, 0, 0, 8, 8, 0, 0],
+                           indices=[0, 1, 2], mode='triangles')
+                      for i in range(3)]
+        fbo.draw()
+        meshes[0].vertices = meshes[0].vertices
+        context.draw_calls = 0
+        fbo.draw()
+        self.assertEqual(context.draw_calls, 1)
+
+        # a line strip cannot be drawn with the triangles of the batch
+        meshes[1].mode = 'line_strip'
+        fbo.draw()
+        meshes[0].vertices = meshes[0].vertices
+        context.draw_calls = 0
+        fbo.draw()
+        self.assertEqual(context.draw_calls, 3)
+
+    def test_batch_split(self):
+        from kivy.graphics import Fbo, ClearColor, ClearBuffers, Color, Mesh
+        from kivy.graphics.context import get_context
+
+        def make_mesh(x, count):
+            # the triangle is made of the last vertices
+            vertices = [0] * (count - 3) * 4 + [
+                x, 0, 0, 0, x + 32, 0, 0, 0, x, 64, 0, 0]
+            return vertices, [count - 3, count - 2, count - 1]
+
+        context = get_context()
+        fbo = Fbo(size=(64, 64))
+        with fbo:
+            ClearColor(0, 0, 0, 1)
+            ClearBuffers()
+            Color(1, 1, 1)
+            meshes = [Mesh(mode='triangles') for i in range(2)]
+        for x, mesh in zip((0, 32), meshes):
+            mesh.vertices, mesh.indices = make_mesh(x, 30000)
+        fbo.draw()
+        meshes[0].vertices = meshes[0].vertices
+        context.draw_calls = 0
+        fbo.draw()
+        self.assertEqual(context.draw_calls, 1)
+
+        # the batch cannot hold the new vertices, it is split
+        meshes[1].vertices, meshes[1].indices = make_mesh(32, 40000)
+        fbo.draw()
+        meshes[0].vertices = meshes[0].vertices
+        context.draw_calls = 0
+        fbo.draw()
+        self.assertEqual(context.draw_calls, 2)
+        row = bytearray(fbo.pixels[8 * 64 * 4:9 * 64 * 4])
+        self.assertEqual([row[x * 4] for x in (2, 34)], [255, 255])
+
+    def test_compile_applies_once(self):
+        from kivy.graphics import Fbo, ClearColor, ClearBuffers, Color, \
+            Rectangle, InstructionGroup, PushMatrix, PopMatrix, Translate
+
+        fbo = Fbo(size=(64, 64))
+        with fbo:
+            ClearColor(0, 0, 0, 1)
+            ClearBuffers()
+            Color(1, 1, 1)
+        # like the canvas.before and canvas.after of a widget
+        before = InstructionGroup()
+        before.add(PushMatrix())
+        before.add(Translate(16, 0))
+        after = InstructionGroup()
+        after.add(PopMatrix())
+        fbo.add(before)
+        fbo.add(Rectangle(pos=(0, 0), size=(8, 64)))
+        fbo.add(after)
+        rect = Rectangle(pos=(40, 0), size=(8, 64))
+        fbo.add(rect)
+
+        # the frame compiling the groups and the next one draw the same: the
+        # translation is applied once, and popped before the last rectangle
+        for frame in range(2):
+            rect.pos = (40, 0)
+            fbo.draw()
+            row = fbo.pixels[32 * 64 * 4:33 * 64 * 4]
+            reds = [bytearray(row)[x * 4] for x in (4, 20, 36, 44, 60)]
+            self.assertEqual(reds, [0, 255, 0, 255, 0])
+
+
+class GLStatsTestCase(GraphicUnitTest):
+
+    def test_gl_stats(self):
+        from kivy.graphics import Fbo, Color, Rectangle
+        from kivy.graphics.texture import Texture
+        from kivy.graphics.context import get_context
+
+        context = get_context()
+        fbo = Fbo(size=(64, 64))
+        with fbo:
+            Color(1, 1, 1)
+            rect = Rectangle(pos=(0, 0), size=(8, 8))
+        fbo.draw()
+
+        context.reset_gl_stats()
+        self.assertEqual(set(context.get_gl_stats().values()), set([0]))
+
+        rect.pos = (10, 10)
+        fbo.draw()
+        stats = context.get_gl_stats()
+        self.assertEqual(stats['draw_calls'], 1)
+        self.assertTrue(stats['shader_binds'] >= 1)
+        self.assertTrue(stats['buffer_uploads'] >= 1)
+
+        # the default texture stays bound, a new one is bound once
+        context.reset_gl_stats()
+        rect.texture = Texture.create(size=(4, 4))
+        fbo.draw()
+        self.assertEqual(context.get_gl_stats()['texture_binds'], 1)
+
+    def test_redundant_state(self):
+        from kivy.graphics import Fbo, Color, Rectangle
+        from kivy.graphics.context import get_context
+
+        context = get_context()
+        fbo = Fbo(size=(64, 64))
+        with fbo:
+            for i in range(20):
+                Color(i / 20., 1, 1)
+                rect = Rectangle(pos=(i, i), size=(8, 8))
+        fbo.draw()
+
+        # the default texture and the shader are already bound
+        context.reset_gl_stats()
+        rect.pos = (30, 30)
+        fbo.draw()
+        stats = context.get_gl_stats()
+        self.assertEqual(stats['draw_calls'], 20)
+        self.assertTrue(stats['texture_binds'] <= 1)
+        self.assertTrue(stats['shader_binds'] <= 1)
+
+    def test_incremental_compilation(self):
+        from kivy.graphics import Fbo, Color, Rectangle
+        from kivy.graphics.context import get_context
+
+        context = get_context()
+        fbo = Fbo(size=(64, 64))
+        with fbo:
+            color = Color(1, 1, 1)
+            rects = [Rectangle(pos=(i, i), size=(8, 8)) for i in range(20)]
+        fbo.draw()
+
+        # moving a rectangle only builds it again
+        context.reset_gl_stats()
+        rects[5].pos = (30, 30)
+        fbo.draw()
+        stats = context.get_gl_stats()
+        self.assertEqual(stats['compilations'], 0)
+        self.assertEqual(stats['instruction_builds'], 1)
+
+        # the color is applied, it is updated in place
+        context.reset_gl_stats()
+        color.rgb = (1, 0, 0)
+        fbo.draw()
+        self.assertEqual(context.get_gl_stats()['compilations'], 0)
+        self.assertEqual(list(bytearray(fbo.pixels[:4])), [255, 0, 0, 255])
+
+    def test_reduction_change(self):
+        from kivy.graphics import Fbo, ClearColor, ClearBuffers, Color, \
+            Rectangle
+        from kivy.graphics.context import get_context
+
+        def reds():
+            row = bytearray(fbo.pixels[32 * 64 * 4:33 * 64 * 4])
+            return [row[x * 4] for x in (4, 36)]
+
+        context = get_context()
+        fbo = Fbo(size=(64, 64))
+        with fbo:
+            ClearColor(0, 0, 0, 1)
+            ClearBuffers()
+            first = Color(1, 1, 1)
+            Rectangle(pos=(0, 0), size=(32, 64))
+            # ignored, it repeats the first color
+            second = Color(1, 1, 1)
+            Rectangle(pos=(32, 0), size=(32, 64))
+        fbo.draw()
+
+        # the ignored color is needed now
+        context.reset_gl_stats()
+        second.rgb = (0, 1, 1)
+        fbo.draw()
+        self.assertEqual(context.get_gl_stats()['compilations'], 1)
+        self.assertEqual(reds(), [255, 0])
+
+        # the first color is repeated by the second one again
+        second.rgb = (1, 1, 1)
+        fbo.ask_update()
+        fbo.draw()
+        context.reset_gl_stats()
+        first.rgb = (0, 1, 1)
+        fbo.draw()
+        self.assertEqual(context.get_gl_stats()['compilations'], 1)
+        self.assertEqual(reds(), [0, 255])
+
+    def test_partial_upload(self):
+        from kivy.graphics import Fbo, Color, Rectangle
+        from kivy.graphics.context import get_context
+
+        context = get_context()
+        fbo = Fbo(size=(64, 64))
+        with fbo:
+            Color(1, 1, 1)
+            rects = [Rectangle(pos=(i, i), size=(8, 8)) for i in range(200)]
+        fbo.draw()
+        # the first frame of the batch uploads all its vertices
+        context.reset_gl_stats()
+        rects[0].pos = (0, 1)
+        fbo.draw()
+        full = context.get_gl_stats()['buffer_upload_bytes']
+
+        # only the vertices of the moved rectangle are uploaded
+        context.reset_gl_stats()
+        rects[100].pos = (30, 30)
+        fbo.draw()
+        stats = context.get_gl_stats()
+        self.assertTrue(0 < stats['buffer_upload_bytes'] < full / 2)
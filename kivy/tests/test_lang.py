@@ -3,6 +3,7 @@ Language tests
 ==============
 '''
 
+import os
 import unittest
 from weakref import proxy
 from functools import partial
@@ -226,3 +227,230 @@ class LangTestCase(unittest.TestCase):
         self.assertTrue('on_press' in wid.binded_func)
         wid.binded_func['on_press']()
         self.assertEquals(wid.a, 1)
+
+    def test_parser_cache(self):
+        import shutil
+        import tempfile
+        cache_dir = tempfile.mkdtemp()
+        try:
+            for cached in (False, True):
+                Builder = self.import_builder()
+                Builder.cache_dir = cache_dir
+                Builder.load_string('''
+#:set test_cache_size 3
+<TestClass>:
+    obj: (test_cache_size, .5)
+    on_press: self.a = 1
+''')
+                self.assertEqual(len(os.listdir(cache_dir)), 1)
+                wid = TestClass()
+                Builder.apply(wid)
+                self.assertEqual(wid.obj, (3, 0.5))
+                wid.binded_func['on_press']()
+                self.assertEqual(wid.a, 1)
+
+            # the function factory is loaded with the rules
+            prop = Builder.match(wid)[0].properties['obj']
+            self.assertEqual(prop.factory_code[0], ('test_cache_size', ))
+            self.assertEqual(prop.create_function({}, wid)(), (3, 0.5))
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_parser_cache_size(self):
+        import shutil
+        import tempfile
+        import kivy.lang
+        cache_dir = tempfile.mkdtemp()
+        max_size = kivy.lang._kv_cache_max_size
+        try:
+            Builder = self.import_builder()
+            Builder.cache_dir = cache_dir
+            Builder.load_string('<TestClass>:\n    obj: 0\n')
+            size = os.path.getsize(os.path.join(cache_dir,
+                                                os.listdir(cache_dir)[0]))
+            # room for three sources, the oldest ones are removed
+            kivy.lang._kv_cache_max_size = size * 3
+            for i in range(1, 10):
+                Builder.load_string('<TestClass>:\n    obj: %d\n' % i)
+                self.assertTrue(len(os.listdir(cache_dir)) <= 3)
+        finally:
+            kivy.lang._kv_cache_max_size = max_size
+            shutil.rmtree(cache_dir)
+
+    def test_value_names(self):
+        Builder = self.import_builder()
+        Builder.load_string('''
+#:set test_step 2
+<TestClass>:
+    obj: [test_step * x for x in range(len("abc"))] + [(lambda: test_step)()]
+''')
+        wid = TestClass()
+        Builder.apply(wid)
+        self.assertEqual(wid.obj, [0, 2, 4, 2])
+
+    def test_value_eval_fallback(self):
+        import kivy.lang
+
+        def create_function(self, ids, self_ref):
+            raise SyntaxError()
+
+        Builder = self.import_builder()
+        create_function_func = kivy.lang.ParserRuleProperty.create_function
+        kivy.lang.ParserRuleProperty.create_function = create_function
+        try:
+            Builder.load_string('''
+#:set self None
+<TestClass>:
+    obj: self.uid
+''')
+            wid = TestClass()
+            Builder.apply(wid)
+            self.assertEqual(wid.obj, wid.uid)
+        finally:
+            kivy.lang.ParserRuleProperty.create_function = create_function_func
+            kivy.lang.global_idmap.pop('self', None)
+
+    def test_match_index(self):
+        Builder = self.import_builder()
+        Builder.load_string('''
+<TestClass>:
+    obj: 1
+<TestClass2,.highlight>:
+    obj: 2
+''', filename='base.kv')
+        wid = TestClass()
+        wid2 = TestClass2()
+        rules = Builder.match(wid)
+        self.assertEqual(len(rules), 1)
+        self.assertEqual(len(Builder.match(wid2)), 1)
+
+        # a rule for another class keeps the cached matches
+        Builder.load_string('''
+<TestClass3>:
+    obj: 3
+''', filename='screen.kv')
+        self.assertTrue(Builder.match(wid) is rules)
+
+        # a rule for the class is added after the previous ones
+        Builder.load_string('''
+<-TestClass>:
+    obj: 4
+''', filename='override.kv')
+        wid.cls = ['highlight']
+        Builder.apply(wid)
+        self.assertEqual(wid.obj, 4)
+
+        Builder.unload_file('override.kv')
+        Builder.apply(wid)
+        self.assertEqual(wid.obj, 2)
+        self.assertEqual(len(Builder.match(wid)), 2)
+        Builder.unload_file('base.kv')
+        self.assertEqual(Builder.match(wid), [])
+        self.assertEqual(len(Builder.match(TestClass3())), 1)
+
+    def test_canvas_instructions(self):
+        import kivy.lang
+        from kivy.factory import Factory
+
+        class TestInstruction(object):
+            def __init__(self):
+                self.proxy_ref = proxy(self)
+                instructions.append(self)
+
+        instructions = []
+        Builder = self.import_builder()
+        Factory.register('TestInstruction', cls=TestInstruction)
+        instruction_cls = kivy.lang.Instruction
+        kivy.lang.Instruction = TestInstruction
+        try:
+            Builder.load_string('''
+#:set test_width 3
+#:set test_counter iter(range(10))
+<TestClass>:
+    canvas:
+        TestInstruction:
+            width: test_width * 2
+            height: 4, (5, 6)
+            depth: next(test_counter)
+            size: self.obj
+''')
+            rule = Builder.match(TestClass())[0].canvas_root
+            for obj in (1, 2):
+                wid = TestClass()
+                wid.obj = obj
+                Builder._build_canvas(None, wid, rule, {})
+                self.assertEqual(instructions[-1].width, 6)
+                self.assertEqual(instructions[-1].height, (4, (5, 6)))
+                self.assertEqual(instructions[-1].depth, obj - 1)
+                self.assertEqual(instructions[-1].size, obj)
+            # the class is looked up once for the rule
+            cls, prules = Builder._get_canvas_instructions(rule)[0]
+            self.assertIs(cls, TestInstruction)
+            self.assertEqual(sorted(prule.name for prule in prules),
+                             ['depth', 'height', 'size', 'width'])
+        finally:
+            kivy.lang.Instruction = instruction_cls
+            Factory.unregister('TestInstruction')
+
+    def test_lazy_canvas(self):
+        import kivy.lang
+        from kivy.factory import Factory
+
+        class TestCanvas(object):
+            def __init__(self):
+                self.children = []
+
+            def __enter__(self):
+                canvases.append(self)
+
+            def __exit__(self, *largs):
+                canvases.pop()
+
+        class TestInstruction(object):
+            def __init__(self):
+                self.proxy_ref = proxy(self)
+                canvases[-1].children.append(self)
+
+        class TestWidget(TestClass):
+            root_window = None
+
+            def __init__(self, **kwargs):
+                super(TestWidget, self).__init__(**kwargs)
+                self.canvas = TestCanvas()
+
+            def get_root_window(self):
+                return self.root_window
+
+        canvases = []
+        Builder = self.import_builder()
+        Builder.lazy_canvas = True
+        Factory.register('TestInstruction', cls=TestInstruction)
+        Factory.register('TestWidget', cls=TestWidget)
+        instruction_cls = kivy.lang.Instruction
+        kivy.lang.Instruction = TestInstruction
+        try:
+            Builder.load_string('''
+<TestWidget>:
+    obj: 1
+    canvas:
+        TestInstruction:
+            width: 2
+''')
+            wid = TestWidget()
+            Builder.apply(wid)
+            # the properties are applied, the canvas waits for the window
+            self.assertEqual(wid.obj, 1)
+            self.assertEqual(wid.canvas.children, [])
+            Builder.build_deferred_canvas(wid)
+            self.assertEqual(wid.canvas.children, [])
+
+            # attached, the canvas is built once
+            wid.root_window = object()
+            Builder.build_deferred_canvas(wid)
+            Builder.build_deferred_canvas(wid)
+            self.assertEqual(len(wid.canvas.children), 1)
+            self.assertEqual(wid.canvas.children[0].width, 2)
+        finally:
+            kivy.lang.Instruction = instruction_cls
+            Factory.unregister('TestInstruction')
+            Factory.unregister('TestWidget')
@@ -0,0 +1,292 @@
+'''
+Loader tests
+============
+'''
+
+import gc
+import unittest
+from kivy.tests.common import GraphicUnitTest
+
+
+def make_image(name, size=1):
+    from kivy.core.image import ImageLoaderBase, ImageData
+
+    class TestImage(ImageLoaderBase):
+        def load(self, filename):
+            return [ImageData(size, size, 'rgba', b'\0' * (size * size * 4))]
+
+    image = TestImage(name, nocache=True)
+    # no texture is uploaded by the tests
+    image._textures = []
+    return image
+
+
+class LoaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        from kivy.loader import LoaderBase
+        self.loader = LoaderBase()
+        self.loader.loading_image = make_image('loading')
+        self.loader.error_image = make_image('error')
+
+    def update(self):
+        self.loader._start_wanted = False
+        self.loader._update()
+
+    def test_priority(self):
+        loader = self.loader
+        clients = [loader.image('a.png', nocache=True),
+                   loader.image('b.png', priority=2, nocache=True),
+                   loader.image('c.png', priority=1, nocache=True)]
+        loader.set_priority(clients[0], 3)
+        order = [loader._pop_request()['filename'] for i in range(3)]
+        self.assertEqual(order, ['a.png', 'b.png', 'c.png'])
+        self.assertIsNone(loader._pop_request())
+
+    def test_coalesce(self):
+        loader = self.loader
+        a = loader.image('a.png', nocache=True)
+        b = loader.image('a.png', priority=1, nocache=True)
+        self.assertIs(a._loader_request, b._loader_request)
+        self.assertEqual(a._loader_request['priority'], 1)
+        self.assertEqual(loader._pop_request()['filename'], 'a.png')
+        self.assertIsNone(loader._pop_request())
+
+    def test_cancel(self):
+        loader = self.loader
+        a = loader.image('a.png', nocache=True)
+        b = loader.image('b.png', nocache=True)
+        c = loader.image('b.png', nocache=True)
+        loader.cancel(a)
+        self.assertNotIn('a.png', loader._requests)
+
+        # the request is kept while a client is referenced
+        loader.cancel(b)
+        del c
+        gc.collect()
+        self.assertIsNone(loader._pop_request())
+        self.assertEqual(loader._requests, {})
+
+    def test_cancelled_by_worker(self):
+        from kivy.loader import _load_cancelled
+        loader = self.loader
+        a = loader.image('a.png', nocache=True)
+        loader._pop_request()
+
+        # a client is still waiting, the request is queued again
+        loader._q_done.appendleft(('a.png', _load_cancelled))
+        self.update()
+        self.assertFalse(a.loaded)
+        self.assertEqual(loader._pop_request()['filename'], 'a.png')
+
+        del a
+        gc.collect()
+        loader._q_done.appendleft(('a.png', _load_cancelled))
+        self.update()
+        self.assertEqual(loader._requests, {})
+
+    def test_no_image_loaded(self):
+        loader = self.loader
+        a = loader.image('a.png', nocache=True)
+        loader._pop_request()
+        loader._q_done.appendleft(('a.png', None))
+        self.update()
+        self.assertTrue(a.loaded)
+        self.assertIs(a.image, loader.error_image)
+
+    def test_blank_filename(self):
+        loader = self.loader
+        a = loader.image(None, nocache=True)
+        loader._load_request(loader._pop_request())
+        self.update()
+        self.assertTrue(a.loaded)
+        self.assertIs(a.image, loader.error_image)
+        self.assertEqual(loader._requests, {})
+
+    def test_idle_after_load(self):
+        from time import time
+        from kivy.base import EventLoop
+        from kivy.clock import Clock
+        from kivy.loader import LoaderThreadPool
+        names = ('_events', '_events_next', '_events_before_frame')
+        events = [getattr(Clock, name) for name in names]
+        for name in names:
+            setattr(Clock, name, [])
+        loader = LoaderThreadPool()
+        loader.loading_image = make_image('loading')
+        timeout = EventLoop.input_poll_timeout
+        try:
+            client = loader.image('a.png', nocache=True,
+                                  load_callback=make_image)
+            start = time()
+            while not client.loaded and time() - start < 5.:
+                EventLoop.idle_wait()
+                Clock.tick()
+            self.assertTrue(client.loaded)
+
+            # nothing is scheduled anymore, the on demand loop sleeps
+            Clock.tick()
+            self.assertIsNone(Clock.get_min_timeout())
+            EventLoop.input_poll_timeout = .2
+            start = time()
+            EventLoop.idle_wait()
+            self.assertTrue(time() - start >= .15)
+        finally:
+            EventLoop.input_poll_timeout = timeout
+            loader.stop()
+            for name, value in zip(names, events):
+                setattr(Clock, name, value)
+
+    def test_upload_budget(self):
+        loader = self.loader
+        clients = [loader.image('%d.png' % i, nocache=True)
+                   for i in range(3)]
+        for client in clients:
+            request = loader._pop_request()
+            loader._q_done.appendleft(
+                (request['filename'], make_image(request['filename'], 4)))
+
+        # one image of 64 bytes per frame
+        loader.max_upload_per_frame = None
+        loader.max_upload_bytes = 100
+        for count in (1, 2, 3):
+            self.update()
+            self.assertEqual(
+                [client.loaded for client in clients].count(True), count)
+
+    def test_revalidate_error(self):
+        import shutil
+        import tempfile
+        try:
+            import urllib.request as urllib_request
+        except ImportError:
+            import urllib2 as urllib_request
+        loader = self.loader
+        url = 'http://a/a.png'
+        cached = make_image('cached')
+        errors = []
+
+        def urlopen(request):
+            raise urllib_request.HTTPError(url, errors[-1], '', {}, None)
+
+        loader.disk_cache_dir = tempfile.mkdtemp()
+        loader._load_cached = lambda *largs: cached
+        urlopen_func = urllib_request.urlopen
+        urllib_request.urlopen = urlopen
+        try:
+            disk_cache = loader._get_disk_cache()
+            disk_cache.put(url, b'data', '.png', {'ETag': '"1"'})
+
+            # the cached file is used while the server fails
+            errors.append(503)
+            self.assertIs(loader._load_urllib(url, {}), cached)
+            self.assertIsNotNone(disk_cache.get(url))
+
+            # a missing file is removed from the cache
+            errors.append(404)
+            self.assertIs(loader._load_urllib(url, {}), loader.error_image)
+            self.assertIsNone(disk_cache.get(url))
+        finally:
+            urllib_request.urlopen = urlopen_func
+            shutil.rmtree(loader.disk_cache_dir)
+
+    def test_can_upload(self):
+        loader = self.loader
+        loader.max_upload_per_frame = 2
+        loader.max_upload_bytes = 100
+        # the first upload of a frame is always done
+        self.assertTrue(loader._can_upload(0, 0, 1000, 0))
+        self.assertTrue(loader._can_upload(1, 50, 50, 0))
+        self.assertFalse(loader._can_upload(1, 50, 51, 0))
+        self.assertFalse(loader._can_upload(2, 0, 1, 0))
+
+
+class DiskCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        import tempfile
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.directory)
+
+    def test_put_get(self):
+        from kivy.loader import _DiskCache
+        cache = _DiskCache(self.directory, 100)
+        self.assertIsNone(cache.get('http://a/a.png'))
+        path = cache.put('http://a/a.png', b'data', '.png', {
+            'ETag': '"1"', 'Cache-Control': 'max-age=60'})
+        entry = cache.get('http://a/a.png')
+        self.assertEqual(entry['path'], path)
+        self.assertEqual(entry['etag'], '"1"')
+        self.assertTrue(_DiskCache.is_fresh(entry))
+        with open(path, 'rb') as fd:
+            self.assertEqual(fd.read(), b'data')
+
+        # the index is kept for the next runs
+        cache = _DiskCache(self.directory, 100)
+        self.assertEqual(cache.get('http://a/a.png')['path'], path)
+        cache.remove('http://a/a.png')
+        self.assertIsNone(cache.get('http://a/a.png'))
+        self.assertFalse(_DiskCache.cacheable({'Cache-Control': 'no-store'}))
+
+    def test_revalidate(self):
+        from kivy.loader import _DiskCache
+        cache = _DiskCache(self.directory, 100)
+        cache.put('http://a/a.png', b'data', '.png', {'ETag': '"1"'})
+        self.assertFalse(_DiskCache.is_fresh(cache.get('http://a/a.png')))
+        cache.touch('http://a/a.png', {'Cache-Control': 'max-age=60'})
+        entry = cache.get('http://a/a.png')
+        self.assertTrue(_DiskCache.is_fresh(entry))
+        self.assertEqual(entry['etag'], '"1"')
+
+    def test_shrink(self):
+        from kivy.loader import _DiskCache
+        cache = _DiskCache(self.directory, 10)
+        cache.put('http://a/a.png', b'x' * 4, '.png', {})
+        cache.put('http://a/b.png', b'x' * 4, '.png', {})
+        # the least recently used file is removed
+        cache.get('http://a/a.png')
+        cache.put('http://a/c.png', b'x' * 4, '.png', {})
+        self.assertIsNotNone(cache.get('http://a/a.png'))
+        self.assertIsNone(cache.get('http://a/b.png'))
+        self.assertIsNotNone(cache.get('http://a/c.png'))
+
+
+class SlicedUploadTestCase(GraphicUnitTest):
+
+    def test_sliced_upload(self):
+        from os.path import join
+        from kivy import kivy_data_dir
+        from kivy.core.image import ImageLoader
+        from kivy.loader import LoaderBase
+        loader = LoaderBase()
+        loader.loading_image = make_image('loading')
+        filename = join(kivy_data_dir, 'logo', 'kivy-icon-16.png')
+        image = ImageLoader.load(filename, keep_data=True, nocache=True)
+        imagedata = image._data[0]
+        self.assertEqual(len(imagedata.data), 16 * 16 * 4)
+
+        # four slices of four rows, one per frame
+        loader.upload_slice_bytes = 256
+        loader.max_upload_bytes = 256
+        client = loader.image(filename, nocache=True)
+        loader._pop_request()
+        loader._q_done.appendleft((filename, image))
+        for frame in range(4):
+            self.assertFalse(client.loaded)
+            loader._start_wanted = False
+            loader._update()
+        self.assertTrue(client.loaded)
+        self.assertEqual(client.image.texture.size, (16, 16))
+
+        # the data is released, and decoded again to reload the texture
+        self.assertIsNone(imagedata.data)
+        uploads = []
+
+        class TestTexture(object):
+            blit_data = uploads.append
+
+        image._sliced_upload._reload(TestTexture())
+        self.assertEqual(len(uploads[0].data), 16 * 16 * 4)
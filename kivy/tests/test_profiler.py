@@ -0,0 +1,114 @@
+'''
+Frame profiler tests
+====================
+'''
+
+import unittest
+
+
+def callback(dt):
+    pass
+
+
+class FrameProfilerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        from kivy.clock import Clock
+        from kivy.profiler import FrameProfiler
+        self.profiler = Clock.profiler = FrameProfiler(max_frames=3)
+
+    def tearDown(self):
+        from kivy.clock import Clock
+        Clock.profiler = None
+
+    def test_clock_callbacks(self):
+        from kivy.clock import Clock
+        Clock.schedule_once(callback)
+        Clock.schedule_once(callback, -1)
+        Clock.tick()
+        Clock.tick_draw()
+        self.profiler.end_frame()
+        frames = self.profiler.get_frames()
+        self.assertEqual(len(frames), 1)
+        frame = frames[0]
+        self.assertIn('clock', frame['phases'])
+        self.assertIn('before_frame', frame['phases'])
+        self.assertEqual(len(frame['callbacks']), 2)
+        self.assertEqual(frame['callbacks'][0][0], 'callback')
+
+    def test_ring_buffer(self):
+        from kivy.clock import Clock
+        for x in range(5):
+            Clock.tick()
+        self.profiler.end_frame()
+        frames = self.profiler.get_frames()
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(frames[-1]['index'], 4)
+
+    def test_callback_stats(self):
+        from kivy.clock import Clock
+        ev = Clock.schedule_interval(callback, 0)
+        Clock.tick()
+        Clock.tick()
+        self.profiler.end_frame()
+        ev.cancel()
+        stats = self.profiler.get_callback_stats()
+        self.assertEqual(stats[0][:2], ('callback', 2))
+
+    def test_chrome_trace(self):
+        from kivy.clock import Clock
+        Clock.schedule_once(callback)
+        Clock.tick()
+        self.profiler.end_frame()
+        events = self.profiler.to_chrome_trace()['traceEvents']
+        self.assertEqual([e['cat'] for e in events],
+                         ['frame', 'callback', 'phase'])
+        self.assertTrue(all(e['ph'] == 'X' for e in events))
+
+    def test_idle_phases(self):
+        from kivy.base import EventLoop
+        # idle() stops the loop without listeners
+        listener = object()
+        EventLoop.event_listeners.append(listener)
+        try:
+            EventLoop.idle()
+        finally:
+            EventLoop.event_listeners.remove(listener)
+        phases = self.profiler.get_frames()[-1]['phases']
+        self.assertIn('input', phases)
+        self.assertIn('sync', phases)
+
+
+class DispatchProfilerTestCase(unittest.TestCase):
+
+    def test_dispatch_stats(self):
+        from kivy.event import EventDispatcher
+        from kivy.properties import NumericProperty
+        from kivy.profiler import DispatchProfiler
+
+        class Counter(EventDispatcher):
+            __events__ = ('on_reset', )
+            count = NumericProperty(0)
+
+            def on_count(self, instance, value):
+                pass
+
+            def on_reset(self):
+                pass
+
+        counter = Counter()
+        counter.count = 1
+        with DispatchProfiler() as profiler:
+            counter.count = 2
+            counter.count = 3
+            counter.dispatch('on_reset')
+        counter.count = 4
+
+        stats = sorted(x[:4] for x in profiler.get_stats())
+        self.assertEqual(len(stats), 2)
+        self.assertEqual(stats[0][:2] + stats[0][3:], ('Counter', 'count', 2))
+        self.assertTrue(stats[0][2].endswith('Counter.on_count'))
+        self.assertEqual(
+            sorted(x[:3] for x in profiler.get_dispatch_stats()),
+            [('Counter', 'count', 2), ('Counter', 'on_reset', 1)])
+        self.assertIn('Counter.count -> ', profiler.report())
@@ -518,3 +518,121 @@ class PropertiesTestCase(unittest.TestCase):
         self.assertEqual(dict_rebind.text, 'Unset')
         self.assertEqual(dict_false.text, 'Unset')
         self.assertEqual(alias_rebind.text, 'Unset')
+
+    def test_batch(self):
+        from kivy.properties import NumericProperty, ReferenceListProperty
+
+        class Point(EventDispatcher):
+            x = NumericProperty(0)
+            y = NumericProperty(0)
+            pos = ReferenceListProperty(x, y)
+
+        point = Point()
+        observed = []
+        point.bind(x=lambda obj, value: observed.append(('x', value)),
+                   pos=lambda obj, value: observed.append(('pos', value[:])))
+
+        with point.batch():
+            point.x = 1
+            point.y = 2
+            with point.batch():
+                point.x = 3
+            self.assertEqual(point.pos, [3, 2])
+            self.assertEqual(observed, [])
+        self.assertEqual(observed, [('x', 3), ('pos', [3, 2])])
+
+        del observed[:]
+        try:
+            with point.batch():
+                point.pos = (4, 5)
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertEqual(observed, [('x', 4), ('pos', [4, 5])])
+        point.x = 6
+        self.assertTrue(('pos', [6, 5]) in observed)
+        self.assertRaises(RuntimeError, point.end_batch)
+
+    def test_lazy_observers(self):
+        from kivy.properties import NumericProperty
+
+        class Counter(EventDispatcher):
+            __events__ = ('on_reset', )
+            count = NumericProperty(0)
+
+            def on_reset(self, *largs):
+                pass
+
+        counter = Counter()
+        self.assertEqual(counter.get_property_observers('count'), [])
+        self.assertEqual(counter.get_property_observers('on_reset'), [])
+        counter.count = 1
+        counter.dispatch('on_reset')
+        counter.unbind(count=self.fail)
+        counter.fast_unbind('count', self.fail)
+
+        observed = []
+        callback = lambda *largs: observed.append(largs)
+        counter.bind(count=callback)
+        self.assertTrue(counter.fast_bind('on_reset', callback, 1))
+        counter.count = 2
+        counter.dispatch('on_reset')
+        self.assertEqual(observed, [(counter, 2), (1, counter)])
+        self.assertFalse(counter.fast_bind('on_missing', callback))
+
+    def test_set_many(self):
+        from array import array
+        from kivy.properties import NumericProperty, ReferenceListProperty
+
+        class Point(EventDispatcher):
+            x = NumericProperty(0)
+            y = NumericProperty(0)
+            pos = ReferenceListProperty(x, y)
+
+        points = [Point() for i in range(3)]
+        observed = []
+        for point in points:
+            point.bind(pos=lambda obj, value: observed.append(obj))
+
+        self.assertEqual(Point.x.set_many(points, [0, 1, 2]), 2)
+        self.assertEqual(observed, points[1:])
+        self.assertEqual(Point.x.set_many(points, array('d', [0, 1, 5])), 1)
+        self.assertEqual(points[2].x, 5.)
+        self.assertRaises(ValueError, Point.x.set_many, points, [0, 1])
+        self.assertRaises(ValueError, Point.x.set_many, points,
+                          [0, 1, object()])
+
+        values = memoryview(array('d', range(6))).cast('B').cast('d', (3, 2))
+        self.assertEqual(Point.pos.set_many(points, values), 3)
+        self.assertEqual([point.pos for point in points],
+                         [[0, 1], [2, 3], [4, 5]])
+        self.assertEqual(Point.pos.set_many(points, [(0, 1)] * 3), 2)
+
+    def test_create_property_instances(self):
+        from kivy.lang import Builder
+
+        class DynamicProperty(EventDispatcher):
+            pass
+
+        first = DynamicProperty()
+        first.create_property('foo', 1)
+        second = DynamicProperty()
+        second.foo = 2
+        self.assertEqual((first.foo, second.foo), (1, 2))
+
+        class KvProperty(EventDispatcher):
+            # what the rules are matched with
+            id = None
+            cls = []
+
+        Builder.load_string('<KvProperty>:\n    bar: 1\n',
+                            filename='test_create_property.kv')
+        try:
+            instances = []
+            for i in range(2):
+                instances.append(KvProperty())
+                Builder.apply(instances[-1])
+            instances[1].bar = 2
+            self.assertEqual([o.bar for o in instances], [1, 2])
+        finally:
+            Builder.unload_file('test_create_property.kv')
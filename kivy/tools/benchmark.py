@@ -23,7 +23,12 @@ from kivy.graphics import RenderContext
 from kivy.input.motionevent import MotionEvent
 from kivy.cache import Cache
 from kivy.clock import Clock
+from kivy.factory import Factory
+from kivy.lang import Builder
 from kivy.compat import PY2
+from kivy.event import EventDispatcher
+from kivy.properties import NumericProperty, StringProperty, ListProperty, \
+    DictProperty, ObjectProperty, BooleanProperty, ReferenceListProperty
 
 if not PY2:
     xrange = range
@@ -46,6 +51,43 @@ class bench_widget_creation:
             o.append(Widget())
 
 
+class bench_event_dispatcher_creation:
+    '''Core: EventDispatcher creation (10000 x 12 properties, 2 events)'''
+
+    def __init__(self):
+        class BenchDispatcher(EventDispatcher):
+            __events__ = ('on_press', 'on_release')
+            x = NumericProperty(0)
+            y = NumericProperty(0)
+            pos = ReferenceListProperty(x, y)
+            width = NumericProperty(100)
+            height = NumericProperty(100)
+            size = ReferenceListProperty(width, height)
+            text = StringProperty('')
+            children = ListProperty([])
+            parent = ObjectProperty(None, allownone=True)
+            disabled = BooleanProperty(False)
+            opacity = NumericProperty(1.)
+            ids = DictProperty({})
+
+            def on_press(self):
+                pass
+
+            def on_release(self):
+                pass
+
+            def on_size(self, instance, value):
+                pass
+
+        self.cls = BenchDispatcher
+
+    def run(self):
+        cls = self.cls
+        o = []
+        for x in range(10000):
+            o.append(cls())
+
+
 class bench_widget_creation_with_root:
     '''Widget: creation (10000 Widget + 1 root)'''
 
@@ -69,6 +111,35 @@ class bench_widget_draw:
         self.ctx.draw()
 
 
+class bench_canvas_update_1:
+    '''Graphics: canvas update (100 frames, 1 of 10000 Rectangle moved)'''
+
+    count = 1
+
+    def __init__(self):
+        from kivy.graphics import Color, Rectangle
+        self.ctx = ctx = RenderContext()
+        with ctx:
+            Color(1, 1, 1)
+            self.rects = [Rectangle(pos=(x % 100, x // 100), size=(4, 4))
+                          for x in range(10000)]
+        ctx.draw()
+
+    def run(self):
+        ctx = self.ctx
+        rects = self.rects[:self.count]
+        for x in range(100):
+            for rect in rects:
+                rect.pos = (x, x)
+            ctx.draw()
+
+
+class bench_canvas_update_100(bench_canvas_update_1):
+    '''Graphics: canvas update (100 frames, 100 of 10000 Rectangle moved)'''
+
+    count = 100
+
+
 class bench_widget_dispatch:
     '''Widget: event dispatch (1000 on_update in 10*1000 Widget)'''
 
@@ -156,6 +227,54 @@ class bench_button_creation_with_tick:
         Clock.tick()
 
 
+class bench_clock_tick_idle_timers_100:
+    '''Clock: frame overhead (1000 tick with 100 idle timers)'''
+
+    def __init__(self):
+        self.events = [Clock.schedule_interval(self.callback, 3600)
+                       for x in range(100)]
+
+    def callback(self, dt):
+        pass
+
+    def run(self):
+        max_fps = Clock._max_fps
+        Clock._max_fps = 0
+        try:
+            for x in range(1000):
+                Clock.tick()
+        finally:
+            Clock._max_fps = max_fps
+            for event in self.events:
+                event.cancel()
+
+
+class bench_clock_tick_idle_timers_10000(bench_clock_tick_idle_timers_100):
+    '''Clock: frame overhead (1000 tick with 10000 idle timers)'''
+
+    def __init__(self):
+        self.events = [Clock.schedule_interval(self.callback, 3600)
+                       for x in range(10000)]
+
+
+class bench_kv_bound_property:
+    '''Lang: kv bound properties (1000 Widget x 100 updates)'''
+
+    def __init__(self):
+        if 'BenchKvWidget' not in Factory.classes:
+            Builder.load_string('''
+<BenchKvWidget@Widget>:
+    opacity: min(1., self.x / 100.)
+    size: self.x * 2, max(self.y, 10)
+''')
+        self.widgets = [Factory.BenchKvWidget() for x in range(1000)]
+
+    def run(self):
+        for x in range(100):
+            for widget in self.widgets:
+                widget.x = x
+
+
 if __name__ == '__main__':
 
     report = []
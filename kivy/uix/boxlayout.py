@@ -169,10 +169,12 @@ class BoxLayout(Layout):
                     elif key == 'center_y':
                         cy += posy - (h / 2.)
 
-                c.x = cx
-                c.y = cy
-                c.width = w
-                c.height = h
+                # dispatch pos and size once, with their final values
+                with c.batch():
+                    c.x = cx
+                    c.y = cy
+                    c.width = w
+                    c.height = h
                 x += w + spacing
 
         if orientation == 'vertical':
@@ -200,10 +202,12 @@ class BoxLayout(Layout):
                     elif key == 'center_x':
                         cx += posx - (w / 2.)
 
-                c.x = cx
-                c.y = cy
-                c.width = w
-                c.height = h
+                # dispatch pos and size once, with their final values
+                with c.batch():
+                    c.x = cx
+                    c.y = cy
+                    c.width = w
+                    c.height = h
                 y += h + spacing
 
     def add_widget(self, widget, index=0):
@@ -157,6 +157,7 @@ from kivy.utils import boundary, platform
 from kivy.uix.behaviors import FocusBehavior
 
 from kivy.core.text import Label
+from kivy.core.image import texture_cost
 from kivy.graphics import Color, Rectangle, PushMatrix, PopMatrix, Callback
 from kivy.graphics.context_instructions import Transform
 from kivy.graphics.texture import Texture
@@ -174,7 +175,7 @@ Cache_register = Cache.register
 Cache_append = Cache.append
 Cache_get = Cache.get
 Cache_remove = Cache.remove
-Cache_register('textinput.label', timeout=60.)
+Cache_register('textinput.label', timeout=60., cost=texture_cost)
 Cache_register('textinput.width', timeout=60.)
 
 FL_IS_NEWLINE = 0x01
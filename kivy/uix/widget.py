@@ -482,6 +482,9 @@ class Widget(WidgetBase):
                 next_index = 1
             canvas.insert(next_index, widget.canvas)
 
+        # build the canvas rules deferred until the widget is shown
+        Builder.build_deferred_canvas(widget)
+
     def remove_widget(self, widget):
         '''Remove a widget from the children of this widget.
 
@@ -590,7 +590,9 @@ graphics_dependencies = {
         'c_opengl.pxd', 'c_opengl_debug.pxd'],
     'c_opengl_debug.pyx': ['common.pxi', 'c_opengl.pxd'],
     'compiler.pxd': ['instructions.pxd'],
-    'compiler.pyx': ['context_instructions.pxd'],
+    'compiler.pyx': [
+        'opcodes.pxi', 'c_opengl.pxd', 'context_instructions.pxd',
+        'texture.pxd', 'vbo.pxd'],
     'context_instructions.pxd': [
         'transformation.pxd', 'instructions.pxd', 'texture.pxd'],
     'fbo.pxd': ['c_opengl.pxd', 'instructions.pxd', 'texture.pxd'],
@@ -631,8 +633,8 @@ graphics_dependencies = {
     'vertex.pxd': ['c_opengl.pxd'],
     'vertex.pyx': ['config.pxi', 'common.pxi'],
     'vertex_instructions.pyx': [
-        'config.pxi', 'common.pxi', 'vbo.pxd', 'vertex.pxd', 'instructions.pxd',
-        'vertex_instructions.pxd',
+        'config.pxi', 'common.pxi', 'opcodes.pxi', 'vbo.pxd', 'vertex.pxd',
+        'instructions.pxd', 'vertex_instructions.pxd',
         'c_opengl.pxd', 'c_opengl_debug.pxd', 'texture.pxd',
         'vertex_instructions_line.pxi'],
     'vertex_instructions_line.pxi': ['stencil_instructions.pxd']}